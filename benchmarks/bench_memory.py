@@ -0,0 +1,143 @@
+"""Benchmark memory used by DocumentNode trees.
+
+Compares the slotted DocumentNode with the plain dataclass layout it
+replaced (per-instance ``__dict__``, an ``attributes`` dict and a
+``children`` list on every node). All trees are copies of one parsed tree
+that share its ids, titles and attribute values. Slotted nodes are copied
+once keeping their content as spans of the input and once with the content
+copied out as strings, as the legacy nodes hold it, so the totals include
+any text a layout duplicates. The columnar tree built from the same nodes
+is reported alongside.
+
+Usage:
+    python benchmarks/bench_memory.py [--size-mb 8]
+"""
+
+import argparse
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from bench_scanner import count_nodes, make_document
+
+from docnav.models import DocumentNode
+from docnav.processors.scanner import parse_markdown_tree
+from docnav.tree import ColumnarTree
+
+
+@dataclass
+class LegacyNode:
+    """DocumentNode layout before it used ``__slots__``, for comparison."""
+
+    type: str
+    level: Optional[int] = None
+    id: str = ""
+    title: str = ""
+    content: str = ""
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    children: List["LegacyNode"] = field(default_factory=list)
+    parent: Optional["LegacyNode"] = field(default=None, repr=False, compare=False)
+
+    def add_child(self, child: "LegacyNode") -> None:
+        """Add a child node and set parent reference."""
+        child.parent = self
+        self.children.append(child)
+
+
+def copy_tree(node: DocumentNode, make_node):
+    """Copy a tree node by node, sharing attribute values."""
+    copy = make_node(node)
+    stack = [(node, copy)]
+    while stack:
+        source, target = stack.pop()
+        for child in source.children:
+            child_copy = make_node(child)
+            target.add_child(child_copy)
+            stack.append((child, child_copy))
+    return copy
+
+
+def make_spans(node: DocumentNode) -> DocumentNode:
+    """Copy one node as a slotted DocumentNode sharing the input text."""
+    copy = make_slotted(node)
+    if node.span is not None:
+        copy.set_span(node.source, *node.span)
+    return copy
+
+
+def make_slotted(node: DocumentNode) -> DocumentNode:
+    """Copy one node as a slotted DocumentNode holding its own text."""
+    return DocumentNode(
+        type=node.type,
+        level=node.level,
+        id=node.id,
+        title=node.title,
+        content=node.content,
+        attributes=dict(node._attribute_items()),
+    )
+
+
+def make_legacy(node: DocumentNode) -> LegacyNode:
+    """Copy one node as a LegacyNode."""
+    return LegacyNode(
+        type=node.type,
+        level=node.level,
+        id=node.id,
+        title=node.title,
+        content=node.content,
+        attributes=dict(node._attribute_items()),
+    )
+
+
+def measure(build) -> tuple:
+    """Return the result of ``build`` and the bytes it left allocated."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    args = parser.parse_args()
+
+    content = make_document(int(args.size_mb * 1024 * 1024))
+    size_mb = len(content.encode("utf-8")) / (1024 * 1024)
+
+    root, parsed = measure(lambda: parse_markdown_tree(content))
+    nodes = count_nodes(root)
+    print(f"input: {size_mb:.2f} MB, {nodes} nodes")
+    print(f"  parse: {parsed / 1e6:.1f} MB retained, node text is spans of the input")
+
+    layouts = (
+        ("spans", make_spans),
+        ("slotted", make_slotted),
+        ("legacy", make_legacy),
+    )
+    for name, make_node in layouts:
+        _, used = measure(lambda: copy_tree(root, make_node))
+        print(
+            f"{name:>8}: {used / 1e6:.1f} MB for nodes, {used / nodes:.0f} bytes/node"
+        )
+
+    # Scanner nodes are spans of the input, so the columnar tree indexes the
+    # input itself; other trees have their text copied into one buffer
+    tree, used = measure(lambda: ColumnarTree.from_node(root))
+    text = 0 if tree.text is content else sys.getsizeof(tree.text)
+    print(
+        f"columnar: {used / 1e6:.1f} MB including {text / 1e6:.1f} MB of text, "
+        f"{(used - text) / nodes:.0f} bytes/node without it"
+    )
+
+
+if __name__ == "__main__":
+    main()
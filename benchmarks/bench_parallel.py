@@ -0,0 +1,103 @@
+"""Benchmark partitioned parallel CommonMark parsing against a serial parse.
+
+For each input size, times the line scanner, a serial CommonMark parse, and
+``ParallelCommonMarkEngine`` with a pool spawned for the parse (``cold``)
+and with the shared, already started pool (``warm``). The measured times
+depend on the CPUs available, so the benchmark also measures what the
+parallel path costs on top of the parse itself: handing a task to a warm
+worker, and pickling the parts and their trees across the process boundary.
+From those it predicts the wall time with 2 and 4 workers on as many free
+CPUs. ``PARALLEL_MIN_CHARS`` in ``docnav/processors/engines.py`` is set from
+the smallest size where 2 workers pay off.
+
+Usage:
+    python benchmarks/bench_parallel.py [--sizes-kb 64,128,256,512,1024,4096]
+        [--workers 4] [--repeat 3]
+"""
+
+import argparse
+import pickle
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from bench_scanner import make_document
+
+from docnav.processors import workers
+from docnav.processors.engines import (
+    PARTITION_MIN_CHARS,
+    ParallelCommonMarkEngine,
+    parse_commonmark_tree,
+)
+from docnav.processors.scanner import parse_markdown_tree
+
+
+def best_time(run, repeat: int) -> float:
+    """Return the best wall time of ``repeat`` calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def cold_parse(engine: ParallelCommonMarkEngine, content: str) -> None:
+    """Parse with a freshly spawned pool, as every parse used to."""
+    workers.shutdown_process_pool()
+    engine.parse(content)
+    workers.shutdown_process_pool()
+
+
+def transfer_time(content: str, repeat: int) -> float:
+    """Time pickling the text out to workers and the trees back."""
+    root = parse_commonmark_tree(content)
+
+    def round_trip() -> None:
+        pickle.loads(pickle.dumps(content))
+        pickle.loads(pickle.dumps(root))
+
+    return best_time(round_trip, repeat)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes-kb", default="64,128,256,512,1024,4096")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = ParallelCommonMarkEngine(args.workers, min_chars=0)
+    pool = workers.get_process_pool()
+    pool.submit(len, "").result()  # Start a worker
+    dispatch = best_time(lambda: pool.submit(len, "").result(), 20)
+    print(f"warm task round trip: {dispatch * 1000:.2f}ms")
+
+    columns = ("scanner", "serial", "cold", "warm", "pickle", "2 CPUs", "4 CPUs")
+    print(f"{'size':>8}" + "".join(f"{c:>10}" for c in columns))
+    for size_kb in (int(size) for size in args.sizes_kb.split(",")):
+        content = make_document(size_kb * 1024)
+        scanner = best_time(lambda: parse_markdown_tree(content), args.repeat)
+        serial = best_time(lambda: parse_commonmark_tree(content), args.repeat)
+        cold = best_time(lambda: cold_parse(engine, content), 1)
+        engine.parse(content)  # Start enough workers for this size
+        warm = best_time(lambda: engine.parse(content), args.repeat)
+        pickled = transfer_time(content, args.repeat)
+
+        # Parts smaller than PARTITION_MIN_CHARS are merged, capping the split
+        parts = max(1, min(args.workers * 2, len(content) // PARTITION_MIN_CHARS))
+        predicted = [
+            serial / min(cpus, parts) + pickled + dispatch * parts for cpus in (2, 4)
+        ]
+        times = (scanner, serial, cold, warm, pickled, *predicted)
+        print(f"{size_kb:>6}KB" + "".join(f"{t * 1000:>8.0f}ms" for t in times))
+
+    workers.shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    main()
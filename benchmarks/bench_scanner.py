@@ -0,0 +1,146 @@
+"""Benchmark Markdown scanning throughput in MB/s.
+
+Usage:
+    python benchmarks/bench_scanner.py [--size-mb 8] [--repeat 3]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from docnav.models import DocumentNode
+from docnav.processors.scanner import parse_markdown_tree
+
+SECTION = """# Chapter {i}
+
+Intro paragraph for chapter {i} with some **bold** text and a [link](#x).
+More prose that wraps onto a second line of the same paragraph.
+
+## Details {i}
+
+- first item
+- second item
+  * nested item
+1. ordered item
+2) another ordered item
+
+```python
+# a comment that is not a heading
+def f(x):
+    return x * {i}
+```
+
+Setext section {i}
+------------------
+
+Closing paragraph.
+
+"""
+
+
+def make_document(size_bytes: int) -> str:
+    """Build a Markdown document of at least ``size_bytes`` bytes."""
+    parts = []
+    total = 0
+    i = 0
+    while total < size_bytes:
+        section = SECTION.format(i=i)
+        parts.append(section)
+        total += len(section.encode("utf-8"))
+        i += 1
+    return "".join(parts)
+
+
+def legacy_parse(content: str) -> DocumentNode:
+    """Per-line ``re.match`` parser the scanner replaced, for comparison."""
+    root = DocumentNode(type="document", id="root")
+    current_parents = [root]
+    node_counter = 0
+    for line_num, line in enumerate(content.split("\n")):
+        heading_match = re.match(r"^(#{1,6})\s+(.+)$", line)
+        if heading_match:
+            level = len(heading_match.group(1))
+            while len(current_parents) > level:
+                current_parents.pop()
+            node = DocumentNode(
+                type="heading",
+                level=level,
+                id=f"h{level}_{node_counter}",
+                title=heading_match.group(2).strip(),
+                content=line,
+                attributes={"line_number": line_num, "raw_line": line},
+            )
+            current_parents[-1].add_child(node)
+            current_parents.append(node)
+        elif line.strip().startswith("```"):
+            current_parents[-1].add_child(
+                DocumentNode(type="code_block", id=f"code_{node_counter}", content=line)
+            )
+        elif re.match(r"^(\s*)([-*+]|\d+\.)\s+", line):
+            ordered = re.match(r"^\s*\d+\.", line)
+            current_parents[-1].add_child(
+                DocumentNode(
+                    type="list_item",
+                    id=f"list_{node_counter}",
+                    content=line,
+                    attributes={"list_type": "ordered" if ordered else "unordered"},
+                )
+            )
+        elif line.strip():
+            current_parents[-1].add_child(
+                DocumentNode(type="paragraph", id=f"p_{node_counter}", content=line)
+            )
+        else:
+            continue
+        node_counter += 1
+    return root
+
+
+def time_parser(parse, content: str, repeat: int):
+    """Return the best wall time and the tree of the last run."""
+    best = float("inf")
+    root = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        root = parse(content)
+        best = min(best, time.perf_counter() - started)
+    return best, root
+
+
+def count_nodes(node) -> int:
+    """Count nodes in a tree."""
+    stack = [node]
+    count = 0
+    while stack:
+        current = stack.pop()
+        count += 1
+        stack.extend(current.children)
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    content = make_document(int(args.size_mb * 1024 * 1024))
+    size_mb = len(content.encode("utf-8")) / (1024 * 1024)
+
+    print(f"input: {size_mb:.2f} MB, {content.count(chr(10))} lines")
+    for name, parse in (("scanner", parse_markdown_tree), ("legacy", legacy_parse)):
+        best, root = time_parser(parse, content, args.repeat)
+        print(
+            f"{name:>8}: {best:.3f}s, {size_mb / best:.1f} MB/s, "
+            f"{count_nodes(root)} nodes"
+        )
+
+
+if __name__ == "__main__":
+    main()
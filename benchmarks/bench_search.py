@@ -0,0 +1,109 @@
+"""Benchmark search_document latency on a large document.
+
+Compares, per query, collecting every match in document order (what
+``search_document`` printed the first five of), scoring every match with
+BM25 and sorting them all, and the ranked search that keeps the best
+``--limit``: with a heap in pure Python, and vectorized when NumPy is
+installed.
+
+Usage:
+    python benchmarks/bench_search.py [--size-mb 8] [--limit 5] [--repeat 5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from bench_scanner import make_document
+
+import docnav.search
+from docnav.navigator import DocumentNavigator
+from docnav.search import bm25_idf, parse_query
+
+QUERIES = (
+    "item",
+    "intro paragraph",
+    "nested item",
+    "comment heading",
+    "20084",
+    '"second item"',
+    '"chapter 20084"',
+    '"paragraph for chapter"',
+    "bold NEAR/3 link",
+)
+
+
+def best_time(run, repeat: int) -> float:
+    """Return the best wall time of ``repeat`` calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def sort_all(document, query: str, limit: int):
+    """Score every match with BM25 and sort them all, for comparison."""
+    index = document.get_search_index()
+    ordinals, counts = index.query_counts(parse_query(query))
+    nodes = len(index)
+    weights = {term: bm25_idf(nodes, len(c)) for term, c in counts.items()}
+    scores = index.bm25_scores(counts, ordinals, weights, index.total_length / nodes)
+    ranked = sorted(zip(scores, ordinals), key=lambda hit: -hit[0])
+    return [document.get_search_result(ordinal) for _, ordinal in ranked[:limit]]
+
+
+def without_numpy(run):
+    """Wrap ``run`` to use the pure Python search code."""
+
+    def run_without_numpy():
+        np, docnav.search.np = docnav.search.np, None
+        try:
+            return run()
+        finally:
+            docnav.search.np = np
+
+    return run_without_numpy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    content = make_document(int(args.size_mb * 1024 * 1024))
+    navigator = DocumentNavigator()
+    started = time.perf_counter()
+    _, document = navigator.load_document_from_text_sync(content, "markdown")
+    loaded = time.perf_counter() - started
+    index = document.get_search_index()
+    print(
+        f"input: {len(content) / (1024 * 1024):.2f} MB, {len(index)} nodes, "
+        f"{len(index.postings)} terms, loaded and indexed in {loaded:.2f}s"
+    )
+
+    columns = ("all", "sort", "heap", "numpy")
+    print(f"{'query':>18} {'matches':>8}" + "".join(f"{c:>10}" for c in columns))
+    for query in QUERIES:
+        total, _ = document.search_ranked(query, args.limit)
+        runs = [
+            lambda: document.search(query),
+            lambda: sort_all(document, query, args.limit),
+            without_numpy(lambda: document.search_ranked(query, args.limit)),
+        ]
+        if docnav.search.np is not None:
+            runs.append(lambda: document.search_ranked(query, args.limit))
+        times = [f"{best_time(run, args.repeat) * 1000:>8.1f}ms" for run in runs]
+        print(f"{query:>18} {total:>8}" + "".join(times))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Persistent content-addressed cache for parsed documents."""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import Document
+
+# Bump when the pickled layout of Document/DocumentNode changes
+CACHE_FORMAT_VERSION = 8
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+CACHE_SUFFIX = ".docnav"
+
+
+def default_cache_dir() -> Path:
+    """Get the default cache directory.
+
+    Honors ``DOCNAV_CACHE_DIR`` first, then ``XDG_CACHE_HOME``, and falls back
+    to ``~/.cache/docnav``.
+    """
+    env_dir = os.environ.get("DOCNAV_CACHE_DIR")
+    if env_dir:
+        return Path(env_dir).expanduser()
+    xdg_dir = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg_dir).expanduser() if xdg_dir else Path.home() / ".cache"
+    return base / "docnav"
+
+
+def hash_file(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Compute the SHA-256 hex digest of a file's content.
+
+    Args:
+        file_path: Path to the file to hash
+        chunk_size: Number of bytes read per iteration
+
+    Returns:
+        Hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DocumentCache:
+    """On-disk cache of parsed documents keyed by file content hash.
+
+    Each entry stores a pickled ``Document`` (converted source text plus the
+    parsed ``DocumentNode`` tree). Keys combine the content hash with the
+    parser name and version, so changing a processor invalidates its entries.
+    The total size is bounded; least recently used entries are evicted first.
+    """
+
+    def __init__(
+        self, cache_dir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding cache entries, defaults to
+                ``default_cache_dir()``
+            max_bytes: Maximum total size of all entries in bytes
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, content_hash: str, parser: str) -> str:
+        """Build a cache key from a content hash and parser identifier.
+
+        Args:
+            content_hash: Hex digest of the source file content
+            parser: Parser identifier, e.g. ``"PDFProcessor/1"``
+
+        Returns:
+            Hex digest usable as a cache entry name
+        """
+        raw = f"{CACHE_FORMAT_VERSION}:{parser}:{content_hash}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def key_for_file(self, file_path: Path, parser: str) -> str:
+        """Build a cache key for a file parsed by the given parser."""
+        return self.make_key(hash_file(file_path), parser)
+
+    def _entry_path(self, key: str) -> Path:
+        """Get the on-disk path of a cache entry."""
+        return self.cache_dir / f"{key}{CACHE_SUFFIX}"
+
+    def get(self, key: str) -> Optional[Document]:
+        """Get a cached document.
+
+        Args:
+            key: Cache key from ``make_key`` or ``key_for_file``
+
+        Returns:
+            Unpickled Document, or None on a miss or unreadable entry
+        """
+        entry = self._entry_path(key)
+        try:
+            with open(entry, "rb") as f:
+                document = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # Corrupt or incompatible entry - drop it and treat as a miss
+            entry.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        if not isinstance(document, Document):
+            entry.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        # Refresh mtime so eviction follows least-recently-used order
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return document
+
+    def put(self, key: str, document: Document) -> None:
+        """Store a document in the cache and enforce the size bound.
+
+        Args:
+            key: Cache key from ``make_key`` or ``key_for_file``
+            document: Parsed document to store
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file first so readers never see partial entries
+        fd, temp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(document, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_name, self._entry_path(key))
+        except Exception:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+        self._evict()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """List cache entries as (mtime, size, path) tuples."""
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+        for entry in self.cache_dir.glob(f"*{CACHE_SUFFIX}"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        return entries
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until under ``max_bytes``."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                entry.unlink()
+                total -= size
+            except OSError:
+                continue
+
+    def clear(self) -> int:
+        """Remove all cache entries.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        for _, _, entry in self._entries():
+            try:
+                entry.unlink()
+                removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with entry count, total size, limits and hit counters
+        """
+        entries = self._entries()
+        return {
+            "cache_dir": str(self.cache_dir),
+            "entries": len(entries),
+            "total_bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
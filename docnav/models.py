@@ -1,46 +1,273 @@
 """Data models for document representation based on DOM-like tree structure."""
 
+import mmap
+import time
+from array import array
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .search import TOKEN_MODE, InvertedIndex, check_search_mode, parse_query
+from .tree import (
+    NONE,
+    ColumnarNode,
+    ColumnarTree,
+    PreorderIndex,
+    PreorderNumbering,
+)
+
+# What get_children returns for leaves, which have no children list
+_NO_CHILDREN: Tuple["DocumentNode", ...] = ()
+
+# Span lengths are packed into the low bits of a node's span
+_SPAN_BITS = 32
+_SPAN_MASK = (1 << _SPAN_BITS) - 1
+
+
+class FileSource:
+    """Text of a file, sliced by byte offsets through a memory map.
+
+    Nodes of streamed documents point into a ``FileSource`` instead of
+    holding their text; ``source[start:end]`` decodes just that byte range.
+    The map is opened on first use and not pickled.
+    """
+
+    def __init__(self, path: Path, encoding: str = "utf-8") -> None:
+        """Create a source for a file.
+
+        Args:
+            path: Path of the file
+            encoding: Text encoding of the file
+        """
+        self.path = Path(path)
+        self.encoding = encoding
+        self._map: Optional[mmap.mmap] = None
+
+    def __getitem__(self, index: slice) -> str:
+        """Decode a byte range of the file."""
+        if self._map is None:
+            if not self.path.stat().st_size:
+                return ""  # empty files cannot be mapped
+            with open(self.path, "rb") as file:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        # memoryview slicing avoids copying before decoding
+        with memoryview(self._map)[index] as data:
+            return str(data, self.encoding, "replace")
+
+    def close(self) -> None:
+        """Release the memory map."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"path": self.path, "encoding": self.encoding}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.path = state["path"]
+        self.encoding = state["encoding"]
+        self._map = None
 
 
-@dataclass
 class DocumentNode:
     """Document node - similar to DOM node structure.
 
     Represents a hierarchical element in a document tree structure,
     supporting various content types like headings, paragraphs, lists, etc.
+
+    Nodes use ``__slots__`` to stay small on trees with hundreds of thousands
+    of nodes. Leaf nodes hold no ``children`` list until it is accessed, and
+    a lone ``line_number`` attribute is kept in a slot; the ``attributes``
+    dict is only created when other attributes are set or it is accessed.
+    Use ``get_children`` and ``get_attribute`` to read them without creating
+    either.
+
+    Content is either a string or, after ``set_span``, a (start, end) range
+    of a shared source (the document's text, or a ``FileSource``) that is
+    sliced when ``content`` is read, so the text is not stored twice.
     """
 
-    type: str  # node type: heading, paragraph, list, code, etc.
-    level: Optional[int] = None  # hierarchy level for headings
-    id: str = ""
-    title: str = ""  # display title for headings
-    content: str = ""  # actual text content
-    attributes: Dict[str, Any] = field(default_factory=dict)  # additional metadata
-    children: List["DocumentNode"] = field(default_factory=list)  # child nodes
-    parent: Optional["DocumentNode"] = None  # parent node reference
+    __slots__ = (
+        "type",  # node type: heading, paragraph, list, code, etc.
+        "level",  # hierarchy level for headings
+        "id",
+        "title",  # display title for headings
+        "_content",  # text, or a packed span into _source
+        "_source",  # text the span points into, None for plain content
+        "parent",  # parent node reference
+        "_attributes",  # additional metadata, None until needed
+        "_line_number",  # line_number while _attributes is None
+        "_children",  # child nodes, None for leaves
+        "ordinal",  # preorder position, set when a Document indexes the tree
+    )
 
-    def __post_init__(self) -> None:
-        """Initialize default values after dataclass creation."""
-        if self.attributes is None:
-            self.attributes = {}
-        if self.children is None:
-            self.children = []
+    def __init__(
+        self,
+        type: str,
+        level: Optional[int] = None,
+        id: str = "",
+        title: str = "",
+        content: str = "",
+        attributes: Optional[Dict[str, Any]] = None,
+        children: Optional[List["DocumentNode"]] = None,
+        parent: Optional["DocumentNode"] = None,
+    ) -> None:
+        """Initialize a node; children are not re-parented."""
+        self.type = type
+        self.level = level
+        self.id = id
+        self.title = title
+        self._content = content
+        self._source = None
+        self.parent = parent
+        self.attributes = attributes
+        self._children = children or None
+        self.ordinal = None
+
+    @property
+    def content(self) -> str:
+        """Actual text content, sliced from the source for spans."""
+        content = self._content
+        if content.__class__ is int:
+            start = content >> _SPAN_BITS
+            return self._source[start : start + (content & _SPAN_MASK)]
+        return content
+
+    @content.setter
+    def content(self, content: str) -> None:
+        self._content = content
+        self._source = None
+
+    @property
+    def span(self) -> Optional[Tuple[int, int]]:
+        """The (start, end) range of the content in its source, if any."""
+        content = self._content
+        if content.__class__ is int:
+            start = content >> _SPAN_BITS
+            return start, start + (content & _SPAN_MASK)
+        return None
+
+    @property
+    def source(self) -> Any:
+        """The text or FileSource the span points into, if any."""
+        return self._source
+
+    def set_span(self, source: Any, start: int, end: int) -> None:
+        """Point the content at ``source[start:end]`` instead of a copy.
+
+        Args:
+            source: Shared text, or a FileSource for byte offsets
+            start: Start offset in the source
+            end: End offset in the source, exclusive
+        """
+        self._source = source
+        self._content = (start << _SPAN_BITS) | (end - start)
+
+    def set_source(self, source: Any) -> None:
+        """Point an existing span at another source with the same layout."""
+        if self._source is not None:
+            self._source = source
+
+    @property
+    def attributes(self) -> Dict[str, Any]:
+        """Additional metadata, created on first access."""
+        if self._attributes is None:
+            self._attributes = {}
+            if self._line_number is not None:
+                self._attributes["line_number"] = self._line_number
+                self._line_number = None
+        return self._attributes
+
+    @attributes.setter
+    def attributes(self, attributes: Optional[Dict[str, Any]]) -> None:
+        line_number = attributes.get("line_number") if attributes else None
+        if line_number is not None and len(attributes) == 1:
+            self._attributes = None
+            self._line_number = line_number
+        else:
+            self._attributes = attributes or None
+            self._line_number = None
+
+    def get_attribute(self, key: str, default: Any = None) -> Any:
+        """Get an attribute without creating the attributes dict."""
+        if self._attributes is not None:
+            return self._attributes.get(key, default)
+        if key == "line_number" and self._line_number is not None:
+            return self._line_number
+        return default
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute, keeping a lone line number compact."""
+        if key == "line_number" and self._attributes is None and value is not None:
+            self._line_number = value
+        else:
+            self.attributes[key] = value
+
+    @property
+    def children(self) -> List["DocumentNode"]:
+        """Child nodes, a list created on first access for leaves."""
+        if self._children is None:
+            self._children = []
+        return self._children
+
+    def get_children(
+        self,
+    ) -> Union[List["DocumentNode"], Tuple["DocumentNode", ...]]:
+        """Get child nodes without creating a list for leaves."""
+        return self._children or _NO_CHILDREN
+
+    @children.setter
+    def children(self, children: Optional[List["DocumentNode"]]) -> None:
+        self._children = children or None
+        self.ordinal = None
+
+    def __repr__(self) -> str:
+        return (
+            f"DocumentNode(type={self.type!r}, level={self.level!r}, "
+            f"id={self.id!r}, title={self.title!r}, content={self.content!r}, "
+            f"attributes={self._attribute_items()!r}, "
+            f"children={list(self.get_children())!r})"
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            self.type == other.type
+            and self.level == other.level
+            and self.id == other.id
+            and self.title == other.title
+            and self.content == other.content
+            and self._attribute_items() == other._attribute_items()
+            and list(self.get_children()) == list(other.get_children())
+        )
+
+    __hash__ = None  # mutable, like the dataclass it replaced
+
+    def _attribute_items(self) -> Dict[str, Any]:
+        """Get the attributes as a dict without storing one on the node."""
+        if self._attributes is not None:
+            return self._attributes
+        if self._line_number is not None:
+            return {"line_number": self._line_number}
+        return {}
 
     def add_child(self, child: "DocumentNode") -> None:
         """Add a child node and set parent reference."""
         child.parent = self
-        self.children.append(child)
+        if self._children is None:
+            self._children = [child]
+        else:
+            self._children.append(child)
 
     def get_ancestors(self) -> List["DocumentNode"]:
         """Get list of ancestor nodes from root to parent."""
         ancestors = []
         current = self.parent
         while current:
-            ancestors.insert(0, current)
+            ancestors.append(current)
             current = current.parent
+        ancestors.reverse()
         return ancestors
 
     def get_depth(self) -> int:
@@ -65,6 +292,22 @@ class SearchResult:
     line_number: Optional[int] = None
     context_before: str = ""
     context_after: str = ""
+    score: Optional[float] = None  # relevance, set by ranked searches
+
+
+@dataclass
+class CorpusSearchResult:
+    """Represents a ranked search hit in one of several documents."""
+
+    doc_id: str
+    title: str  # document title
+    node_id: str
+    section: str  # section title where match was found
+    section_id: str  # section node ID
+    snippet: str  # matching content around the first query term
+    score: float
+    type: str  # node type
+    line_number: Optional[int] = None
 
 
 @dataclass
@@ -78,12 +321,93 @@ class NavigationContext:
     breadcrumbs: List[Dict[str, str]] = field(default_factory=list)  # ancestor path
 
 
+@dataclass
+class ParseStats:
+    """Timing and size of one parse by a parse engine."""
+
+    engine: str
+    seconds: float
+    nodes: int
+    chars: int
+    chunks: int = 1  # partitions parsed in parallel
+
+
+@dataclass
+class LoadJob:
+    """Progress of a background document load."""
+
+    doc_id: str
+    file_path: str
+    phase: str = "queued"  # queued, convert, parse, index, tokenize, done, error
+    pages_done: int = 0
+    pages_total: Optional[int] = None
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the job started, frozen once it finishes."""
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has completed or failed."""
+        return self.phase in ("done", "error")
+
+
+@dataclass
+class LoadResult:
+    """Outcome of loading one file in a batch."""
+
+    file_path: str
+    doc_id: Optional[str] = None  # None when the load failed
+    seconds: float = 0.0
+    cached: bool = False
+    error: Optional[str] = None
+
+
+@dataclass
+class ManifestEntry:
+    """Recorded state of one file loaded by directory ingestion."""
+
+    path: str
+    mtime: float
+    size: int
+    content_hash: str
+    doc_id: str
+
+
+@dataclass
+class DirectoryLoadResult:
+    """Outcome of loading or refreshing a directory."""
+
+    directory: str
+    pattern: str
+    added: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)  # path -> error message
+    doc_ids: Dict[str, str] = field(default_factory=dict)  # path -> doc_id
+    seconds: float = 0.0
+
+
 @dataclass
 class Document:
     """Represents a processed document with hierarchical structure.
 
     Uses a tree-based approach for better navigation and content organization,
     similar to DOM structure for web documents.
+
+    ``compact`` moves the tree into a ``ColumnarTree``; ``root`` and
+    ``get_node`` then return read-only ``ColumnarNode`` views and ``index``
+    stays empty.
+
+    ``rebuild_index`` also numbers the tree in preorder (``preorder``), so
+    depths, ancestors, nearest headings and subtrees are array lookups and
+    slices rather than tree walks.
     """
 
     file_path: Path
@@ -93,46 +417,385 @@ class Document:
     root: Optional[DocumentNode] = None  # document root node
     index: Dict[str, DocumentNode] = field(default_factory=dict)  # node lookup index
     metadata: Dict[str, Any] = field(default_factory=dict)
+    pages: Dict[int, str] = field(default_factory=dict)  # converted page memo
+    page_text: Dict[int, str] = field(default_factory=dict)  # plain page text memo
+    tree: Optional[ColumnarTree] = None  # columnar storage replacing root/index
+    preorder: Optional[PreorderIndex] = field(default=None, repr=False)
+    line_starts: Optional[array] = field(default=None, init=False, repr=False)
+    search_index: Optional[InvertedIndex] = field(default=None, init=False, repr=False)
 
     def __post_init__(self) -> None:
         """Initialize document structure after creation."""
         if self.metadata is None:
             self.metadata = {}
+        if self.tree is not None:
+            self.root = self.tree.root
         if self.root is None:
             self.root = DocumentNode(type="document", id="root", title=self.title)
         if not self.index:
             self.rebuild_index()
 
+    @property
+    def is_lazy(self) -> bool:
+        """Whether page content is converted on demand (lazily loaded PDFs)."""
+        return bool(self.metadata.get("lazy"))
+
+    @property
+    def is_streamed(self) -> bool:
+        """Whether content is read from the file on demand (streamed Markdown)."""
+        return bool(self.metadata.get("streamed"))
+
+    @property
+    def is_columnar(self) -> bool:
+        """Whether the tree is stored in a ColumnarTree."""
+        return self.tree is not None
+
+    @property
+    def node_count(self) -> int:
+        """Number of indexed nodes."""
+        return len(self.tree) if self.tree is not None else len(self.index)
+
+    def compact(self) -> None:
+        """Move the node tree into columnar storage.
+
+        The ``DocumentNode`` objects are released; nodes are read through
+        ``ColumnarNode`` views afterwards and can no longer be modified.
+        """
+        if self.tree is None and self.root is not None:
+            self.tree = ColumnarTree.from_node(self.root)
+            self.root = self.tree.root
+            self.index.clear()
+            self.preorder = None
+
+    def iter_nodes(self) -> Iterator[Union[DocumentNode, ColumnarNode]]:
+        """Iterate over indexed nodes in document order."""
+        if self.tree is not None:
+            return self.tree.iter_nodes()
+        return iter(self.index.values())
+
+    def set_file_source(self, file_path: Path) -> None:
+        """Point the spans of a streamed document at ``file_path``.
+
+        Needed when a cached document was streamed from another file with
+        the same content.
+        """
+        source = FileSource(file_path, self.metadata.get("encoding", "utf-8"))
+        for node in self.iter_nodes():
+            if isinstance(node.source, FileSource):
+                node.set_source(source)
+
     def rebuild_index(self) -> None:
-        """Rebuild the node lookup index."""
+        """Rebuild the node lookup index and the preorder numbering."""
         self.index.clear()
+        self.preorder = None
+        self.search_index = None
+        if self.tree is not None:
+            # Columnar trees look nodes up by their own id positions
+            return
         if self.root:
-            self._traverse_and_index(self.root)
+            self.preorder = PreorderIndex.from_node(self.root)
+            for node in self.preorder.nodes:
+                if node.id:
+                    self.index[node.id] = node
+
+    def _numbering(self, node: Any) -> Tuple[Optional[PreorderNumbering], int]:
+        """Get the numbering that covers a node and the node's ordinal in it.
+
+        Returns (None, NONE) for nodes added after the last ``rebuild_index``,
+        which callers handle by walking the tree instead.
+        """
+        numbering = self.tree if self.tree is not None else self.preorder
+        if numbering is not None:
+            ordinal = numbering.ordinal_of(node)
+            if ordinal is not None:
+                return numbering, ordinal
+        return None, NONE
+
+    def get_depth(self, node: DocumentNode) -> int:
+        """Get the number of ancestors of a node."""
+        numbering, ordinal = self._numbering(node)
+        if numbering is None:
+            return node.get_depth()
+        return numbering.depths[ordinal]
+
+    def get_ancestors(self, node: DocumentNode) -> List[DocumentNode]:
+        """Get a node's ancestors from the root to its parent."""
+        numbering, ordinal = self._numbering(node)
+        if numbering is None:
+            return node.get_ancestors()
+        return [numbering.node(o) for o in numbering.ancestor_ordinals(ordinal)]
+
+    def get_section_heading(self, node: DocumentNode) -> Optional[DocumentNode]:
+        """Get the nearest heading above a node, None outside any section."""
+        numbering, ordinal = self._numbering(node)
+        if numbering is None:
+            parent = node.parent
+            while parent and parent.type != "heading":
+                parent = parent.parent
+            return parent
+        section = numbering.sections[ordinal]
+        return None if section == NONE else numbering.node(section)
+
+    def get_heading_path(self, node: DocumentNode) -> List[DocumentNode]:
+        """Get the headings enclosing a node, outermost first (breadcrumbs)."""
+        numbering, ordinal = self._numbering(node)
+        if numbering is None:
+            return [a for a in node.get_ancestors() if a.type == "heading"]
+        return [numbering.node(o) for o in numbering.section_ordinals(ordinal)]
+
+    def is_ancestor(self, ancestor: DocumentNode, node: DocumentNode) -> bool:
+        """Check whether ``ancestor`` is ``node`` or one of its ancestors."""
+        numbering, ordinal = self._numbering(node)
+        if numbering is not None:
+            top = numbering.ordinal_of(ancestor)
+            if top is not None:
+                return numbering.contains(top, ordinal)
+        current = node
+        while current is not None and current is not ancestor:
+            current = current.parent
+        return current is not None
+
+    def get_subtree(self, node: DocumentNode) -> List[DocumentNode]:
+        """Get a node and all its descendants in document order."""
+        numbering, ordinal = self._numbering(node)
+        if numbering is None:
+            nodes = []
+            stack = [node]
+            while stack:
+                current = stack.pop()
+                nodes.append(current)
+                stack.extend(reversed(current.get_children()))
+            return nodes
+        if numbering is self.preorder:
+            return self.preorder.subtree(ordinal)
+        end = numbering.subtree_ends[ordinal]
+        return [numbering.node(o) for o in range(ordinal, end)]
+
+    def get_section_span(self, node: DocumentNode) -> Optional[Tuple[int, int]]:
+        """Get the range of ``source_text`` holding a node and its descendants.
+
+        Parsers record each node's span at parse time, so the range runs
+        from the node's first character to the last one of its last
+        descendant. When either node has no span (CommonMark lists and
+        blockquotes) it runs from the node's line to the line of the first
+        node after its subtree, without trailing whitespace.
+
+        Args:
+            node: Node of this document
 
-    def _traverse_and_index(self, node: DocumentNode) -> None:
-        """Recursively traverse and index all nodes."""
-        if node.id:
-            self.index[node.id] = node
-        for child in node.children:
-            self._traverse_and_index(child)
+        Returns:
+            (start, end) offsets into ``source_text``, or None when the tree
+            does not map onto it
+        """
+        text = self.source_text
+        numbering, ordinal = self._numbering(node)
+        if numbering is None or not text:
+            return None
+        if ordinal == 0:
+            return 0, len(text)
+
+        end = numbering.subtree_ends[ordinal]
+        if self.tree is not None:
+            if self.tree.text is text:
+                return self.tree.starts[ordinal], self.tree.ends[end - 1]
+            line_numbers = self.tree.line_numbers
+
+            def line_of(o: int) -> Optional[int]:
+                line = line_numbers[o]
+                return None if line == NONE else line
+
+        else:
+            nodes = self.preorder.nodes
+            first, last = nodes[ordinal], nodes[end - 1]
+            if first.source is text and last.source is text:
+                return first.span[0], last.span[1]
+
+            def line_of(o: int) -> Optional[int]:
+                return nodes[o].get_attribute("line_number")
+
+        first_line = line_of(ordinal)
+        if first_line is None:
+            return None
+        next_line = None
+        for following in range(end, len(numbering)):
+            next_line = line_of(following)
+            if next_line is not None:
+                break
+
+        line_starts = self._get_line_starts()
+        start = line_starts[first_line] if first_line < len(line_starts) else len(text)
+        stop = len(text)
+        if next_line is not None and next_line < len(line_starts):
+            stop = line_starts[next_line]
+        while stop > start and text[stop - 1].isspace():
+            stop -= 1
+        return start, stop
+
+    def _get_line_starts(self) -> array:
+        """Get the offset of each line of ``source_text``, computed once."""
+        if self.line_starts is None:
+            text = self.source_text
+            line_starts = array("q", [0])
+            position = text.find("\n")
+            while position != -1:
+                line_starts.append(position + 1)
+                position = text.find("\n", position + 1)
+            self.line_starts = line_starts
+        return self.line_starts
 
     def get_node(self, node_id: str) -> Optional[DocumentNode]:
         """Get a node by ID using the index."""
+        if self.tree is not None:
+            return self.tree.get_node(node_id)
         return self.index.get(node_id)
 
+    def _get_numbering(self) -> Optional[PreorderNumbering]:
+        """Get the numbering of the whole tree, None before indexing."""
+        return self.tree if self.tree is not None else self.preorder
+
     def get_nodes_by_type(self, node_type: str) -> List[DocumentNode]:
-        """Get all nodes of a specific type."""
-        return [node for node in self.index.values() if node.type == node_type]
+        """Get all nodes of a specific type, in document order."""
+        numbering = self._get_numbering()
+        if numbering is None:
+            return [node for node in self.index.values() if node.type == node_type]
+        return [numbering.node(o) for o in numbering.type_ordinals.get(node_type, ())]
+
+    def count_nodes_by_type(self, node_type: str) -> int:
+        """Count the nodes of a specific type without collecting them."""
+        numbering = self._get_numbering()
+        if numbering is None:
+            return len(self.get_nodes_by_type(node_type))
+        return numbering.count_of_type(node_type)
+
+    def get_heading_level_counts(self) -> Dict[int, int]:
+        """Count headings per level (0 for headings without one), by level."""
+        numbering = self._get_numbering()
+        if numbering is not None:
+            return dict(numbering.heading_levels)
+        counts: Dict[int, int] = {}
+        for heading in self.get_nodes_by_type("heading"):
+            counts[heading.level or 0] = counts.get(heading.level or 0, 0) + 1
+        return dict(sorted(counts.items()))
 
     def get_headings(self, max_level: Optional[int] = None) -> List[DocumentNode]:
-        """Get all heading nodes, optionally filtered by maximum level."""
+        """Get all heading nodes, optionally filtered by maximum level.
+
+        Headings are ordered by level, then id.
+        """
+        numbering = self._get_numbering()
+        if numbering is not None:
+            return [
+                numbering.node(o) for o in numbering.sorted_heading_ordinals(max_level)
+            ]
         headings = [node for node in self.index.values() if node.type == "heading"]
         if max_level is not None:
             headings = [h for h in headings if h.level and h.level <= max_level]
         return sorted(headings, key=lambda h: (h.level or 0, h.id))
 
+    def get_search_index(self) -> InvertedIndex:
+        """Get the inverted index of node contents, building it on first use."""
+        if self.search_index is None:
+            nodes = self.get_subtree(self.root) if self.root else []
+            self.search_index = InvertedIndex.from_contents(
+                node.content for node in nodes
+            )
+        return self.search_index
+
+    def search(self, query: str, mode: str = TOKEN_MODE) -> List[SearchResult]:
+        """Search node content.
+
+        Args:
+            query: Search query string
+            mode: "token" finds nodes containing every word of the query
+                through the inverted index, with ``"phrases"`` and
+                ``A NEAR/k B`` operators (see ``parse_query``); "substring"
+                finds nodes containing the query text anywhere. Both ignore
+                case, and queries without words always match as substrings.
+
+        Returns:
+            One SearchResult per matching node, in document order
+
+        Raises:
+            ValueError: If the mode is not supported
+        """
+        check_search_mode(mode)
+        numbering = self._get_numbering()
+        if numbering is None:
+            return []
+
+        parsed = parse_query(query if mode == TOKEN_MODE else "")
+        if parsed.terms:
+            ordinals = self.get_search_index().match_query(parsed)
+        elif self.tree is not None:
+            ordinals = self.tree.search(query)
+        else:
+            query_lower = query.lower()
+            ordinals = [
+                ordinal
+                for ordinal, node in enumerate(self.preorder.nodes)
+                if query_lower in node.content.lower()
+            ]
+        return [self.make_search_result(numbering, o) for o in ordinals]
+
+    def search_ranked(
+        self, query: str, limit: int = 10
+    ) -> Tuple[int, List[SearchResult]]:
+        """Find the nodes most relevant to a query.
+
+        Nodes must match the query as in the "token" mode of ``search``,
+        phrase and NEAR operators included, and are ranked with BM25 over
+        the document's term statistics. Queries without words fall back to unranked substring
+        matches in document order.
+
+        Args:
+            query: Search query string
+            limit: Maximum number of results
+
+        Returns:
+            Tuple of (number of matching nodes, up to ``limit`` results,
+            best first with their ``score`` set)
+        """
+        parsed = parse_query(query)
+        if not parsed.terms:
+            results = self.search(query)
+            return len(results), results[:limit]
+
+        numbering = self._get_numbering()
+        if numbering is None:
+            return 0, []
+        total, hits = self.get_search_index().rank(parsed, limit)
+        results = []
+        for score, ordinal in hits:
+            result = self.make_search_result(numbering, ordinal)
+            result.score = score
+            results.append(result)
+        return total, results
+
+    def get_search_result(self, ordinal: int) -> SearchResult:
+        """Build the SearchResult for the node at a search index ordinal."""
+        return self.make_search_result(self._get_numbering(), ordinal)
+
+    def make_search_result(
+        self, numbering: PreorderNumbering, ordinal: int
+    ) -> SearchResult:
+        """Build the SearchResult for the node at ``ordinal``."""
+        node = numbering.node(ordinal)
+        section = numbering.sections[ordinal]
+        parent = None if section == NONE else numbering.node(section)
+        return SearchResult(
+            node_id=node.id,
+            section=parent.title if parent else "Document Root",
+            section_id=parent.id if parent else "root",
+            content=node.content,
+            type=node.type,
+            line_number=node.get_attribute("line_number"),
+        )
+
     def get_outline(self, max_depth: int = 3) -> List[Dict[str, Any]]:
         """Get document outline as a structured list."""
+        if self.tree is not None:
+            return self._get_columnar_outline(max_depth)
+
         outline = []
 
         def build_outline(node: DocumentNode, depth: int = 0) -> None:
@@ -149,16 +812,43 @@ class Document:
                         "has_children": bool(
                             [
                                 child
-                                for child in node.children
+                                for child in node.get_children()
                                 if child.type == "heading"
                             ]
                         ),
                     }
                 )
 
-            for child in node.children:
+            for child in node.get_children():
                 build_outline(child, depth + 1 if node.type == "heading" else depth)
 
         if self.root:
             build_outline(self.root)
         return outline
+
+    def _get_columnar_outline(self, max_depth: int) -> List[Dict[str, Any]]:
+        """Build the outline from the heading ordinals of a columnar tree."""
+        tree = self.tree
+        headings = tree.heading_ordinals()
+        if not headings:
+            return []
+
+        heading = tree.type_names.index("heading")
+        outline = []
+        for ordinal in headings:
+            depth = tree.heading_depth(ordinal)
+            if depth > max_depth or not tree.levels[ordinal]:
+                continue
+            outline.append(
+                {
+                    "id": tree.ids[ordinal],
+                    "title": tree.titles.get(ordinal, ""),
+                    "level": tree.levels[ordinal],
+                    "depth": depth,
+                    "has_children": any(
+                        tree.types[child] == heading
+                        for child in tree.child_ordinals(ordinal)
+                    ),
+                }
+            )
+        return outline
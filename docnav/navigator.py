@@ -1,15 +1,45 @@
 """Document navigation engine - DOM-like tree structure approach."""
 
+import asyncio
+import threading
+import time
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-from xml.etree import ElementTree as ET
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import tiktoken
-from markdown_it import MarkdownIt
 
-from .models import Document, DocumentNode, NavigationContext, SearchResult
-from .processors import MarkdownProcessor, PDFProcessor
+from .cache import DocumentCache, hash_file
+from .models import (
+    CorpusSearchResult,
+    DirectoryLoadResult,
+    Document,
+    DocumentNode,
+    LoadJob,
+    LoadResult,
+    ManifestEntry,
+    NavigationContext,
+    SearchResult,
+)
+from .processors import (
+    BaseProcessor,
+    MarkdownProcessor,
+    PDFProcessor,
+    ProgressCallback,
+    XMLProcessor,
+)
+from .processors.engines import parse_commonmark_tree
+from .processors.xml import parse_xml_tree
+from .search import (
+    TOKEN_MODE,
+    CorpusIndex,
+    InvertedIndex,
+    check_search_mode,
+    make_snippet,
+    parse_query,
+)
+from .tree import NONE, PreorderIndex
 
 
 class DocumentCompass:
@@ -29,7 +59,9 @@ class DocumentCompass:
         self.source_text = source_text
         self.source_format = source_format
         self.root = self._parse_document()
+        self.preorder = PreorderIndex.from_node(self.root)
         self.index = self._build_index()
+        self.search_index: Optional[InvertedIndex] = None  # built on first search
 
     def _parse_document(self) -> DocumentNode:
         """Parse document into tree structure based on format."""
@@ -41,201 +73,16 @@ class DocumentCompass:
             raise ValueError(f"Unsupported format: {self.source_format}")
 
     def _parse_xml(self) -> DocumentNode:
-        """Parse XML content into DOM tree structure."""
-        root = DocumentNode(type="document", id="root")
-        xml_root = ET.fromstring(self.source_text)
-
-        def process_element(element: ET.Element, parent_node: DocumentNode) -> None:
-            for child in element:
-                node = DocumentNode(
-                    type=child.tag,
-                    id=child.get("id", f"xml_{len(parent_node.children)}"),
-                    content=child.text if child.text else "",
-                    attributes=dict(child.attrib),
-                    parent=parent_node,
-                )
-                parent_node.children.append(node)
-                process_element(child, node)
-
-        process_element(xml_root, root)
-        return root
+        """Parse XML content into DOM tree structure in one streaming pass."""
+        return parse_xml_tree(self.source_text)
 
     def _parse_markdown(self) -> DocumentNode:
         """Parse Markdown content into DOM tree structure using markdown-it-py."""
-        root = DocumentNode(type="document", id="root")
-
-        # Initialize markdown parser with CommonMark compatibility
-        md = MarkdownIt("commonmark")
-        tokens = md.parse(self.source_text)
-
-        current_parents = [root]  # Stack to track parent nodes
-        node_counter = 0
-
-        for token in tokens:
-            if token.type == "heading_open":
-                level = int(token.tag[1])  # Extract level from h1, h2, etc.
-                node_id = f"h{level}_{node_counter}"
-
-                # Adjust parent stack based on heading level
-                while len(current_parents) > level:
-                    current_parents.pop()
-
-                # Create heading node - content will be added by heading_close
-                heading_node = DocumentNode(
-                    type="heading",
-                    level=level,
-                    id=node_id,
-                    title="",  # Will be filled by inline content
-                    content="",
-                    attributes={
-                        "line_number": token.map[0] if token.map else None,
-                        "tag": token.tag,
-                    },
-                )
-
-                current_parents[-1].children.append(heading_node)
-                heading_node.parent = current_parents[-1]
-                current_parents.append(heading_node)
-                node_counter += 1
-
-            elif token.type == "heading_close":
-                # The heading content should already be processed by inline tokens
-                pass
-
-            elif token.type == "paragraph_open":
-                # Create paragraph node
-                para_node = DocumentNode(
-                    type="paragraph",
-                    id=f"p_{node_counter}",
-                    content="",  # Will be filled by inline content
-                    attributes={
-                        "line_number": token.map[0] if token.map else None,
-                    },
-                )
-                current_parents[-1].children.append(para_node)
-                para_node.parent = current_parents[-1]
-                current_parents.append(para_node)
-                node_counter += 1
-
-            elif token.type == "paragraph_close":
-                # Pop paragraph from stack
-                if len(current_parents) > 1 and current_parents[-1].type == "paragraph":
-                    current_parents.pop()
-
-            elif token.type == "inline":
-                # Add inline content to current parent
-                if current_parents and token.content:
-                    current_node = current_parents[-1]
-                    if current_node.content:
-                        current_node.content += " " + token.content
-                    else:
-                        current_node.content = token.content
-
-                    # For headings, also set the title
-                    if current_node.type == "heading":
-                        current_node.title = token.content
-
-            elif token.type == "list_item_open":
-                # Create list item node
-                item_node = DocumentNode(
-                    type="list_item",
-                    id=f"li_{node_counter}",
-                    content="",
-                    attributes={
-                        "line_number": token.map[0] if token.map else None,
-                    },
-                )
-                current_parents[-1].children.append(item_node)
-                item_node.parent = current_parents[-1]
-                current_parents.append(item_node)
-                node_counter += 1
-
-            elif token.type == "list_item_close":
-                # Pop list item from stack
-                if len(current_parents) > 1 and current_parents[-1].type == "list_item":
-                    current_parents.pop()
-
-            elif token.type == "bullet_list_open" or token.type == "ordered_list_open":
-                # Create list node
-                list_node = DocumentNode(
-                    type="list",
-                    id=f"list_{node_counter}",
-                    content="",
-                    attributes={
-                        "list_type": (
-                            "bullet" if token.type == "bullet_list_open" else "ordered"
-                        ),
-                        "line_number": token.map[0] if token.map else None,
-                    },
-                )
-                current_parents[-1].children.append(list_node)
-                list_node.parent = current_parents[-1]
-                current_parents.append(list_node)
-                node_counter += 1
-
-            elif (
-                token.type == "bullet_list_close" or token.type == "ordered_list_close"
-            ):
-                # Pop list from stack
-                if len(current_parents) > 1 and current_parents[-1].type == "list":
-                    current_parents.pop()
-
-            elif token.type == "code_block" or token.type == "fence":
-                # Create code block node
-                code_node = DocumentNode(
-                    type="code_block",
-                    id=f"code_{node_counter}",
-                    content=token.content,
-                    attributes={
-                        "line_number": token.map[0] if token.map else None,
-                        "language": (
-                            getattr(token, "info", "").strip()
-                            if hasattr(token, "info")
-                            else ""
-                        ),
-                    },
-                )
-                current_parents[-1].children.append(code_node)
-                code_node.parent = current_parents[-1]
-                node_counter += 1
-
-            elif token.type == "blockquote_open":
-                # Create blockquote node
-                quote_node = DocumentNode(
-                    type="blockquote",
-                    id=f"quote_{node_counter}",
-                    content="",
-                    attributes={
-                        "line_number": token.map[0] if token.map else None,
-                    },
-                )
-                current_parents[-1].children.append(quote_node)
-                quote_node.parent = current_parents[-1]
-                current_parents.append(quote_node)
-                node_counter += 1
-
-            elif token.type == "blockquote_close":
-                # Pop blockquote from stack
-                if (
-                    len(current_parents) > 1
-                    and current_parents[-1].type == "blockquote"
-                ):
-                    current_parents.pop()
-
-        return root
+        return parse_commonmark_tree(self.source_text)
 
     def _build_index(self) -> Dict[str, DocumentNode]:
         """Build node index for fast lookup - similar to getElementById."""
-        index = {}
-
-        def traverse(node: DocumentNode) -> None:
-            if node.id:
-                index[node.id] = node
-            for child in node.children:
-                traverse(child)
-
-        traverse(self.root)
-        return index
+        return {node.id: node for node in self.preorder.nodes if node.id}
 
     def get_outline(self, max_depth: int = 3) -> str:
         """Get document outline as formatted string."""
@@ -249,7 +96,7 @@ class DocumentCompass:
                 indent = "  " * (depth - 1) if depth > 0 else ""
                 outline.append(f"{indent}#{node.id} - {node.title}")
 
-            for child in node.children:
+            for child in node.get_children():
                 build_outline(child, depth + 1 if node.type == "heading" else depth)
 
         build_outline(self.root)
@@ -264,52 +111,74 @@ class DocumentCompass:
         content = [node.content] if node.content else []
 
         if include_subsections:
-
-            def collect_content(n: DocumentNode) -> None:
-                for child in n.children:
-                    if child.content:
-                        content.append(child.content)
-                    if (
-                        child.type == "heading"
-                        and node.level
-                        and child.level
-                        and child.level > node.level
-                    ):
-                        content.append(child.content)
-                    collect_content(child)
-
-            collect_content(node)
+            # Descendants are the preorder slice after the node
+            for child in self.preorder.subtree(node.ordinal)[1:]:
+                if child.content:
+                    content.append(child.content)
+                if (
+                    child.type == "heading"
+                    and node.level
+                    and child.level
+                    and child.level > node.level
+                ):
+                    content.append(child.content)
 
         return "\n".join(content)
 
-    def search(self, query: str, context_lines: int = 2) -> List[SearchResult]:
-        """Search document content and return structured results."""
+    def search(
+        self, query: str, context_lines: int = 2, mode: str = TOKEN_MODE
+    ) -> List[SearchResult]:
+        """Search document content and return structured results.
+
+        Args:
+            query: Search query string
+            context_lines: Unused, kept for compatibility
+            mode: "token" matches nodes containing every word of the query
+                through an inverted index built on the first search, with
+                ``"phrases"`` and ``A NEAR/k B`` operators; "substring"
+                matches the query text anywhere in a node
+
+        Returns:
+            One SearchResult per matching node, in document order
+        """
+        check_search_mode(mode)
         results = []
+        query_lower = query.lower()
+        nodes = self.preorder.nodes
 
-        def search_node(node: DocumentNode) -> None:
-            if query.lower() in node.content.lower():
-                # Find nearest heading as context
-                parent = node.parent
-                while parent and parent.type != "heading":
-                    parent = parent.parent
-
-                section_title = parent.title if parent else "Document Root"
-
-                results.append(
-                    SearchResult(
-                        node_id=node.id,
-                        section=section_title,
-                        section_id=parent.id if parent else "root",
-                        content=node.content,
-                        type=node.type,
-                        line_number=node.attributes.get("line_number"),
-                    )
+        parsed = parse_query(query if mode == TOKEN_MODE else "")
+        if parsed.terms:
+            if self.search_index is None:
+                self.search_index = InvertedIndex.from_contents(
+                    node.content for node in nodes
                 )
+            matches = self.search_index.match_query(parsed)
+        else:
+            matches = [
+                ordinal
+                for ordinal, node in enumerate(nodes)
+                if query_lower in node.content.lower()
+            ]
 
-            for child in node.children:
-                search_node(child)
+        for ordinal in matches:
+            node = nodes[ordinal]
+            # Nearest heading as context
+            section = self.preorder.sections[ordinal]
+            parent = None if section == NONE else nodes[section]
+
+            section_title = parent.title if parent else "Document Root"
+
+            results.append(
+                SearchResult(
+                    node_id=node.id,
+                    section=section_title,
+                    section_id=parent.id if parent else "root",
+                    content=node.content,
+                    type=node.type,
+                    line_number=node.get_attribute("line_number"),
+                )
+            )
 
-        search_node(self.root)
         return results
 
     def get_navigation_context(self, node_id: str) -> NavigationContext:
@@ -330,7 +199,7 @@ class DocumentCompass:
             parent_info = {"id": parent.id, "title": parent.title}
 
             # Get siblings (same-level headings)
-            for sibling in parent.children:
+            for sibling in parent.get_children():
                 if sibling.type == "heading":
                     siblings.append(
                         {
@@ -341,15 +210,14 @@ class DocumentCompass:
                     )
 
         # Get children (direct child headings)
-        for child in node.children:
+        for child in node.get_children():
             if child.type == "heading":
                 children.append({"id": child.id, "title": child.title})
 
-        # Build breadcrumbs
-        ancestors = node.get_ancestors()
-        for ancestor in ancestors:
-            if ancestor.type == "heading":
-                breadcrumbs.append({"id": ancestor.id, "title": ancestor.title})
+        # Build breadcrumbs from the heading ancestors
+        for section in self.preorder.section_ordinals(node.ordinal):
+            ancestor = self.preorder.nodes[section]
+            breadcrumbs.append({"id": ancestor.id, "title": ancestor.title})
 
         return NavigationContext(
             current=current_info,
@@ -377,6 +245,16 @@ class DocumentCompass:
             words = len(self.source_text.split())
             return int(words / 0.75)
 
+    def _collect_text_content(self) -> str:
+        """Join the stripped content and titles of all nodes in preorder."""
+        content_parts = []
+        for node in self.preorder.nodes:
+            if node.content and node.content.strip():
+                content_parts.append(node.content.strip())
+            if node.title and node.title.strip():
+                content_parts.append(node.title.strip())
+        return " ".join(content_parts)
+
     def get_content_tokens(self, encoding_name: str = "cl100k_base") -> int:
         """Calculate token count for structured content only (excluding markup).
 
@@ -390,34 +268,12 @@ class DocumentCompass:
             encoding = tiktoken.get_encoding(encoding_name)
 
             # Collect all text content from nodes
-            content_parts = []
-
-            def collect_text_content(node: DocumentNode) -> None:
-                if node.content and node.content.strip():
-                    content_parts.append(node.content.strip())
-                if hasattr(node, "title") and node.title and node.title.strip():
-                    content_parts.append(node.title.strip())
-                for child in node.children:
-                    collect_text_content(child)
-
-            collect_text_content(self.root)
-            content_text = " ".join(content_parts)
+            content_text = self._collect_text_content()
 
             return len(encoding.encode(content_text))
         except Exception:
             # Fallback estimation
-            content_parts = []
-
-            def collect_text_content_fallback(node: DocumentNode) -> None:
-                if node.content and node.content.strip():
-                    content_parts.append(node.content.strip())
-                if hasattr(node, "title") and node.title and node.title.strip():
-                    content_parts.append(node.title.strip())
-                for child in node.children:
-                    collect_text_content_fallback(child)
-
-            collect_text_content_fallback(self.root)
-            content_text = " ".join(content_parts)
+            content_text = self._collect_text_content()
             words = len(content_text.split())
             return int(words / 0.75)
 
@@ -430,19 +286,118 @@ class DocumentNavigator:
     for security and uniqueness.
     """
 
-    def __init__(self) -> None:
-        """Initialize the document navigator."""
+    def __init__(
+        self,
+        cache: Optional[DocumentCache] = None,
+        processors: Optional[List[BaseProcessor]] = None,
+        load_workers: int = 4,
+        columnar_min_nodes: Optional[int] = None,
+    ) -> None:
+        """Initialize the document navigator.
+
+        Args:
+            cache: Optional persistent parse cache used by file loads
+            processors: Processors to use, defaults to markdown and PDF
+                processors with default settings. The first one is the
+                fallback for unknown file types.
+            load_workers: Worker threads of the load executor that runs every
+                file load: background loads (start_load), batch and directory
+                loads, and server load calls (run_load)
+            columnar_min_nodes: Node count from which loaded documents are
+                moved into columnar storage (see ``Document.compact``);
+                None keeps every document as a node object tree
+        """
+        self.cache = cache
+        self.columnar_min_nodes = columnar_min_nodes
         self.loaded_documents: Dict[str, Document] = {}
         self.document_metadata: Dict[
             str, Dict[str, str]
         ] = {}  # Store metadata by doc_id
 
         # Initialize processors
-        self.processors = [
+        self.processors = processors or [
             MarkdownProcessor(),
             PDFProcessor(),
+            XMLProcessor(),
         ]
 
+        # Background load jobs by the doc_id they will register under
+        self.load_jobs: Dict[str, LoadJob] = {}
+        self.load_workers = load_workers
+        self._load_executor: Optional[ThreadPoolExecutor] = None
+
+        # Directory manifests by (directory, glob), each mapping file path
+        # to the state it had when loaded
+        self.directory_manifests: Dict[Tuple[str, str], Dict[str, ManifestEntry]] = {}
+
+        # Token indexes of the loaded documents for search_all. Registered
+        # documents wait in _corpus_pending until the next corpus search
+        # builds their index, so loads never pay for it
+        self.corpus_index = CorpusIndex()
+        self._corpus_pending: Dict[str, Document] = {}
+
+        # Guards loaded_documents/document_metadata/corpus_index across
+        # worker threads
+        self._documents_lock = threading.RLock()
+
+        # In-flight file loads keyed by normalized path (single-flight)
+        self._inflight_loads: Dict[str, "Future[Tuple[str, Document]]"] = {}
+        self._inflight_lock = threading.Lock()
+
+    def _get_load_executor(self) -> ThreadPoolExecutor:
+        """Get the load executor, creating it on first use."""
+        with self._documents_lock:
+            if self._load_executor is None:
+                self._load_executor = ThreadPoolExecutor(
+                    max_workers=self.load_workers, thread_name_prefix="docnav-load"
+                )
+            return self._load_executor
+
+    def _run_parallel(
+        self, fn: Callable[[Any], Any], items: List[Any], max_workers: int
+    ) -> List[Any]:
+        """Apply a function to items on the load executor, in input order.
+
+        The calling thread works through the items too, with up to
+        ``max_workers - 1`` helpers on the executor. Helpers that have not
+        started when the items run out are cancelled, so a call made from an
+        executor thread finishes even when every other thread is busy.
+        """
+        results: List[Any] = [None] * len(items)
+        positions = iter(range(len(items)))
+        positions_lock = threading.Lock()
+
+        def work() -> None:
+            while True:
+                with positions_lock:
+                    index = next(positions, None)
+                if index is None:
+                    return
+                results[index] = fn(items[index])
+
+        executor = self._get_load_executor()
+        helpers = [executor.submit(work) for _ in range(max_workers - 1)]
+        work()
+        for helper in helpers:
+            if not helper.cancel():
+                helper.result()
+        return results
+
+    async def run_load(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking load call on the load executor.
+
+        Lets async callers share the load executor's limit instead of
+        starting threads of their own.
+
+        Args:
+            fn: Blocking callable, e.g. ``load_document_from_file_sync``
+            *args: Arguments for the callable
+
+        Returns:
+            The callable's return value
+        """
+        return await asyncio.wrap_future(self._get_load_executor().submit(fn, *args))
+
     def _generate_doc_id(self) -> str:
         """Generate a unique document ID using UUID."""
         return str(uuid.uuid4())
@@ -464,8 +419,208 @@ class DocumentNavigator:
         except (OSError, ValueError) as e:
             raise ValueError(f"Invalid file path: {e}")
 
+    def _parser_id(self, processor: BaseProcessor, engine: Optional[str] = None) -> str:
+        """Get the cache identifier of a processor's parsing output."""
+        if engine is None:
+            return processor.get_cache_id()
+        return processor.get_cache_id(engine)
+
+    def _flight_key(self, normalized_path: str, engine: Optional[str]) -> str:
+        """Get the single-flight key of a file load."""
+        # Loads with an explicit engine only share work with the same engine
+        return normalized_path if engine is None else f"{normalized_path}|{engine}"
+
+    def _cache_lookup(
+        self, file_path: Path, parser: str
+    ) -> Tuple[Optional[str], Optional[Document]]:
+        """Look up a parsed document in the persistent cache.
+
+        Args:
+            file_path: Path to the source file
+            parser: Parser identifier included in the cache key
+
+        Returns:
+            Tuple of (cache_key, Document); both are None without a cache and
+            the document is None on a miss
+        """
+        if self.cache is None:
+            return None, None
+
+        try:
+            key = self.cache.key_for_file(file_path, parser)
+        except OSError:
+            return None, None
+
+        document = self.cache.get(key)
+        if document is not None:
+            # Same content may live under a different path than when cached
+            document.file_path = file_path
+            document.title = file_path.stem
+            if document.is_streamed:
+                document.set_file_source(file_path)
+        return key, document
+
+    def _cache_store(self, key: Optional[str], document: Document) -> None:
+        """Store a parsed document in the persistent cache (best effort)."""
+        if self.cache is None or key is None:
+            return
+        try:
+            self.cache.put(key, document)
+        except Exception:
+            # A failing cache must never fail the load itself
+            pass
+
+    def clear_cache(self) -> int:
+        """Remove all entries from the persistent parse cache.
+
+        Returns:
+            Number of cache entries removed
+        """
+        if self.cache is None:
+            return 0
+        return self.cache.clear()
+
+    def _join_inflight_load(
+        self, normalized_path: str
+    ) -> Tuple["Future[Tuple[str, Document]]", bool]:
+        """Join the in-flight load of a file or start a new one.
+
+        Args:
+            normalized_path: Normalized path identifying the file
+
+        Returns:
+            Tuple of (future, is_leader). The leader performs the load and
+            resolves the future; other callers wait on it.
+        """
+        with self._inflight_lock:
+            future = self._inflight_loads.get(normalized_path)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._inflight_loads[normalized_path] = future
+            return future, True
+
+    def _finish_inflight_load(
+        self,
+        normalized_path: str,
+        future: "Future[Tuple[str, Document]]",
+        result: Optional[Tuple[str, Document]] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """Resolve an in-flight load and release its slot."""
+        with self._inflight_lock:
+            self._inflight_loads.pop(normalized_path, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _register_file_document(
+        self,
+        document: Document,
+        file_path: Path,
+        normalized_path: str,
+        cached: bool = False,
+        doc_id: Optional[str] = None,
+    ) -> Tuple[str, Document]:
+        """Store a document loaded from a file and record its metadata."""
+        doc_id = doc_id or self._generate_doc_id()
+        self._maybe_compact(document)
+        with self._documents_lock:
+            self.loaded_documents[doc_id] = document
+            self._update_corpus_index(doc_id, document)
+            self.document_metadata[doc_id] = {
+                "title": file_path.name,
+                "format": document.source_format,
+                "source_type": "file",
+                "file_path": normalized_path,
+                "created_at": str(uuid.uuid1().time),
+                "cached": "true" if cached else "false",
+            }
+
+        return doc_id, document
+
+    def _update_corpus_index(self, doc_id: str, document: Document) -> None:
+        """Queue a registered document for the corpus index; hold the lock.
+
+        Lazily loaded PDFs and streamed files are left out: they do not keep
+        their text in memory, and lazy PDFs gain nodes as pages convert.
+        """
+        # A re-registered document replaces the indexed one
+        self.corpus_index.remove(doc_id)
+        if document.is_lazy or document.is_streamed:
+            self._corpus_pending.pop(doc_id, None)
+        else:
+            self._corpus_pending[doc_id] = document
+
+    def _index_pending_documents(self) -> None:
+        """Add documents registered since the last corpus search to the index."""
+        with self._documents_lock:
+            pending = list(self._corpus_pending.items())
+
+        for doc_id, document in pending:
+            # Built outside the lock; documents memoize their index
+            search_index = document.get_search_index()
+            with self._documents_lock:
+                # Skip documents removed or replaced in the meantime
+                if self._corpus_pending.get(doc_id) is document:
+                    del self._corpus_pending[doc_id]
+                    self.corpus_index.add(doc_id, search_index)
+
+    def _maybe_compact(self, document: Document) -> None:
+        """Move a large document into columnar storage if configured."""
+        if self.columnar_min_nodes is None or document.is_lazy:
+            # Lazy outlines are small and grow as pages are converted
+            return
+        if document.is_streamed:
+            # Columnar trees copy all content into one buffer, undoing streaming
+            return
+        if document.node_count >= self.columnar_min_nodes:
+            document.compact()
+
+    def _build_text_document(
+        self,
+        content: str,
+        format: str,
+        title: Optional[str],
+        engine: Optional[str] = None,
+    ) -> Document:
+        """Parse text content into a Document without registering it."""
+        if format == "markdown":
+            # Same parse engines as file loads, so trees match across paths
+            processor = self._find_processor(Path("content.md"))
+            document = processor.process_content(content, engine=engine)
+            document.title = title or "Untitled Document"
+            return document
+
+        if format == "xml":
+            processor = self._find_processor(Path("content.xml"))
+            if processor.can_process(Path("content.xml")):
+                document = processor.process_content(content)
+                document.title = title or "Untitled Document"
+                return document
+
+        document = Document(
+            file_path=None,
+            title=title or "Untitled Document",
+            source_text=content,
+            source_format=format,
+        )
+
+        # For other formats, create a simple root node
+        root = DocumentNode(type="document", id="root")
+        root.content = content
+        document.root = root
+        document.rebuild_index()
+
+        return document
+
     def load_document_from_text_sync(
-        self, content: str, format: str = "markdown", title: Optional[str] = None
+        self,
+        content: str,
+        format: str = "markdown",
+        title: Optional[str] = None,
+        engine: Optional[str] = None,
     ) -> Tuple[str, Document]:
         """Load document from text content (synchronous version).
 
@@ -473,48 +628,27 @@ class DocumentNavigator:
             content: Document text content
             format: Document format (markdown, xml, etc.)
             title: Optional document title
+            engine: Optional parse engine ("auto", "scanner" or "commonmark")
 
         Returns:
             Tuple of (doc_id, Document) where doc_id is auto-generated UUID
         """
         try:
-            # For sync version, use the old DocumentCompass approach for text
-            # since we can't await in sync methods
             doc_id = self._generate_doc_id()
+            document = self._build_text_document(content, format, title, engine)
+            self._maybe_compact(document)
 
-            # Create a Document object manually for text content
-            from .models import Document, DocumentNode
-
-            document = Document(
-                file_path=None,
-                title=title or "Untitled Document",
-                source_text=content,
-                source_format=format,
-            )
-
-            # Create simple document structure for text
-            if format == "markdown":
-                # Use the old DocumentCompass for parsing markdown text
-                compass = DocumentCompass(content, format)
-                # Convert compass structure to Document structure
-                document.root = compass.root
-                document.rebuild_index()
-            else:
-                # For other formats, create a simple root node
-                root = DocumentNode(type="document", id="root")
-                root.content = content
-                document.root = root
-                document.rebuild_index()
-
-            self.loaded_documents[doc_id] = document
+            with self._documents_lock:
+                self.loaded_documents[doc_id] = document
+                self._update_corpus_index(doc_id, document)
 
-            # Store metadata
-            self.document_metadata[doc_id] = {
-                "title": title or "Untitled Document",
-                "format": format,
-                "source_type": "text",
-                "created_at": str(uuid.uuid1().time),
-            }
+                # Store metadata
+                self.document_metadata[doc_id] = {
+                    "title": title or "Untitled Document",
+                    "format": format,
+                    "source_type": "text",
+                    "created_at": str(uuid.uuid1().time),
+                }
 
             return doc_id, document
 
@@ -522,7 +656,11 @@ class DocumentNavigator:
             raise ValueError(f"Error loading document: {str(e)}")
 
     async def load_document_from_text(
-        self, content: str, format: str = "markdown", title: Optional[str] = None
+        self,
+        content: str,
+        format: str = "markdown",
+        title: Optional[str] = None,
+        engine: Optional[str] = None,
     ) -> Tuple[str, Document]:
         """Load document from text content.
 
@@ -530,36 +668,31 @@ class DocumentNavigator:
             content: Document text content
             format: Document format (markdown, xml, etc.)
             title: Optional document title
+            engine: Optional parse engine ("auto", "scanner" or "commonmark")
 
         Returns:
             Tuple of (doc_id, Document) where doc_id is auto-generated UUID
         """
         try:
-            # Create a temporary file to use with processors
-            import tempfile
-
-            # Determine file extension based on format
+            # Pick the processor by the extension the format would have
             ext_map = {"markdown": ".md", "xml": ".xml", "pdf": ".pdf"}
             ext = ext_map.get(format, ".md")
+            processor = self._find_processor(Path(f"content{ext}"))
 
-            with tempfile.NamedTemporaryFile(
-                mode="w", suffix=ext, delete=False, encoding="utf-8"
-            ) as f:
-                f.write(content)
-                temp_path = Path(f.name)
-
-            try:
-                # Find appropriate processor
-                processor = self._find_processor(temp_path)
-
-                # Process the document
-                document = await processor.process(temp_path)
-                doc_id = self._generate_doc_id()
+            # Process the content in memory
+            if engine is None:
+                document = processor.process_content(content)
+            else:
+                document = processor.process_content(content, engine=engine)
+            doc_id = self._generate_doc_id()
 
-                # Update document metadata
-                document.title = title or "Untitled Document"
+            # Update document metadata
+            document.title = title or "Untitled Document"
+            self._maybe_compact(document)
 
+            with self._documents_lock:
                 self.loaded_documents[doc_id] = document
+                self._update_corpus_index(doc_id, document)
 
                 # Store metadata
                 self.document_metadata[doc_id] = {
@@ -569,19 +702,24 @@ class DocumentNavigator:
                     "created_at": str(uuid.uuid1().time),
                 }
 
-                return doc_id, document
-            finally:
-                # Clean up temporary file
-                temp_path.unlink()
+            return doc_id, document
 
         except Exception as e:
             raise ValueError(f"Error loading document: {str(e)}")
 
-    def load_document_from_file_sync(self, file_path: Path) -> Tuple[str, Document]:
+    def load_document_from_file_sync(
+        self, file_path: Path, engine: Optional[str] = None
+    ) -> Tuple[str, Document]:
         """Load document from file (synchronous version).
 
+        Concurrent loads of the same file are coalesced: callers arriving while
+        a load is in flight wait for it and share its doc_id and parsed tree,
+        which must therefore be treated as read-only.
+
         Args:
             file_path: Path to the document file
+            engine: Optional parse engine ("auto", "scanner" or "commonmark"),
+                defaults to the processor's engine
 
         Returns:
             Tuple of (doc_id, Document) where doc_id is auto-generated UUID
@@ -592,104 +730,333 @@ class DocumentNavigator:
         # Normalize path to prevent injection issues
         normalized_path = self._normalize_file_path(file_path)
 
+        flight_key = self._flight_key(normalized_path, engine)
+        flight, is_leader = self._join_inflight_load(flight_key)
+        if not is_leader:
+            return flight.result()
+
+        try:
+            result = self._load_file_sync(file_path, normalized_path, engine)
+        except BaseException as e:
+            self._finish_inflight_load(flight_key, flight, error=e)
+            raise
+        self._finish_inflight_load(flight_key, flight, result=result)
+        return result
+
+    def _load_file_sync(
+        self, file_path: Path, normalized_path: str, engine: Optional[str] = None
+    ) -> Tuple[str, Document]:
+        """Load and register a file without in-flight coalescing."""
         try:
             # Check if we're in an async context (like MCP server)
-            import asyncio
-
             try:
                 # Try to get the running event loop
                 asyncio.get_running_loop()
                 # If we get here, we're in an async context
                 # Fall back to sync processing immediately
-                return self._load_file_fallback_sync(file_path)
+                return self._load_file_fallback_sync(file_path, engine)
             except RuntimeError:
                 # No running event loop, we can use asyncio.run
-                processor = self._find_processor(file_path)
-                document = asyncio.run(processor.process(file_path))
-
-                doc_id = self._generate_doc_id()
-                self.loaded_documents[doc_id] = document
-
-                # Store metadata with normalized path
-                self.document_metadata[doc_id] = {
-                    "title": file_path.name,
-                    "format": document.source_format,
-                    "source_type": "file",
-                    "file_path": normalized_path,
-                    "created_at": str(uuid.uuid1().time),
-                }
-
-                return doc_id, document
+                return self._process_file_sync(
+                    file_path, normalized_path, engine=engine
+                )
 
         except Exception as e:
             # For any error, fall back to sync processing
             try:
-                return self._load_file_fallback_sync(file_path)
+                return self._load_file_fallback_sync(file_path, engine)
             except Exception as fallback_error:
                 raise ValueError(
                     f"Error loading document: {str(e)}. Fallback also failed: {str(fallback_error)}"
                 )
 
-    def _load_file_fallback_sync(self, file_path: Path) -> Tuple[str, Document]:
-        """Fallback sync file loading for when async processors can't be used."""
-        normalized_path = self._normalize_file_path(file_path)
+    def _process_file_sync(
+        self,
+        file_path: Path,
+        normalized_path: str,
+        doc_id: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+        engine: Optional[str] = None,
+    ) -> Tuple[str, Document]:
+        """Process a file with its processor and register it.
 
-        # Handle PDF files directly with pymupdf4llm (which is actually sync)
-        if file_path.suffix.lower() == ".pdf":
+        Must be called from a thread without a running event loop.
+        """
+        processor = self._find_processor(file_path)
+        cache_key, document = self._cache_lookup(
+            file_path, self._parser_id(processor, engine)
+        )
+        cached = document is not None
+        if document is None:
+            # Optional arguments are only passed when set
+            options = {}
+            if progress is not None:
+                options["progress"] = progress
+            if engine is not None:
+                options["engine"] = engine
+            document = asyncio.run(processor.process(file_path, **options))
+            self._cache_store(cache_key, document)
+
+        return self._register_file_document(
+            document, file_path, normalized_path, cached, doc_id
+        )
+
+    def load_documents_sync(
+        self, file_paths: List[Path], max_workers: Optional[int] = None
+    ) -> List[LoadResult]:
+        """Load several documents concurrently.
+
+        Failures are reported per file and do not stop the other loads.
+
+        Args:
+            file_paths: Paths to the document files
+            max_workers: Maximum concurrent loads, defaults to ``load_workers``
+
+        Returns:
+            One LoadResult per path, in input order
+        """
+        if not file_paths:
+            return []
+
+        def load_one(file_path: Path) -> LoadResult:
+            started = time.perf_counter()
+            result = LoadResult(file_path=str(file_path))
             try:
-                import pymupdf4llm
+                doc_id, _ = self.load_document_from_file_sync(file_path)
+                metadata = self.get_document_metadata(doc_id) or {}
+                result.doc_id = doc_id
+                result.cached = metadata.get("cached") == "true"
+            except Exception as e:
+                result.error = str(e)
+            result.seconds = time.perf_counter() - started
+            return result
+
+        workers = max(1, min(max_workers or self.load_workers, len(file_paths)))
+        return self._run_parallel(load_one, file_paths, workers)
+
+    def load_directory_sync(
+        self,
+        directory: Path,
+        pattern: str = "**/*.md",
+        max_workers: Optional[int] = None,
+    ) -> DirectoryLoadResult:
+        """Load every matching file under a directory, incrementally.
+
+        A manifest of (path, mtime, size, content hash) per file is kept for
+        each directory and pattern. Calling again on the same tree only
+        reparses files whose content changed, keeping their doc_id, loads new
+        files and removes documents of files that were deleted.
+
+        Args:
+            directory: Directory to scan
+            pattern: Glob pattern relative to the directory
+            max_workers: Maximum concurrent loads, defaults to ``load_workers``
+
+        Returns:
+            DirectoryLoadResult listing added, updated, unchanged, removed
+            and failed files with the doc_id of every loaded file
+        """
+        if not directory.is_dir():
+            raise NotADirectoryError(f"Not a directory: {directory}")
+
+        started = time.perf_counter()
+        root = self._normalize_file_path(directory)
+        result = DirectoryLoadResult(directory=root, pattern=pattern)
+        files = {
+            self._normalize_file_path(path): path
+            for path in sorted(directory.glob(pattern))
+            if path.is_file()
+        }
 
-                # Convert PDF to markdown using pymupdf4llm (this is actually synchronous)
-                markdown_content = pymupdf4llm.to_markdown(str(file_path))
+        with self._documents_lock:
+            manifest = dict(self.directory_manifests.get((root, pattern), {}))
 
-                # Create Document object
-                from .models import Document
+        # Documents of deleted files are dropped
+        for path in sorted(set(manifest) - set(files)):
+            self.remove_document(manifest.pop(path).doc_id)
+            result.removed.append(path)
 
-                document = Document(
-                    file_path=file_path,
-                    title=file_path.stem,
-                    source_text=markdown_content,
-                    source_format="pdf",
+        def refresh(path: str) -> Tuple[str, Optional[ManifestEntry], str]:
+            """Bring one file up to date, returning its status."""
+            file_path = files[path]
+            entry = manifest.get(path)
+            try:
+                # The file may be gone or unreadable since the glob
+                stat = file_path.stat()
+                if entry is not None and self.get_document(entry.doc_id) is not None:
+                    if (entry.mtime, entry.size) == (stat.st_mtime, stat.st_size):
+                        return "unchanged", entry, ""
+                    content_hash = hash_file(file_path)
+                    if content_hash == entry.content_hash:
+                        # Touched but not edited
+                        entry = ManifestEntry(
+                            path,
+                            stat.st_mtime,
+                            stat.st_size,
+                            content_hash,
+                            entry.doc_id,
+                        )
+                        return "unchanged", entry, ""
+                else:
+                    content_hash = hash_file(file_path)
+
+                doc_id, _ = self._process_file_sync(
+                    file_path, path, entry.doc_id if entry else None
                 )
+            except Exception as e:
+                return "error", None, str(e)
+
+            status = "updated" if entry is not None else "added"
+            return (
+                status,
+                ManifestEntry(path, stat.st_mtime, stat.st_size, content_hash, doc_id),
+                "",
+            )
+
+        # Worker threads have no running event loop, so processors run there
+        paths = list(files)
+        workers = max(1, min(max_workers or self.load_workers, len(paths)))
+        outcomes = self._run_parallel(refresh, paths, workers)
+
+        for path, (status, entry, error) in zip(paths, outcomes):
+            if status == "error":
+                result.errors[path] = error
+                stale = manifest.pop(path, None)
+                if stale is not None:
+                    self.remove_document(stale.doc_id)
+                continue
+            manifest[path] = entry
+            result.doc_ids[path] = entry.doc_id
+            getattr(result, status).append(path)
+
+        with self._documents_lock:
+            self.directory_manifests[(root, pattern)] = manifest
+
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def start_load(self, file_path: Path) -> str:
+        """Start loading a document in the background.
+
+        The document is registered under the returned doc_id once loaded;
+        until then ``get_load_job`` reports the phase, page progress and
+        elapsed time of the load.
+
+        Args:
+            file_path: Path to the document file
+
+        Returns:
+            Auto-generated UUID the document will be registered under
+        """
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        normalized_path = self._normalize_file_path(file_path)
+        doc_id = self._generate_doc_id()
+        job = LoadJob(doc_id=doc_id, file_path=normalized_path)
+
+        with self._documents_lock:
+            self.load_jobs[doc_id] = job
+
+        self._get_load_executor().submit(
+            self._run_load_job, job, file_path, normalized_path
+        )
+        return doc_id
+
+    def get_load_job(self, doc_id: str) -> Optional[LoadJob]:
+        """Get the background load job for a document.
+
+        Args:
+            doc_id: UUID returned by ``start_load``
+
+        Returns:
+            LoadJob or None if no background load used this ID
+        """
+        try:
+            uuid.UUID(doc_id)
+        except ValueError:
+            return None
 
-                # Use markdown processor to parse the converted content
-                # Create temporary file for processing
-                import tempfile
+        return self.load_jobs.get(doc_id)
 
-                with tempfile.NamedTemporaryFile(
-                    mode="w", suffix=".md", delete=False, encoding="utf-8"
-                ) as f:
-                    f.write(markdown_content)
-                    temp_path = Path(f.name)
+    def _run_load_job(
+        self, job: LoadJob, file_path: Path, normalized_path: str
+    ) -> None:
+        """Run a background load, recording progress on the job."""
 
+        def progress(phase: str, done: int, total: Optional[int]) -> None:
+            job.phase = phase
+            # Phases without a page count keep the last reported page progress
+            if total is not None:
+                job.pages_done = done
+                job.pages_total = total
+
+        try:
+            flight, is_leader = self._join_inflight_load(normalized_path)
+            if is_leader:
                 try:
-                    # Use the markdown processor synchronously by creating a simple parser
-                    from .processors.markdown import MarkdownProcessor
+                    result = self._process_file_sync(
+                        file_path, normalized_path, job.doc_id, progress
+                    )
+                except BaseException as e:
+                    self._finish_inflight_load(normalized_path, flight, error=e)
+                    raise
+                self._finish_inflight_load(normalized_path, flight, result=result)
+            else:
+                # Share the tree of the load already in flight
+                _, document = flight.result()
+                self._register_file_document(
+                    document, file_path, normalized_path, doc_id=job.doc_id
+                )
 
-                    md_processor = MarkdownProcessor()
+            job.phase = "tokenize"
+            self.get_document_tokens(job.doc_id)
+            job.phase = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.phase = "error"
+        finally:
+            job.finished_at = time.monotonic()
 
-                    # Parse using the internal parsing method directly
-                    root = md_processor._parse_markdown_to_tree(markdown_content)
-                    document.root = root
-                    document.rebuild_index()
+    def _load_file_fallback_sync(
+        self, file_path: Path, engine: Optional[str] = None
+    ) -> Tuple[str, Document]:
+        """Fallback sync file loading for when async processors can't be used."""
+        normalized_path = self._normalize_file_path(file_path)
 
-                finally:
-                    temp_path.unlink()  # Clean up
+        # Handle PDF files directly with pymupdf4llm (which is actually sync)
+        if file_path.suffix.lower() == ".pdf":
+            cache_key, cached_document = self._cache_lookup(
+                file_path, self._parser_id(self._find_processor(file_path), engine)
+            )
+            if cached_document is not None:
+                return self._register_file_document(
+                    cached_document, file_path, normalized_path, cached=True
+                )
 
-                # Generate doc ID and store
-                doc_id = self._generate_doc_id()
-                self.loaded_documents[doc_id] = document
+            try:
+                pdf_processor = self._find_processor(file_path)
+                if getattr(pdf_processor, "lazy", False):
+                    # Outline only, pages are converted on demand
+                    document = pdf_processor.build_lazy_document(file_path)
+                    self._cache_store(cache_key, document)
+                    return self._register_file_document(
+                        document, file_path, normalized_path
+                    )
 
-                # Store metadata
-                self.document_metadata[doc_id] = {
-                    "title": file_path.name,
-                    "format": "pdf",
-                    "source_type": "file",
-                    "file_path": normalized_path,
-                    "created_at": str(uuid.uuid1().time),
-                }
+                # Convert PDF to markdown with the configured processor
+                # (pymupdf4llm is actually synchronous)
+                markdown_content = pdf_processor.convert_to_markdown(file_path)
+
+                document = pdf_processor.markdown_to_document(
+                    markdown_content, file_path, engine=engine
+                )
 
-                return doc_id, document
+                self._cache_store(cache_key, document)
+
+                return self._register_file_document(
+                    document, file_path, normalized_path
+                )
 
             except ImportError:
                 raise ValueError(
@@ -699,34 +1066,61 @@ class DocumentNavigator:
                 raise ValueError(f"Error processing PDF file: {str(e)}")
 
         # For markdown and other text files
-        content = file_path.read_text(encoding="utf-8")
         format_map = {
             ".md": "markdown",
             ".markdown": "markdown",
             ".xml": "xml",
+            ".dbk": "xml",
+            ".dita": "xml",
+            ".ditamap": "xml",
         }
         file_format = format_map.get(file_path.suffix.lower(), "markdown")
 
-        # Use the sync text loading method
-        doc_id, document = self.load_document_from_text_sync(
-            content, file_format, file_path.stem
-        )
+        if file_format == "markdown":
+            parser = self._parser_id(self._find_processor(Path("content.md")), engine)
+        elif self._find_processor(Path("content.xml")).can_process(Path("content.xml")):
+            parser = self._parser_id(self._find_processor(Path("content.xml")))
+        else:
+            parser = f"DocumentCompass/{file_format}"
+        cache_key, document = self._cache_lookup(file_path, parser)
+        if document is not None:
+            return self._register_file_document(
+                document, file_path, normalized_path, cached=True
+            )
 
-        # Update metadata to reflect file source
-        self.document_metadata[doc_id].update(
-            {
-                "source_type": "file",
-                "file_path": normalized_path,
-            }
+        if file_format == "markdown":
+            processor = self._find_processor(Path("content.md"))
+            if getattr(processor, "stream_min_bytes", None) is not None and (
+                processor.should_stream(file_path, engine)
+            ):
+                document = processor.build_streamed_document(file_path)
+                self._cache_store(cache_key, document)
+                return self._register_file_document(
+                    document, file_path, normalized_path
+                )
+
+        # Parse with the same text pipeline used for sync text loads
+        content = file_path.read_text(encoding="utf-8")
+        document = self._build_text_document(
+            content, file_format, file_path.stem, engine
         )
+        document.file_path = file_path
+        self._cache_store(cache_key, document)
 
-        return doc_id, document
+        return self._register_file_document(document, file_path, normalized_path)
 
-    async def load_document_from_file(self, file_path: Path) -> Tuple[str, Document]:
+    async def load_document_from_file(
+        self, file_path: Path, engine: Optional[str] = None
+    ) -> Tuple[str, Document]:
         """Load document from file.
 
+        Concurrent loads of the same file share one in-flight load, see
+        ``load_document_from_file_sync``.
+
         Args:
             file_path: Path to the document file
+            engine: Optional parse engine ("auto", "scanner" or "commonmark"),
+                defaults to the processor's engine
 
         Returns:
             Tuple of (doc_id, Document) where doc_id is auto-generated UUID
@@ -737,25 +1131,42 @@ class DocumentNavigator:
         # Normalize path to prevent injection issues
         normalized_path = self._normalize_file_path(file_path)
 
+        flight_key = self._flight_key(normalized_path, engine)
+        flight, is_leader = self._join_inflight_load(flight_key)
+        if not is_leader:
+            return await asyncio.wrap_future(flight)
+
+        try:
+            result = await self._load_file(file_path, normalized_path, engine)
+        except BaseException as e:
+            self._finish_inflight_load(flight_key, flight, error=e)
+            raise
+        self._finish_inflight_load(flight_key, flight, result=result)
+        return result
+
+    async def _load_file(
+        self, file_path: Path, normalized_path: str, engine: Optional[str] = None
+    ) -> Tuple[str, Document]:
+        """Load and register a file without in-flight coalescing."""
         try:
             # Find appropriate processor for this file type
             processor = self._find_processor(file_path)
 
-            # Process the document
-            document = await processor.process(file_path)
-            doc_id = self._generate_doc_id()
-            self.loaded_documents[doc_id] = document
-
-            # Store metadata with normalized path
-            self.document_metadata[doc_id] = {
-                "title": file_path.name,
-                "format": document.source_format,
-                "source_type": "file",
-                "file_path": normalized_path,
-                "created_at": str(uuid.uuid1().time),
-            }
-
-            return doc_id, document
+            # Reuse a previously parsed tree when the content is unchanged
+            cache_key, document = self._cache_lookup(
+                file_path, self._parser_id(processor, engine)
+            )
+            cached = document is not None
+            if document is None:
+                if engine is None:
+                    document = await processor.process(file_path)
+                else:
+                    document = await processor.process(file_path, engine=engine)
+                self._cache_store(cache_key, document)
+
+            return self._register_file_document(
+                document, file_path, normalized_path, cached
+            )
         except Exception as e:
             raise ValueError(f"Error loading document: {str(e)}")
 
@@ -798,8 +1209,11 @@ class DocumentNavigator:
         Returns:
             List of document info dictionaries
         """
+        with self._documents_lock:
+            items = list(self.document_metadata.items())
+
         documents = []
-        for doc_id, metadata in self.document_metadata.items():
+        for doc_id, metadata in items:
             documents.append({"id": doc_id, **metadata})
         return documents
 
@@ -817,11 +1231,17 @@ class DocumentNavigator:
         except ValueError:
             return False
 
-        if doc_id in self.loaded_documents:
-            del self.loaded_documents[doc_id]
-            if doc_id in self.document_metadata:
-                del self.document_metadata[doc_id]
-            return True
+        with self._documents_lock:
+            job = self.load_jobs.get(doc_id)
+            if job is not None and job.finished:
+                del self.load_jobs[doc_id]
+            if doc_id in self.loaded_documents:
+                del self.loaded_documents[doc_id]
+                self.corpus_index.remove(doc_id)
+                self._corpus_pending.pop(doc_id, None)
+                if doc_id in self.document_metadata:
+                    del self.document_metadata[doc_id]
+                return True
         return False
 
     def get_outline(self, doc_id: str, max_depth: int = 3) -> str:
@@ -833,6 +1253,15 @@ class DocumentNavigator:
         # Create a simple outline from document nodes
         outline = []
 
+        if document.is_columnar:
+            # Built from the heading arrays without visiting other nodes
+            for entry in document.get_outline(max_depth):
+                if entry["title"]:
+                    depth = entry["depth"]
+                    indent = "  " * (depth - 1) if depth > 0 else ""
+                    outline.append(f"{indent}#{entry['id']} - {entry['title']}")
+            return "\n".join(outline)
+
         def build_outline(node: DocumentNode, depth: int = 0) -> None:
             if depth > max_depth:
                 return
@@ -841,7 +1270,7 @@ class DocumentNavigator:
                 indent = "  " * (depth - 1) if depth > 0 else ""
                 outline.append(f"{indent}#{node.id} - {node.title}")
 
-            for child in node.children:
+            for child in node.get_children():
                 build_outline(child, depth + 1 if node.type == "heading" else depth)
 
         if document.root:
@@ -849,8 +1278,24 @@ class DocumentNavigator:
 
         return "\n".join(outline)
 
-    def read_section(self, doc_id: str, section_id: str) -> str:
-        """Read specified section content."""
+    def read_section(
+        self, doc_id: str, section_id: str, join_nodes: bool = False
+    ) -> str:
+        """Read specified section content.
+
+        Sections are returned as the verbatim slice of the source text they
+        were parsed from, located through the node spans or line numbers
+        recorded at parse time.
+
+        Args:
+            doc_id: UUID-based document identifier
+            section_id: ID of the section's node
+            join_nodes: Join the content of the section's nodes with
+                newlines instead, as earlier versions did
+
+        Returns:
+            Section content with subsections
+        """
         document = self.get_document(doc_id)
         if not document:
             return f"Document '{doc_id}' not found"
@@ -860,63 +1305,154 @@ class DocumentNavigator:
         if not node:
             return f"Section '{section_id}' not found"
 
-        content = [node.content] if node.content else []
+        if document.is_lazy:
+            # Convert the section's pages on first read
+            processor = self._find_processor(document.file_path)
+            return processor.read_lazy_section(document, node)
+        if not join_nodes:
+            if document.is_streamed:
+                # Streamed documents keep spans, the text stays on disk
+                processor = self._find_processor(document.file_path)
+                return processor.read_streamed_section(document, node)
+            span = document.get_section_span(node)
+            if span is not None:
+                return document.source_text[span[0] : span[1]]
+
+        if document.is_columnar:
+            # A subtree is a contiguous ordinal range
+            return "\n".join(document.tree.subtree_contents(node.ordinal))
+
+        # The section is the node's preorder subtree
+        subtree = document.get_subtree(node)
+        return "\n".join(n.content for n in subtree if n.content)
+
+    def search_document(
+        self, doc_id: str, query: str, mode: str = TOKEN_MODE, limit: int = 5
+    ) -> str:
+        """Search document and return formatted results.
 
-        def collect_content(n: DocumentNode) -> None:
-            for child in n.children:
-                if child.content:
-                    content.append(child.content)
-                collect_content(child)
-
-        collect_content(node)
-        return "\n".join(content)
+        Args:
+            doc_id: UUID-based document identifier
+            query: Search query string
+            mode: "token" (default) matches nodes containing every word of
+                the query through the document's inverted index, built when
+                it was loaded, and lists the best matches first by BM25
+                score. Token queries accept ``"exact phrases"`` and
+                ``A NEAR/k B`` (at most k words between A and B, in either
+                order). "substring" matches the query text anywhere in a
+                node and lists matches in document order. Lazily loaded
+                PDFs and streamed files are always searched by substring,
+                since they do not keep their text in memory.
+            limit: Maximum number of results to list
 
-    def search_document(self, doc_id: str, query: str) -> str:
-        """Search document and return formatted results."""
+        Returns:
+            Formatted search results
+        """
         document = self.get_document(doc_id)
         if not document:
             return f"Document '{doc_id}' not found"
+        check_search_mode(mode)
 
-        # Perform search using document's search functionality
-        results = []
-        query_lower = query.lower()
+        if mode == TOKEN_MODE and not (document.is_lazy or document.is_streamed):
+            total, results = document.search_ranked(query, limit)
+        else:
+            if document.is_lazy:
+                # Only pages containing the query are converted
+                processor = self._find_processor(document.file_path)
+                matches = processor.search_lazy(document, query)
+            elif document.is_streamed:
+                processor = self._find_processor(document.file_path)
+                matches = processor.search_streamed(document, query)
+            else:
+                matches = document.search(query, mode)
+            total, results = len(matches), matches[:limit]
 
-        def search_node(node: DocumentNode) -> None:
-            if query_lower in node.content.lower():
-                # Find nearest heading as context
-                parent = node.parent
-                while parent and parent.type != "heading":
-                    parent = parent.parent
-
-                section_title = parent.title if parent else "Document Root"
-
-                from .models import SearchResult
-
-                results.append(
-                    SearchResult(
-                        node_id=node.id,
-                        section=section_title,
-                        section_id=parent.id if parent else "root",
-                        content=node.content,
-                        type=node.type,
-                        line_number=node.attributes.get("line_number"),
-                    )
+        if not results:
+            return f"No results found for '{query}'"
+
+        output = f"Found {total} results for '{query}':\n\n"
+        for i, result in enumerate(results, 1):
+            score = "" if result.score is None else f", score {result.score:.2f}"
+            output += (
+                f"{i}. In section '{result.section}' (#{result.section_id}){score}:\n"
+            )
+            output += f"   {result.content[:100]}...\n\n"
+
+        return output
+
+    def search_corpus(self, query: str, limit: int = 10) -> List[CorpusSearchResult]:
+        """Rank the nodes of all loaded documents against a query.
+
+        Nodes must match the query as in the "token" mode of
+        ``search_document``, phrase and NEAR operators included. Documents
+        loaded since the last corpus search are indexed first. Lazily loaded
+        PDFs and streamed files are not indexed and never match.
+
+        Args:
+            query: Search query string
+            limit: Maximum number of results
+
+        Returns:
+            Up to ``limit`` results, best first
+        """
+        parsed = parse_query(query)
+        self._index_pending_documents()
+        with self._documents_lock:
+            hits = self.corpus_index.search(parsed, limit)
+            documents = {doc_id: self.loaded_documents[doc_id] for _, doc_id, _ in hits}
+
+        results = []
+        for score, doc_id, ordinal in hits:
+            document = documents[doc_id]
+            result = document.get_search_result(ordinal)
+            results.append(
+                CorpusSearchResult(
+                    doc_id=doc_id,
+                    title=document.title,
+                    node_id=result.node_id,
+                    section=result.section,
+                    section_id=result.section_id,
+                    snippet=make_snippet(result.content, parsed.terms),
+                    score=score,
+                    type=result.type,
+                    line_number=result.line_number,
                 )
+            )
+        return results
 
-            for child in node.children:
-                search_node(child)
+    def search_all(self, query: str, limit: int = 10) -> str:
+        """Search all loaded documents and return formatted ranked results.
 
-        if document.root:
-            search_node(document.root)
+        Args:
+            query: Search query string
+            limit: Maximum number of results
 
-        if not results:
-            return f"No results found for '{query}'"
+        Returns:
+            Formatted results with document id, section id and snippet
+        """
+        results = self.search_corpus(query, limit)
+        with self._documents_lock:
+            skipped = [
+                doc_id
+                for doc_id in self.loaded_documents
+                if doc_id not in self.corpus_index
+                and doc_id not in self._corpus_pending
+            ]
 
-        output = f"Found {len(results)} results for '{query}':\n\n"
-        for i, result in enumerate(results[:5], 1):  # Limit to first 5 results
-            output += f"{i}. In section '{result.section}' (#{result.section_id}):\n"
-            output += f"   {result.content[:100]}...\n\n"
+        if results:
+            output = f"Top {len(results)} results for '{query}':\n\n"
+            for i, result in enumerate(results, 1):
+                output += (
+                    f"{i}. {result.title} [{result.doc_id}] in section "
+                    f"'{result.section}' (#{result.section_id}), "
+                    f"score {result.score:.2f}:\n"
+                )
+                output += f"   {result.snippet}\n\n"
+        else:
+            output = f"No results found for '{query}'\n"
 
+        if skipped:
+            output += f"\nNot indexed (use search_document): {', '.join(skipped)}\n"
         return output
 
     def navigate(self, doc_id: str, section_id: str) -> str:
@@ -931,16 +1467,11 @@ class DocumentNavigator:
 
         output = f"Current: {node.title or node.id}\n"
 
-        # Build breadcrumbs
-        ancestors = []
-        current = node.parent
-        while current and current.type != "document":
-            if current.type == "heading":
-                ancestors.append(current)
-            current = current.parent
+        # Build breadcrumbs from the enclosing headings
+        ancestors = document.get_heading_path(node)
 
         if ancestors:
-            breadcrumb_path = " > ".join([a.title for a in reversed(ancestors)])
+            breadcrumb_path = " > ".join([a.title for a in ancestors])
             output += f"Path: {breadcrumb_path} > {node.title or node.id}\n"
 
         # Find parent
@@ -950,7 +1481,7 @@ class DocumentNavigator:
         # Find siblings (same level headings)
         if node.parent:
             siblings = [
-                child for child in node.parent.children if child.type == "heading"
+                child for child in node.parent.get_children() if child.type == "heading"
             ]
             if len(siblings) > 1:
                 output += "Siblings:\n"
@@ -959,7 +1490,7 @@ class DocumentNavigator:
                     output += f"{marker}{sibling.title} (#{sibling.id})\n"
 
         # Find children (direct child headings)
-        children = [child for child in node.children if child.type == "heading"]
+        children = [child for child in node.get_children() if child.type == "heading"]
         if children:
             output += "Subsections:\n"
             for child in children:
@@ -983,14 +1514,32 @@ class DocumentNavigator:
         if not document:
             return None
 
+        # Counts are memoized per encoding; lazy documents grow as pages load
+        memo_key = f"total_tokens:{encoding_name}"
+        if memo_key in document.metadata and not document.is_lazy:
+            return {"total_tokens": document.metadata[memo_key]}
+
+        if document.is_streamed:
+            # Count chunk by chunk instead of reading the whole file
+            processor = self._find_processor(document.file_path)
+            chunks = processor.iter_streamed_text(document)
+        elif document.source_text:
+            chunks = [document.source_text]
+        else:
+            # Trees parsed straight from a file (XML) only keep node content
+            chunks = [node.content for node in document.iter_nodes()]
+
         try:
             encoding = tiktoken.get_encoding(encoding_name)
-            total_tokens = len(encoding.encode(document.source_text))
+            total_tokens = sum(len(encoding.encode(chunk)) for chunk in chunks)
         except Exception:
             # Fallback to simple word-based estimation if tiktoken fails
-            words = len(document.source_text.split())
+            if document.is_streamed:
+                chunks = processor.iter_streamed_text(document)
+            words = sum(len(chunk.split()) for chunk in chunks)
             total_tokens = int(words / 0.75)
 
+        document.metadata[memo_key] = total_tokens
         return {
             "total_tokens": total_tokens,
         }
@@ -1,7 +1,18 @@
 """Document processors for different file formats."""
 
-from .base import BaseProcessor
+from .base import BaseProcessor, ProgressCallback
+from .engines import ParseEngine, get_engine, select_engine
 from .markdown import MarkdownProcessor
 from .pdf import PDFProcessor
+from .xml import XMLProcessor
 
-__all__ = ["BaseProcessor", "MarkdownProcessor", "PDFProcessor"]
+__all__ = [
+    "BaseProcessor",
+    "MarkdownProcessor",
+    "ParseEngine",
+    "PDFProcessor",
+    "ProgressCallback",
+    "XMLProcessor",
+    "get_engine",
+    "select_engine",
+]
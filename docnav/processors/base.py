@@ -2,9 +2,18 @@
 
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-from ..models import Document, DocumentNode, SearchResult
+from ..models import Document, DocumentNode, ParseStats, SearchResult
+from .engines import (
+    DEFAULT_ENGINE_THRESHOLD,
+    ENGINE_CHOICES,
+    ParallelCommonMarkEngine,
+    select_engine,
+)
+
+# Load progress hook called as (phase, done, total); total is None if unknown
+ProgressCallback = Callable[[str, int, Optional[int]], None]
 
 
 class BaseProcessor(ABC):
@@ -14,6 +23,17 @@ class BaseProcessor(ABC):
     DOM-like DocumentNode structure for better navigation and analysis.
     """
 
+    # Bump when parsing output changes so cached documents are invalidated
+    version: str = "1"
+
+    # Markdown parse engine ("auto", "scanner" or "commonmark"); auto picks
+    # the scanner for content of at least engine_threshold characters
+    engine: str = "auto"
+    engine_threshold: Optional[int] = DEFAULT_ENGINE_THRESHOLD
+
+    # Worker processes for CommonMark parses of large inputs, 1 disables
+    parse_workers: int = 1
+
     @abstractmethod
     def can_process(self, file_path: Path) -> bool:
         """Check if this processor can handle the given file type.
@@ -27,11 +47,39 @@ class BaseProcessor(ABC):
         pass
 
     @abstractmethod
-    async def process(self, file_path: Path) -> Document:
+    async def process(
+        self,
+        file_path: Path,
+        progress: Optional[ProgressCallback] = None,
+        engine: Optional[str] = None,
+    ) -> Document:
         """Process a document and return structured Document with tree structure.
 
         Args:
             file_path: Path to the document file
+            progress: Optional hook receiving (phase, done, total) updates
+            engine: Optional parse engine overriding ``self.engine``
+
+        Returns:
+            Document with populated DocumentNode tree structure
+        """
+        pass
+
+    @abstractmethod
+    def process_content(
+        self,
+        content: Union[str, bytes],
+        file_path: Optional[Path] = None,
+        progress: Optional[ProgressCallback] = None,
+        engine: Optional[str] = None,
+    ) -> Document:
+        """Process in-memory document content without touching the filesystem.
+
+        Args:
+            content: Document text or raw bytes
+            file_path: Optional path the content came from, used for the title
+            progress: Optional hook receiving (phase, done, total) updates
+            engine: Optional parse engine overriding ``self.engine``
 
         Returns:
             Document with populated DocumentNode tree structure
@@ -66,6 +114,60 @@ class BaseProcessor(ABC):
         """
         pass
 
+    def configure_engine(
+        self,
+        engine: str,
+        engine_threshold: Optional[int] = DEFAULT_ENGINE_THRESHOLD,
+        parse_workers: int = 1,
+    ) -> None:
+        """Set the Markdown parse engine used by this processor.
+
+        Args:
+            engine: "auto", "scanner" or "commonmark"
+            engine_threshold: Size in characters from which "auto" uses the
+                scanner, None to always use CommonMark in auto mode
+            parse_workers: Worker processes for CommonMark parses of large
+                inputs, split at top-level headings; 1 parses in-process
+        """
+        if engine not in ENGINE_CHOICES:
+            raise ValueError(f"Unsupported parse engine: {engine}")
+        self.engine = engine
+        self.engine_threshold = engine_threshold
+        self.parse_workers = parse_workers
+
+    def parse_markdown(
+        self, content: str, engine: Optional[str] = None
+    ) -> Tuple[DocumentNode, ParseStats]:
+        """Parse Markdown content with the selected engine.
+
+        Args:
+            content: Markdown text
+            engine: Optional parse engine overriding ``self.engine``
+
+        Returns:
+            Tuple of (root node, ParseStats)
+        """
+        selected = select_engine(
+            engine or self.engine, len(content), self.engine_threshold
+        )
+        if selected.name == "commonmark" and self.parse_workers > 1:
+            selected = ParallelCommonMarkEngine(self.parse_workers)
+        return selected.run(content)
+
+    def get_cache_id(self, engine: Optional[str] = None) -> str:
+        """Get an identifier of this processor's parsing output.
+
+        Args:
+            engine: Optional parse engine overriding ``self.engine``
+
+        Returns:
+            Identifier used to key cached parse results
+        """
+        engine = engine or self.engine
+        if engine == "auto":
+            engine = f"auto@{self.engine_threshold}"
+        return f"{self.__class__.__name__}/{self.version}/{engine}"
+
     def get_supported_extensions(self) -> List[str]:
         """Get list of supported file extensions.
 
@@ -82,6 +184,7 @@ class BaseProcessor(ABC):
         """
         return {
             "name": self.__class__.__name__,
+            "version": self.version,
             "supported_extensions": self.get_supported_extensions(),
             "features": ["parsing", "search", "navigation"],
         }
@@ -0,0 +1,517 @@
+"""Pluggable Markdown parse engines.
+
+Two engines turn Markdown text into a ``DocumentNode`` tree:
+
+- ``scanner``: the single-pass line scanner, fast enough for huge files
+- ``commonmark``: full CommonMark parsing with markdown-it-py
+
+``auto`` picks CommonMark below a size threshold and the scanner above it.
+Every parse reports its engine, wall time and node count as ``ParseStats``.
+
+Large inputs can be parsed by CommonMark in parallel: the source is split at
+top-level headings outside code fences and HTML blocks, each part is parsed
+in a process pool, and the subtrees are grafted under one root with node ids
+and line numbers renumbered as if the whole text had been parsed at once.
+"""
+
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from markdown_it import MarkdownIt
+
+from ..models import DocumentNode, ParseStats
+from .scanner import _closes_fence, _match_fence_open, parse_markdown_tree
+from .workers import get_process_pool
+
+# Inputs at least this large are parsed by the scanner in auto mode
+DEFAULT_ENGINE_THRESHOLD = 1024 * 1024
+
+# Smallest input worth splitting across processes, and smallest partition.
+# From benchmarks/bench_parallel.py: with the shared pool warm, a task costs
+# ~0.25ms and pickling parts and trees ~30% of a serial parse, so two
+# workers beat a serial parse from about 128 KiB
+PARALLEL_MIN_CHARS = 128 * 1024
+PARTITION_MIN_CHARS = 32 * 1024
+
+_TOP_HEADING = re.compile(r"# |#$")
+# HTML blocks that may span blank lines, with their end markers; any other
+# line starting with "<" may open a block that ends at a blank line
+_HTML_BLOCK_OPEN = re.compile(
+    r" {0,3}(?:(?P<comment><!--)|(?P<instruction><\?)|(?P<cdata><!\[CDATA\[)"
+    r"|(?P<declaration><![A-Za-z])|<(?P<raw>pre|script|style|textarea)(?:[\s>]|$))",
+    re.IGNORECASE,
+)
+_HTML_BLOCK_END = {
+    "comment": "-->",
+    "instruction": "?>",
+    "cdata": "]]>",
+    "declaration": ">",
+}
+
+
+class ParseEngine(ABC):
+    """Interface of a Markdown parse engine."""
+
+    name: str = ""
+
+    # Bump when the tree produced by the engine changes
+    version: str = "1"
+
+    @abstractmethod
+    def parse(self, content: str) -> DocumentNode:
+        """Parse Markdown content into a DocumentNode tree.
+
+        Args:
+            content: Markdown text
+
+        Returns:
+            Root node of type ``document`` with id ``root``
+        """
+        pass
+
+    def run(self, content: str) -> Tuple[DocumentNode, ParseStats]:
+        """Parse content and measure the parse.
+
+        Args:
+            content: Markdown text
+
+        Returns:
+            Tuple of (root node, ParseStats)
+        """
+        started = time.perf_counter()
+        root = self.parse(content)
+        seconds = time.perf_counter() - started
+        return root, ParseStats(
+            engine=self.name,
+            seconds=seconds,
+            nodes=count_nodes(root),
+            chars=len(content),
+        )
+
+
+class ScannerEngine(ParseEngine):
+    """Single-pass line scanner engine."""
+
+    name = "scanner"
+
+    def parse(self, content: str) -> DocumentNode:
+        """Parse Markdown content with the line scanner."""
+        return parse_markdown_tree(content)
+
+
+class CommonMarkEngine(ParseEngine):
+    """CommonMark engine backed by markdown-it-py."""
+
+    name = "commonmark"
+
+    def parse(self, content: str) -> DocumentNode:
+        """Parse Markdown content with markdown-it-py."""
+        return parse_commonmark_tree(content)
+
+
+ENGINES: Dict[str, ParseEngine] = {
+    engine.name: engine for engine in (ScannerEngine(), CommonMarkEngine())
+}
+ENGINE_CHOICES = ("auto", *ENGINES)
+
+
+def get_engine(name: str) -> ParseEngine:
+    """Get a parse engine by name.
+
+    Args:
+        name: Engine name, ``scanner`` or ``commonmark``
+
+    Returns:
+        The engine instance
+    """
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unsupported parse engine: {name}") from None
+
+
+def select_engine(
+    name: str, size: int, threshold: Optional[int] = DEFAULT_ENGINE_THRESHOLD
+) -> ParseEngine:
+    """Resolve an engine choice for content of the given size.
+
+    Args:
+        name: ``auto`` or an engine name
+        size: Content length in characters
+        threshold: Size from which ``auto`` picks the scanner
+
+    Returns:
+        The engine to parse with
+    """
+    if name == "auto":
+        if threshold is not None and size >= threshold:
+            return ENGINES["scanner"]
+        return ENGINES["commonmark"]
+    return get_engine(name)
+
+
+class ParallelCommonMarkEngine(CommonMarkEngine):
+    """CommonMark engine that parses top-level sections in a process pool.
+
+    Produces the same tree as ``CommonMarkEngine``; inputs that are small or
+    have no top-level headings are parsed in-process. Parts run on the pool
+    shared with PDF conversion (see ``workers.get_process_pool``), so worker
+    processes are started once, not per parse.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        min_chars: int = PARALLEL_MIN_CHARS,
+        partition_min_chars: int = PARTITION_MIN_CHARS,
+    ) -> None:
+        """Initialize the engine.
+
+        Args:
+            workers: Number of worker processes to split the input for
+            min_chars: Smallest input parsed in parallel
+            partition_min_chars: Smallest partition handed to a worker
+        """
+        self.workers = workers
+        self.min_chars = min_chars
+        self.partition_min_chars = partition_min_chars
+
+    def parse(self, content: str) -> DocumentNode:
+        """Parse Markdown content, in parallel when worthwhile."""
+        return self._parse_partitions(content)[0]
+
+    def run(self, content: str) -> Tuple[DocumentNode, ParseStats]:
+        """Parse content and measure the parse, counting partitions."""
+        started = time.perf_counter()
+        root, chunks = self._parse_partitions(content)
+        seconds = time.perf_counter() - started
+        return root, ParseStats(
+            engine=self.name,
+            seconds=seconds,
+            nodes=count_nodes(root),
+            chars=len(content),
+            chunks=chunks,
+        )
+
+    def _parse_partitions(self, content: str) -> Tuple[DocumentNode, int]:
+        """Parse content and return the root and the number of partitions."""
+        if self.workers <= 1 or len(content) < self.min_chars:
+            return parse_commonmark_tree(content), 1
+
+        target = max(self.partition_min_chars, len(content) // (self.workers * 2))
+        partitions = partition_markdown(content, target)
+        if len(partitions) <= 1:
+            return parse_commonmark_tree(content), 1
+
+        subtrees = list(
+            get_process_pool().map(
+                parse_commonmark_tree, [text for _, text in partitions]
+            )
+        )
+
+        parts = []
+        char_offset = 0
+        for (start, text), subtree in zip(partitions, subtrees):
+            parts.append((start, char_offset, subtree))
+            char_offset += len(text) + 1  # Parts were split at newlines
+        return graft_subtrees(parts, content), len(partitions)
+
+
+def partition_markdown(content: str, target_chars: int) -> List[Tuple[int, str]]:
+    """Split Markdown at top-level headings into parts of about target size.
+
+    Only ``#`` headings at the start of a line that is outside fenced code
+    and multi-line HTML blocks are split points, so every part parses to the
+    same nodes it would have had in the whole document.
+
+    Args:
+        content: Markdown text
+        target_chars: Minimum size of each part, except the last
+
+    Returns:
+        List of (first line number, text) tuples covering the content
+    """
+    lines = content.split("\n")
+    boundaries = [0]
+    part_chars = 0
+    fence_marker = ""
+    html_end = ""
+    html_until_blank = False
+
+    for line_num, line in enumerate(lines):
+        if fence_marker:
+            if _closes_fence(line, fence_marker):
+                fence_marker = ""
+        elif html_end:
+            if html_end in line.lower():
+                html_end = ""
+        elif html_until_blank:
+            if not line.strip():
+                html_until_blank = False
+        elif line.startswith("#") and _TOP_HEADING.match(line):
+            if part_chars >= target_chars:
+                boundaries.append(line_num)
+                part_chars = 0
+        elif line[:1] in ("`", "~", " ", "<"):
+            fence_match = _match_fence_open(line)
+            if fence_match:
+                fence_marker = fence_match.group(1)
+            else:
+                html_match = _HTML_BLOCK_OPEN.match(line)
+                if html_match:
+                    kind = html_match.lastgroup
+                    if kind == "raw":
+                        end = f"</{html_match.group('raw').lower()}>"
+                    else:
+                        end = _HTML_BLOCK_END[kind]
+                    # The end marker may already be on the opening line
+                    if end not in line.lower()[html_match.end() :]:
+                        html_end = end
+                elif line.lstrip(" ").startswith("<") and not line.startswith("    "):
+                    # <div>, <table>, ... (CommonMark types 6 and 7); kept
+                    # whole even where CommonMark would read a paragraph
+                    html_until_blank = True
+        part_chars += len(line) + 1
+
+    boundaries.append(len(lines))
+    return [
+        (start, "\n".join(lines[start:end]))
+        for start, end in zip(boundaries, boundaries[1:])
+    ]
+
+
+def graft_subtrees(
+    parts: List[Tuple[int, int, DocumentNode]], source: Optional[str] = None
+) -> DocumentNode:
+    """Join separately parsed parts under one root.
+
+    Node ids are renumbered in document order and line numbers shifted by
+    each part's first line, matching a parse of the whole text. With
+    ``source``, spans into each part's text are moved onto the whole text.
+
+    Args:
+        parts: (first line number, first character offset, parsed root)
+            tuples in document order
+        source: Text the parts were cut from
+
+    Returns:
+        Root node of type ``document`` with id ``root``
+    """
+    root = DocumentNode(type="document", id="root")
+    node_counter = 0
+
+    for line_offset, char_offset, part_root in parts:
+        for child in part_root.get_children():
+            root.add_child(child)
+
+            # Nodes were created in preorder, which is the global id order
+            stack = [child]
+            while stack:
+                node = stack.pop()
+                prefix = node.id.rsplit("_", 1)[0]
+                node.id = f"{prefix}_{node_counter}"
+                node_counter += 1
+                line_number = node.get_attribute("line_number")
+                if line_number is not None:
+                    node.set_attribute("line_number", line_number + line_offset)
+                span = node.span
+                if source is not None and span is not None:
+                    node.set_span(source, span[0] + char_offset, span[1] + char_offset)
+                stack.extend(reversed(node.get_children()))
+
+    return root
+
+
+def count_nodes(root: DocumentNode) -> int:
+    """Count the nodes of a tree, including the root."""
+    count = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.get_children())
+    return count
+
+
+def parse_commonmark_tree(content: str) -> DocumentNode:
+    """Parse Markdown content into a DocumentNode tree using markdown-it-py.
+
+    Like the scanner, headings, paragraphs and code blocks are spans of
+    ``content`` covering their source lines (see ``DocumentNode.set_span``),
+    so the text is not copied. Lists, list items and blockquotes hold no
+    content of their own.
+
+    Args:
+        content: Markdown text
+
+    Returns:
+        Root node of type ``document`` with id ``root``
+    """
+    root = DocumentNode(type="document", id="root")
+
+    # Initialize markdown parser with CommonMark compatibility
+    md = MarkdownIt("commonmark")
+    tokens = md.parse(content)
+
+    # Offset of each line, to turn token line ranges into spans
+    line_starts = [0]
+    position = content.find("\n")
+    while position != -1:
+        line_starts.append(position + 1)
+        position = content.find("\n", position + 1)
+
+    def set_lines(node: DocumentNode, line_range: Optional[List[int]]) -> None:
+        if line_range is None:
+            return
+        start = line_starts[line_range[0]]
+        stop = line_range[1]
+        end = line_starts[stop] - 1 if stop < len(line_starts) else len(content)
+        # Trailing whitespace is not content, as in markdown-it's inline text
+        while end > start and content[end - 1] in " \t\r":
+            end -= 1
+        node.set_span(content, start, end)
+
+    current_parents = [root]  # Stack to track parent nodes
+    node_counter = 0
+
+    for token in tokens:
+        if token.type == "heading_open":
+            level = int(token.tag[1])  # Extract level from h1, h2, etc.
+            node_id = f"h{level}_{node_counter}"
+
+            # Adjust parent stack based on heading level
+            while len(current_parents) > level:
+                current_parents.pop()
+
+            # Create heading node - the title is set from its inline content
+            heading_node = DocumentNode(
+                type="heading",
+                level=level,
+                id=node_id,
+                title="",
+                attributes={
+                    "line_number": token.map[0] if token.map else None,
+                    "tag": token.tag,
+                },
+            )
+            set_lines(heading_node, token.map)
+
+            current_parents[-1].add_child(heading_node)
+            current_parents.append(heading_node)
+            node_counter += 1
+
+        elif token.type == "heading_close":
+            # The heading content should already be processed by inline tokens
+            pass
+
+        elif token.type == "paragraph_open":
+            # Create paragraph node
+            para_node = DocumentNode(
+                type="paragraph",
+                id=f"p_{node_counter}",
+                attributes={
+                    "line_number": token.map[0] if token.map else None,
+                },
+            )
+            set_lines(para_node, token.map)
+            current_parents[-1].add_child(para_node)
+            current_parents.append(para_node)
+            node_counter += 1
+
+        elif token.type == "paragraph_close":
+            # Pop paragraph from stack
+            if len(current_parents) > 1 and current_parents[-1].type == "paragraph":
+                current_parents.pop()
+
+        elif token.type == "inline":
+            # Content is the span of the enclosing block; headings take
+            # their title from the inline text
+            if current_parents and token.content:
+                current_node = current_parents[-1]
+                if current_node.span is None:
+                    current_node.content = token.content
+                if current_node.type == "heading":
+                    current_node.title = token.content
+
+        elif token.type == "list_item_open":
+            # Create list item node
+            item_node = DocumentNode(
+                type="list_item",
+                id=f"li_{node_counter}",
+                content="",
+                attributes={
+                    "line_number": token.map[0] if token.map else None,
+                },
+            )
+            current_parents[-1].add_child(item_node)
+            current_parents.append(item_node)
+            node_counter += 1
+
+        elif token.type == "list_item_close":
+            # Pop list item from stack
+            if len(current_parents) > 1 and current_parents[-1].type == "list_item":
+                current_parents.pop()
+
+        elif token.type == "bullet_list_open" or token.type == "ordered_list_open":
+            # Create list node
+            list_node = DocumentNode(
+                type="list",
+                id=f"list_{node_counter}",
+                content="",
+                attributes={
+                    "list_type": (
+                        "bullet" if token.type == "bullet_list_open" else "ordered"
+                    ),
+                    "line_number": token.map[0] if token.map else None,
+                },
+            )
+            current_parents[-1].add_child(list_node)
+            current_parents.append(list_node)
+            node_counter += 1
+
+        elif token.type == "bullet_list_close" or token.type == "ordered_list_close":
+            # Pop list from stack
+            if len(current_parents) > 1 and current_parents[-1].type == "list":
+                current_parents.pop()
+
+        elif token.type == "code_block" or token.type == "fence":
+            # Create code block node
+            code_node = DocumentNode(
+                type="code_block",
+                id=f"code_{node_counter}",
+                content=token.content,
+                attributes={
+                    "line_number": token.map[0] if token.map else None,
+                    "language": (
+                        getattr(token, "info", "").strip()
+                        if hasattr(token, "info")
+                        else ""
+                    ),
+                },
+            )
+            set_lines(code_node, token.map)
+            current_parents[-1].add_child(code_node)
+            node_counter += 1
+
+        elif token.type == "blockquote_open":
+            # Create blockquote node
+            quote_node = DocumentNode(
+                type="blockquote",
+                id=f"quote_{node_counter}",
+                content="",
+                attributes={
+                    "line_number": token.map[0] if token.map else None,
+                },
+            )
+            current_parents[-1].add_child(quote_node)
+            current_parents.append(quote_node)
+            node_counter += 1
+
+        elif token.type == "blockquote_close":
+            # Pop blockquote from stack
+            if len(current_parents) > 1 and current_parents[-1].type == "blockquote":
+                current_parents.pop()
+
+    return root
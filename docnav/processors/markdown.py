@@ -1,11 +1,14 @@
 """Markdown document processor with DocumentNode tree structure support."""
 
-import re
+import time
+from bisect import bisect_right
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional, Union
 
-from ..models import Document, DocumentNode, SearchResult
-from .base import BaseProcessor
+from ..models import Document, DocumentNode, ParseStats, SearchResult
+from .base import BaseProcessor, ProgressCallback
+from .engines import DEFAULT_ENGINE_THRESHOLD, count_nodes
+from .scanner import parse_markdown_file, parse_markdown_tree
 
 
 class MarkdownProcessor(BaseProcessor):
@@ -15,6 +18,39 @@ class MarkdownProcessor(BaseProcessor):
     structure for efficient navigation and content extraction.
     """
 
+    # Parsing moved to the shared fence-aware scanner
+    version = "3"
+
+    def __init__(
+        self,
+        engine: str = "auto",
+        engine_threshold: Optional[int] = DEFAULT_ENGINE_THRESHOLD,
+        parse_workers: int = 1,
+        stream_min_bytes: Optional[int] = None,
+    ) -> None:
+        """Initialize the Markdown processor.
+
+        Args:
+            engine: Parse engine, "auto", "scanner" or "commonmark"
+            engine_threshold: Size in characters from which "auto" uses the
+                scanner instead of CommonMark
+            parse_workers: Worker processes for CommonMark parses of large
+                files, split at top-level headings; 1 parses in-process
+            stream_min_bytes: File size from which files are streamed: parsed
+                line by line without keeping their text, which is read back
+                from disk on demand. None never streams.
+        """
+        self.configure_engine(engine, engine_threshold, parse_workers)
+        self.stream_min_bytes = stream_min_bytes
+
+    def get_cache_id(self, engine: Optional[str] = None) -> str:
+        """Get an identifier of this processor's parsing output."""
+        cache_id = super().get_cache_id(engine)
+        if self.stream_min_bytes is not None:
+            # Streamed documents hold spans instead of text
+            cache_id += f"/stream@{self.stream_min_bytes}"
+        return cache_id
+
     def can_process(self, file_path: Path) -> bool:
         """Check if this processor can handle Markdown files."""
         return file_path.suffix.lower() in {".md", ".markdown", ".mdown", ".mkd"}
@@ -23,11 +59,18 @@ class MarkdownProcessor(BaseProcessor):
         """Get supported file extensions."""
         return [".md", ".markdown", ".mdown", ".mkd"]
 
-    async def process(self, file_path: Path) -> Document:
+    async def process(
+        self,
+        file_path: Path,
+        progress: Optional[ProgressCallback] = None,
+        engine: Optional[str] = None,
+    ) -> Document:
         """Process a Markdown document into DocumentNode tree structure.
 
         Args:
             file_path: Path to the Markdown file
+            progress: Optional hook receiving (phase, done, total) updates
+            engine: Optional parse engine overriding ``self.engine``
 
         Returns:
             Document with populated DocumentNode tree
@@ -35,153 +78,254 @@ class MarkdownProcessor(BaseProcessor):
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
 
+        if self.should_stream(file_path, engine):
+            return self.build_streamed_document(file_path, progress)
+
         content = file_path.read_text(encoding="utf-8")
+        return self.process_content(content, file_path, progress, engine)
+
+    def should_stream(self, file_path: Path, engine: Optional[str] = None) -> bool:
+        """Check whether a file is large enough to be streamed.
+
+        Streaming always uses the scanner, so an explicit "commonmark"
+        engine keeps the file in memory.
+
+        Args:
+            file_path: Path to the Markdown file
+            engine: Optional parse engine overriding ``self.engine``
+
+        Returns:
+            True if the file should be loaded with ``build_streamed_document``
+        """
+        if self.stream_min_bytes is None:
+            return False
+        if (engine or self.engine) == "commonmark":
+            return False
+        return file_path.stat().st_size >= self.stream_min_bytes
+
+    def build_streamed_document(
+        self, file_path: Path, progress: Optional[ProgressCallback] = None
+    ) -> Document:
+        """Parse a Markdown file line by line without keeping its text.
+
+        The tree matches the scanner's in-memory tree, but node content is a
+        byte range of the file (``node.span``) decoded from a memory map when
+        read. ``source_text`` stays empty and sections are read back from the
+        file.
+
+        Args:
+            file_path: Path to the Markdown file
+            progress: Optional hook receiving (phase, done, total) updates
+
+        Returns:
+            Document marked with ``metadata["streamed"]``
+        """
+        if progress:
+            progress("parse", 0, None)
+        start = time.perf_counter()
+        root, size = parse_markdown_file(file_path)
+        stats = ParseStats(
+            engine="stream",
+            seconds=time.perf_counter() - start,
+            nodes=count_nodes(root),
+            chars=size,
+        )
 
-        # Create document with tree structure
         document = Document(
             file_path=file_path,
             title=file_path.stem,
-            source_text=content,
+            source_text="",
             source_format="markdown",
+            metadata={
+                "streamed": True,
+                "size": size,
+                "encoding": "utf-8",
+                "parse_stats": stats,
+            },
         )
-
-        # Parse content into tree structure
-        root = self._parse_markdown_to_tree(content)
         document.root = root
+        if progress:
+            progress("index", 0, None)
         document.rebuild_index()
-
         return document
 
-    def _parse_markdown_to_tree(self, content: str) -> DocumentNode:
-        """Parse Markdown content into DocumentNode tree structure."""
-        root = DocumentNode(type="document", id="root")
-        lines = content.split("\n")
-
-        current_parents = [root]  # Stack to track parent nodes
-        node_counter = 0
-
-        for line_num, line in enumerate(lines):
-            # Parse headings
-            heading_match = re.match(r"^(#{1,6})\s+(.+)$", line)
-            if heading_match:
-                level = len(heading_match.group(1))
-                title = heading_match.group(2).strip()
-                node_id = f"h{level}_{node_counter}"
-
-                # Adjust parent stack based on heading level
-                while len(current_parents) > level:
-                    current_parents.pop()
-
-                heading_node = DocumentNode(
-                    type="heading",
-                    level=level,
-                    id=node_id,
-                    title=title,
-                    content=line,
-                    attributes={"line_number": line_num, "raw_line": line},
-                )
+    def _read_span(self, document: Document, start: int, end: int) -> str:
+        """Read a byte range of a streamed document's file."""
+        with open(document.file_path, "rb") as file:
+            file.seek(start)
+            data = file.read(end - start)
+        return data.decode(document.metadata.get("encoding", "utf-8"), "replace")
 
-                current_parents[-1].add_child(heading_node)
-                current_parents.append(heading_node)
-                node_counter += 1
-                continue
-
-            # Parse code blocks
-            if line.strip().startswith("```"):
-                code_node = DocumentNode(
-                    type="code_block",
-                    id=f"code_{node_counter}",
-                    content=line,
-                    attributes={"line_number": line_num, "language": line.strip()[3:]},
-                )
-                current_parents[-1].add_child(code_node)
-                node_counter += 1
-                continue
-
-            # Parse lists
-            if re.match(r"^(\s*)([-*+]|\d+\.)\s+", line):
-                list_node = DocumentNode(
-                    type="list_item",
-                    id=f"list_{node_counter}",
-                    content=line,
-                    attributes={
-                        "line_number": line_num,
-                        "list_type": "ordered"
-                        if re.match(r"^\s*\d+\.", line)
-                        else "unordered",
-                    },
-                )
-                current_parents[-1].add_child(list_node)
-                node_counter += 1
-                continue
-
-            # Parse paragraphs and other content
-            if line.strip():
-                para_node = DocumentNode(
-                    type="paragraph",
-                    id=f"p_{node_counter}",
-                    content=line,
-                    attributes={"line_number": line_num},
-                )
-                current_parents[-1].add_child(para_node)
-                node_counter += 1
+    def read_streamed_section(self, document: Document, node: DocumentNode) -> str:
+        """Read a section of a streamed document from its file.
 
-        return root
-
-    async def extract_node(
-        self, document: Document, node_id: str
-    ) -> Optional[DocumentNode]:
-        """Extract a specific node from the document tree.
+        A section runs from the node's first byte to the last byte of its
+        last descendant, so the source is returned verbatim, blank lines
+        included.
 
         Args:
-            document: Document containing the node tree
-            node_id: ID of the node to extract
+            document: Streamed document
+            node: Any node, or the document root for the whole file
 
         Returns:
-            DocumentNode if found, None otherwise
+            Source text of the node and its descendants
         """
-        return document.get_node(node_id)
+        if node.type == "document":
+            return self._read_span(document, 0, document.metadata.get("size", 0))
+
+        span = node.span
+        if span is None:
+            return node.content
+        last = node
+        while last.get_children():
+            last = last.get_children()[-1]
+        end = (last.span or span)[1]
+        return self._read_span(document, span[0], end)
+
+    def iter_streamed_text(
+        self, document: Document, chunk_bytes: int = 1 << 20
+    ) -> Iterator[str]:
+        """Iterate over a streamed document's text in line-aligned chunks.
 
-    async def search(self, document: Document, query: str) -> List[SearchResult]:
-        """Search for content within the Markdown document tree.
+        Args:
+            document: Streamed document
+            chunk_bytes: Approximate size of each chunk
+
+        Yields:
+            Decoded chunks ending at line boundaries
+        """
+        encoding = document.metadata.get("encoding", "utf-8")
+        with open(document.file_path, "rb") as file:
+            while True:
+                chunk = file.read(chunk_bytes)
+                if not chunk:
+                    return
+                chunk += file.readline()
+                yield chunk.decode(encoding, "replace")
+
+    def search_streamed(self, document: Document, query: str) -> List[SearchResult]:
+        """Search a streamed document by scanning its file line by line.
+
+        Matches are mapped back to nodes through their spans, with one
+        result per matching node as in ``search``.
 
         Args:
-            document: Document to search within
+            document: Streamed document
             query: Search query string
 
         Returns:
             List of SearchResult objects with matches
         """
+        # Preorder is also byte order, so span starts are already sorted
+        nodes = [node for node in document.iter_nodes() if node.span is not None]
+        starts = [node.span[0] for node in nodes]
+
         results = []
+        seen = set()
         query_lower = query.lower()
+        encoding = document.metadata.get("encoding", "utf-8")
+        with open(document.file_path, "rb") as file:
+            position = 0
+            for raw in file:
+                offset = position
+                position += len(raw)
+                line = raw.decode(encoding, "replace").rstrip("\n")
+                if query_lower not in line.lower():
+                    continue
+                index = bisect_right(starts, offset) - 1
+                if index < 0 or nodes[index].id in seen:
+                    continue
+                node = nodes[index]
+                seen.add(node.id)
 
-        def search_node(node: DocumentNode) -> None:
-            if query_lower in node.content.lower():
                 # Find nearest heading as context
-                parent = node.parent
-                while parent and parent.type != "heading":
-                    parent = parent.parent
-
-                section_title = parent.title if parent else "Document Root"
+                parent = document.get_section_heading(node)
 
                 results.append(
                     SearchResult(
                         node_id=node.id,
-                        section=section_title,
+                        section=parent.title if parent else "Document Root",
                         section_id=parent.id if parent else "root",
                         content=node.content,
                         type=node.type,
-                        line_number=node.attributes.get("line_number"),
+                        line_number=node.get_attribute("line_number"),
                     )
                 )
 
-            for child in node.children:
-                search_node(child)
+        return results
 
-        if document.root:
-            search_node(document.root)
+    def process_content(
+        self,
+        content: Union[str, bytes],
+        file_path: Optional[Path] = None,
+        progress: Optional[ProgressCallback] = None,
+        engine: Optional[str] = None,
+    ) -> Document:
+        """Process in-memory Markdown text into DocumentNode tree structure.
 
-        return results
+        Args:
+            content: Markdown text, or UTF-8 encoded bytes
+            file_path: Optional path the content came from, used for the title
+            progress: Optional hook receiving (phase, done, total) updates
+            engine: Optional parse engine overriding ``self.engine``
+
+        Returns:
+            Document with populated DocumentNode tree
+        """
+        if isinstance(content, bytes):
+            content = content.decode("utf-8")
+
+        # Create document with tree structure
+        document = Document(
+            file_path=file_path,
+            title=file_path.stem if file_path else "Untitled Document",
+            source_text=content,
+            source_format="markdown",
+        )
+
+        # Parse content into tree structure
+        if progress:
+            progress("parse", 0, None)
+        root, stats = self.parse_markdown(content, engine)
+        document.root = root
+        document.metadata["parse_stats"] = stats
+        if progress:
+            progress("index", 0, None)
+        document.rebuild_index()
+
+        return document
+
+    def _parse_markdown_to_tree(self, content: str) -> DocumentNode:
+        """Parse Markdown content into DocumentNode tree structure."""
+        return parse_markdown_tree(content)
+
+    async def extract_node(
+        self, document: Document, node_id: str
+    ) -> Optional[DocumentNode]:
+        """Extract a specific node from the document tree.
+
+        Args:
+            document: Document containing the node tree
+            node_id: ID of the node to extract
+
+        Returns:
+            DocumentNode if found, None otherwise
+        """
+        return document.get_node(node_id)
+
+    async def search(self, document: Document, query: str) -> List[SearchResult]:
+        """Search for content within the Markdown document tree.
+
+        Args:
+            document: Document to search within
+            query: Search query string
+
+        Returns:
+            List of SearchResult objects with matches
+        """
+        if document.is_streamed:
+            return self.search_streamed(document, query)
+        return document.search(query)
 
     def extract_metadata(self, content: str) -> dict:
         """Extract metadata from Markdown frontmatter if present.
@@ -230,18 +374,18 @@ class MarkdownProcessor(BaseProcessor):
                         "title": node.title,
                         "level": node.level,
                         "depth": depth,
-                        "line_number": node.attributes.get("line_number"),
+                        "line_number": node.get_attribute("line_number"),
                         "has_children": bool(
                             [
                                 child
-                                for child in node.children
+                                for child in node.get_children()
                                 if child.type == "heading"
                             ]
                         ),
                     }
                 )
 
-            for child in node.children:
+            for child in node.get_children():
                 collect_headings(child, depth + 1 if node.type == "heading" else depth)
 
         if document.root:
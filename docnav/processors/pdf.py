@@ -1,13 +1,44 @@
 """PDF document processor using pymupdf4llm for DocumentNode tree structure."""
 
+import bisect
+import math
+import os
 import re
+from collections import Counter
+from concurrent.futures import as_completed
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
+import pymupdf
 import pymupdf4llm
 
 from ..models import Document, DocumentNode, SearchResult
-from .base import BaseProcessor
+from .base import BaseProcessor, ProgressCallback
+from .engines import DEFAULT_ENGINE_THRESHOLD
+from .scanner import parse_markdown_tree
+from .workers import get_process_pool
+
+_BLANK_LINE_RUN = re.compile(r"\n{3,}")
+
+
+def _convert_pages(
+    file_path: str, pages: Optional[List[int]], hdr_info: "pymupdf4llm.IdentifyHeaders"
+) -> str:
+    """Convert a page range of a PDF to markdown.
+
+    Module-level so it can run in a worker process.
+    """
+    return pymupdf4llm.to_markdown(file_path, pages=pages, hdr_info=hdr_info)
+
+
+def _collapse_blank_lines(markdown: str) -> str:
+    """Collapse runs of blank lines into one.
+
+    pymupdf4llm pads page and block ends with a varying number of blank
+    lines, even between runs over the same pages; a single blank line renders
+    the same and makes the output reproducible.
+    """
+    return _BLANK_LINE_RUN.sub("\n\n", markdown)
 
 
 class PDFProcessor(BaseProcessor):
@@ -15,8 +46,72 @@ class PDFProcessor(BaseProcessor):
 
     Converts PDF documents to Markdown format and then parses into DOM-like tree
     structure for efficient navigation and content extraction.
+
+    Large PDFs can be converted in parallel: the page range is split into
+    shards that are converted on the shared worker process pool and stitched
+    back together in page order.
+
+    In lazy mode only an outline is built at load time, straight from the
+    PDF's bookmarks when it has them, otherwise from a cheap font-size scan of
+    the pages. Page ranges are converted to markdown when a section is read or
+    a search hits them, and memoized on ``Document.pages``.
     """
 
+    # Converted markdown has its blank-line runs collapsed
+    version = "4"
+
+    OUTLINE_SOURCES = ("auto", "toc", "scan")
+
+    def __init__(
+        self,
+        workers: int = 1,
+        shard_pages: Optional[int] = None,
+        parallel_min_pages: int = 32,
+        lazy: bool = False,
+        outline_source: str = "auto",
+        engine: str = "auto",
+        engine_threshold: Optional[int] = DEFAULT_ENGINE_THRESHOLD,
+        parse_workers: int = 1,
+    ) -> None:
+        """Initialize the PDF processor.
+
+        Args:
+            workers: Number of page shards converted in parallel on the
+                shared worker process pool; 1 converts in-process, 0 uses one
+                shard per CPU
+            shard_pages: Pages per shard, defaults to an even split across
+                workers
+            parallel_min_pages: Minimum page count before sharding is used
+            lazy: Build only the outline at load time and convert pages on
+                demand
+            outline_source: Where lazy outlines come from: "toc" for native
+                bookmarks, "scan" for font-size detection, or "auto" to use
+                bookmarks when present and scan otherwise
+            engine: Parse engine for the converted markdown, "auto",
+                "scanner" or "commonmark"
+            engine_threshold: Size in characters from which "auto" uses the
+                scanner instead of CommonMark
+            parse_workers: Worker processes for CommonMark parses of large
+                converted markdown; 1 parses in-process
+        """
+        if outline_source not in self.OUTLINE_SOURCES:
+            raise ValueError(f"Unsupported outline source: {outline_source}")
+        self.configure_engine(engine, engine_threshold, parse_workers)
+
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.shard_pages = shard_pages
+        self.parallel_min_pages = parallel_min_pages
+        self.lazy = lazy
+        self.outline_source = outline_source
+
+    def get_cache_id(self, engine: Optional[str] = None) -> str:
+        """Get an identifier of this processor's parsing output."""
+        if self.lazy:
+            # Lazy outlines are built from the PDF itself, not parsed markdown
+            name = self.__class__.__name__
+            return f"{name}/{self.version}/lazy-{self.outline_source}"
+        return super().get_cache_id(engine)
+
     def can_process(self, file_path: Path) -> bool:
         """Check if this processor can handle PDF files."""
         return file_path.suffix.lower() == ".pdf"
@@ -25,11 +120,18 @@ class PDFProcessor(BaseProcessor):
         """Get supported file extensions."""
         return [".pdf"]
 
-    async def process(self, file_path: Path) -> Document:
+    async def process(
+        self,
+        file_path: Path,
+        progress: Optional[ProgressCallback] = None,
+        engine: Optional[str] = None,
+    ) -> Document:
         """Process a PDF document into DocumentNode tree structure.
 
         Args:
             file_path: Path to the PDF file
+            progress: Optional hook receiving (phase, done, total) updates
+            engine: Optional parse engine overriding ``self.engine``
 
         Returns:
             Document with populated DocumentNode tree
@@ -37,100 +139,419 @@ class PDFProcessor(BaseProcessor):
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
 
+        if self.lazy:
+            if progress:
+                progress("parse", 0, None)
+            return self.build_lazy_document(file_path)
+
         # Convert PDF to markdown using pymupdf4llm
-        markdown_content = pymupdf4llm.to_markdown(str(file_path))
+        markdown_content = self.convert_to_markdown(file_path, progress)
+        return self.markdown_to_document(markdown_content, file_path, progress, engine)
+
+    def process_content(
+        self,
+        content: Union[str, bytes],
+        file_path: Optional[Path] = None,
+        progress: Optional[ProgressCallback] = None,
+        engine: Optional[str] = None,
+    ) -> Document:
+        """Process in-memory PDF data into DocumentNode tree structure.
 
+        The pages are converted in this process; sharding and lazy loading
+        need a file on disk and are not used.
+
+        Args:
+            content: Raw PDF bytes
+            file_path: Optional path the content came from, used for the title
+            progress: Optional hook receiving (phase, done, total) updates
+            engine: Optional parse engine overriding ``self.engine``
+
+        Returns:
+            Document with populated DocumentNode tree
+        """
+        if not isinstance(content, bytes):
+            raise TypeError("PDF content must be bytes")
+
+        with pymupdf.open(stream=content, filetype="pdf") as pdf:
+            if progress:
+                progress("convert", 0, pdf.page_count)
+            markdown_content = _collapse_blank_lines(pymupdf4llm.to_markdown(pdf))
+            if progress:
+                progress("convert", pdf.page_count, pdf.page_count)
+
+        return self.markdown_to_document(markdown_content, file_path, progress, engine)
+
+    def markdown_to_document(
+        self,
+        markdown_content: str,
+        file_path: Optional[Path] = None,
+        progress: Optional[ProgressCallback] = None,
+        engine: Optional[str] = None,
+    ) -> Document:
+        """Parse converted PDF markdown into a Document.
+
+        Args:
+            markdown_content: Markdown produced from the PDF's pages
+            file_path: Optional path of the source PDF, used for the title
+            progress: Optional hook receiving (phase, done, total) updates
+            engine: Optional parse engine overriding ``self.engine``
+
+        Returns:
+            Document with populated DocumentNode tree
+        """
         # Create document with tree structure
         document = Document(
             file_path=file_path,
-            title=file_path.stem,
+            title=file_path.stem if file_path else "Untitled Document",
             source_text=markdown_content,
             source_format="pdf",
         )
 
         # Parse markdown content into tree structure
-        root = self._parse_markdown_to_tree(markdown_content)
+        if progress:
+            progress("parse", 0, None)
+        root, stats = self.parse_markdown(markdown_content, engine)
         document.root = root
+        document.metadata["parse_stats"] = stats
+        if progress:
+            progress("index", 0, None)
         document.rebuild_index()
 
         return document
 
-    def _parse_markdown_to_tree(self, content: str) -> DocumentNode:
-        """Parse Markdown content into DocumentNode tree structure."""
-        root = DocumentNode(type="document", id="root")
-        lines = content.split("\n")
+    def convert_to_markdown(
+        self, file_path: Path, progress: Optional[ProgressCallback] = None
+    ) -> str:
+        """Convert a PDF to markdown, sharding pages across processes if enabled.
 
-        current_parents = [root]  # Stack to track parent nodes
-        node_counter = 0
-
-        for line_num, line in enumerate(lines):
-            # Parse headings
-            heading_match = re.match(r"^(#{1,6})\s+(.+)$", line)
-            if heading_match:
-                level = len(heading_match.group(1))
-                title = heading_match.group(2).strip()
-                node_id = f"h{level}_{node_counter}"
-
-                # Adjust parent stack based on heading level
-                while len(current_parents) > level:
-                    current_parents.pop()
-
-                heading_node = DocumentNode(
-                    type="heading",
-                    level=level,
-                    id=node_id,
-                    title=title,
-                    content=line,
-                    attributes={"line_number": line_num, "raw_line": line},
-                )
+        Args:
+            file_path: Path to the PDF file
+            progress: Optional hook receiving ("convert", pages_done, page_count)
+                updates, once per finished shard
 
-                current_parents[-1].add_child(heading_node)
-                current_parents.append(heading_node)
-                node_counter += 1
-                continue
+        Returns:
+            Markdown text of all pages in page order
+        """
+        with pymupdf.open(file_path) as pdf:
+            page_count = pdf.page_count
+            # Header levels come from font sizes across the whole document;
+            # scan once so every shard assigns the same levels
+            hdr_info = pymupdf4llm.IdentifyHeaders(pdf)
+
+        if progress:
+            progress("convert", 0, page_count)
+
+        shards = self._page_shards(page_count)
+        if (
+            self.workers <= 1
+            or page_count < self.parallel_min_pages
+            or len(shards) <= 1
+        ):
+            markdown_content = _convert_pages(str(file_path), None, hdr_info)
+            if progress:
+                progress("convert", page_count, page_count)
+            return _collapse_blank_lines(markdown_content)
+
+        executor = get_process_pool()
+        futures = [
+            executor.submit(_convert_pages, str(file_path), shard, hdr_info)
+            for shard in shards
+        ]
+        if progress:
+            shard_sizes = {future: len(shard) for future, shard in zip(futures, shards)}
+            pages_done = 0
+            for future in as_completed(futures):
+                pages_done += shard_sizes[future]
+                progress("convert", pages_done, page_count)
+
+        # Stitch shards back together in page order; collapsing blank lines
+        # after joining also evens out the padding at shard seams
+        return _collapse_blank_lines("".join(future.result() for future in futures))
+
+    def _page_shards(self, page_count: int) -> List[List[int]]:
+        """Split page indices into contiguous shards."""
+        shard_size = self.shard_pages or math.ceil(page_count / self.workers)
+        shard_size = max(1, shard_size)
+        return [
+            list(range(start, min(start + shard_size, page_count)))
+            for start in range(0, page_count, shard_size)
+        ]
+
+    def build_lazy_document(self, file_path: Path) -> Document:
+        """Build a document holding only the outline, with no page content.
+
+        Headings come from the PDF's bookmarks or a font-size scan of the text
+        spans (see ``outline_source``), both much cheaper than markdown
+        conversion. Each heading records the 0-based ``page_start`` and
+        inclusive ``page_end`` of its section.
 
-            # Parse code blocks
-            if line.strip().startswith("```"):
-                code_node = DocumentNode(
-                    type="code_block",
-                    id=f"code_{node_counter}",
-                    content=line,
-                    attributes={"line_number": line_num, "language": line.strip()[3:]},
-                )
-                current_parents[-1].add_child(code_node)
-                node_counter += 1
+        Args:
+            file_path: Path to the PDF file
+
+        Returns:
+            Document with heading nodes only, marked as lazy
+        """
+        with pymupdf.open(file_path) as pdf:
+            page_count = pdf.page_count
+            headings: List[Tuple[int, str, int]] = []
+            source = "pages"
+            if self.outline_source in ("auto", "toc"):
+                headings = self._read_toc(pdf)
+                source = "toc"
+            if not headings and self.outline_source in ("auto", "scan"):
+                headings = self._scan_headings(pdf)
+                source = "scan"
+
+        if not headings:
+            # No usable structure - fall back to one section per page
+            headings = [(1, f"Page {page + 1}", page) for page in range(page_count)]
+            source = "pages"
+
+        document = Document(
+            file_path=file_path,
+            title=file_path.stem,
+            source_text="",
+            source_format="pdf",
+        )
+        document.root = self._build_outline_tree(headings, page_count)
+        document.metadata.update(
+            {"lazy": True, "page_count": page_count, "outline_source": source}
+        )
+        document.rebuild_index()
+
+        return document
+
+    def _read_toc(self, pdf: "pymupdf.Document") -> List[Tuple[int, str, int]]:
+        """Read heading entries from the PDF's native bookmarks.
+
+        Bookmarks without a resolvable target page inherit the page of the
+        previous entry.
+
+        Returns:
+            List of (level, title, page_index) in bookmark order
+        """
+        headings: List[Tuple[int, str, int]] = []
+        last_page = 0
+        for level, title, page_number in pdf.get_toc(simple=True):
+            title = " ".join(title.split())
+            if not title:
                 continue
+            if 1 <= page_number <= pdf.page_count:
+                last_page = page_number - 1
+            headings.append((max(1, level), title, last_page))
+        return headings
 
-            # Parse lists
-            if re.match(r"^(\s*)([-*+]|\d+\.)\s+", line):
-                list_node = DocumentNode(
-                    type="list_item",
-                    id=f"list_{node_counter}",
-                    content=line,
-                    attributes={
-                        "line_number": line_num,
-                        "list_type": (
-                            "ordered" if re.match(r"^\s*\d+\.", line) else "unordered"
-                        ),
-                    },
-                )
-                current_parents[-1].add_child(list_node)
-                node_counter += 1
+    def _scan_headings(self, pdf: "pymupdf.Document") -> List[Tuple[int, str, int]]:
+        """Detect headings from font sizes larger than the body text size.
+
+        Returns:
+            List of (level, title, page_index) in document order
+        """
+        size_weights: Counter = Counter()
+        lines: List[Tuple[int, int, str]] = []  # (page_index, size, text)
+
+        for page_index, page in enumerate(pdf):
+            page_dict = page.get_text("dict", flags=pymupdf.TEXTFLAGS_TEXT)
+            for block in page_dict["blocks"]:
+                for line in block.get("lines", []):
+                    spans = [span for span in line["spans"] if span["text"].strip()]
+                    if not spans:
+                        continue
+                    text = " ".join(span["text"].strip() for span in spans)
+                    size = round(max(span["size"] for span in spans))
+                    size_weights[size] += len(text)
+                    lines.append((page_index, size, text))
+
+        if not size_weights:
+            return []
+
+        # Headings must be clearly larger than the dominant body size
+        body_size = size_weights.most_common(1)[0][0]
+        heading_sizes = sorted(
+            {size for size in size_weights if size >= body_size * 1.15},
+            reverse=True,
+        )[:6]
+        level_of = {size: level for level, size in enumerate(heading_sizes, 1)}
+
+        headings: List[Tuple[int, str, int]] = []
+        previous: Optional[Tuple[int, int]] = None
+        for page_index, size, text in lines:
+            level = level_of.get(size)
+            if level is None or len(text) > 200:
+                previous = None
                 continue
+            if previous == (page_index, size):
+                # Consecutive lines of the same heading (wrapped titles)
+                last_level, last_title, last_page = headings[-1]
+                if len(last_title) + len(text) < 200:
+                    headings[-1] = (last_level, f"{last_title} {text}", last_page)
+            else:
+                headings.append((level, text, page_index))
+            previous = (page_index, size)
 
-            # Parse paragraphs and other content
-            if line.strip():
-                para_node = DocumentNode(
-                    type="paragraph",
-                    id=f"p_{node_counter}",
-                    content=line,
-                    attributes={"line_number": line_num},
-                )
-                current_parents[-1].add_child(para_node)
-                node_counter += 1
+        return headings
+
+    def _build_outline_tree(
+        self, headings: List[Tuple[int, str, int]], page_count: int
+    ) -> DocumentNode:
+        """Build a heading tree with page spans from (level, title, page) entries."""
+        root = DocumentNode(type="document", id="root")
+        current_parents = [root]  # Stack to track parent nodes
+
+        # A section runs until the next heading of the same or higher rank;
+        # scan backwards remembering the nearest later heading per level
+        page_ends = [page_count - 1] * len(headings)
+        nearest: Dict[int, Tuple[int, int]] = {}  # level -> (index, page)
+        for index in range(len(headings) - 1, -1, -1):
+            level, _, page = headings[index]
+            following = [nearest[lvl] for lvl in range(1, level + 1) if lvl in nearest]
+            if following:
+                page_ends[index] = max(page, min(following)[1])
+            nearest[level] = (index, page)
+
+        for node_counter, (level, title, page) in enumerate(headings):
+            page_end = page_ends[node_counter]
+
+            while len(current_parents) > level:
+                current_parents.pop()
+
+            heading_node = DocumentNode(
+                type="heading",
+                level=level,
+                id=f"h{level}_{node_counter}",
+                title=title,
+                content=f"{'#' * level} {title}",
+                attributes={"page_start": page, "page_end": page_end},
+            )
+            current_parents[-1].add_child(heading_node)
+            current_parents.append(heading_node)
 
         return root
 
+    def load_pages(self, document: Document, pages: Iterable[int]) -> str:
+        """Get markdown for pages of a lazy document, converting missing ones.
+
+        Args:
+            document: Lazily loaded document
+            pages: 0-based page indices
+
+        Returns:
+            Markdown of the requested pages in page order
+        """
+        wanted = sorted(set(pages))
+        missing = [page for page in wanted if page not in document.pages]
+
+        # Convert each contiguous run of missing pages with one call
+        run: List[int] = []
+        for page in missing + [-1]:
+            if run and page != run[-1] + 1:
+                chunks = pymupdf4llm.to_markdown(
+                    str(document.file_path), pages=run, page_chunks=True
+                )
+                for run_page, chunk in zip(run, chunks):
+                    document.pages[run_page] = chunk["text"]
+                run = []
+            run.append(page)
+
+        return "".join(document.pages[page] for page in wanted)
+
+    def read_lazy_section(self, document: Document, node: DocumentNode) -> str:
+        """Read a section of a lazy document by converting its page span.
+
+        Sections are resolved at page granularity, so the result can include
+        the end of the previous section and the start of the next one.
+
+        Args:
+            document: Lazily loaded document
+            node: Heading node or document root
+
+        Returns:
+            Markdown of the pages spanned by the section
+        """
+        if node.type == "document":
+            page_count = document.metadata.get("page_count", 0)
+            return self.load_pages(document, range(page_count))
+
+        page_start = node.get_attribute("page_start")
+        if page_start is None:
+            return node.content
+        page_end = node.get_attribute("page_end", page_start)
+        return self.load_pages(document, range(page_start, page_end + 1))
+
+    def _page_texts(self, document: Document) -> Dict[int, str]:
+        """Get cheap plain text of every page, memoized on the document."""
+        page_count = document.metadata.get("page_count", 0)
+        if len(document.page_text) < page_count:
+            with pymupdf.open(document.file_path) as pdf:
+                for page_index, page in enumerate(pdf):
+                    if page_index not in document.page_text:
+                        document.page_text[page_index] = page.get_text()
+        return document.page_text
+
+    def _section_locator(self, document: Document):
+        """Build a lookup from page index to the innermost covering heading."""
+        headings = sorted(
+            (
+                node
+                for node in document.iter_nodes()
+                if node.type == "heading"
+                and node.get_attribute("page_start") is not None
+            ),
+            key=lambda node: node.attributes["page_start"],
+        )
+        starts = [node.attributes["page_start"] for node in headings]
+
+        def locate(page: int) -> DocumentNode:
+            position = bisect.bisect_right(starts, page)
+            if position == 0:
+                return document.root
+            return headings[position - 1]
+
+        return locate
+
+    def search_lazy(self, document: Document, query: str) -> List[SearchResult]:
+        """Search a lazy document, converting only pages that contain the query.
+
+        Plain page text is used to find candidate pages; only those pages are
+        converted to markdown and searched line by line.
+
+        Args:
+            document: Lazily loaded document
+            query: Search query string
+
+        Returns:
+            List of SearchResult objects with matches
+        """
+        query_lower = query.lower()
+        candidates = [
+            page
+            for page, text in sorted(self._page_texts(document).items())
+            if query_lower in text.lower()
+        ]
+        self.load_pages(document, candidates)
+
+        locate_section = self._section_locator(document)
+        results = []
+        for page in candidates:
+            section = locate_section(page)
+            for line in document.pages[page].split("\n"):
+                if query_lower in line.lower():
+                    results.append(
+                        SearchResult(
+                            node_id=section.id,
+                            section=section.title or "Document Root",
+                            section_id=section.id,
+                            content=line,
+                            type="page",
+                        )
+                    )
+
+        return results
+
+    def _parse_markdown_to_tree(self, content: str) -> DocumentNode:
+        """Parse Markdown content into DocumentNode tree structure."""
+        return parse_markdown_tree(content)
+
     async def extract_node(
         self, document: Document, node_id: str
     ) -> Optional[DocumentNode]:
@@ -155,36 +576,9 @@ class PDFProcessor(BaseProcessor):
         Returns:
             List of SearchResult objects with matches
         """
-        results = []
-        query_lower = query.lower()
-
-        def search_node(node: DocumentNode) -> None:
-            if query_lower in node.content.lower():
-                # Find nearest heading as context
-                parent = node.parent
-                while parent and parent.type != "heading":
-                    parent = parent.parent
-
-                section_title = parent.title if parent else "Document Root"
-
-                results.append(
-                    SearchResult(
-                        node_id=node.id,
-                        section=section_title,
-                        section_id=parent.id if parent else "root",
-                        content=node.content,
-                        type=node.type,
-                        line_number=node.attributes.get("line_number"),
-                    )
-                )
-
-            for child in node.children:
-                search_node(child)
-
-        if document.root:
-            search_node(document.root)
-
-        return results
+        if document.is_lazy:
+            return self.search_lazy(document, query)
+        return document.search(query)
 
     def get_heading_hierarchy(self, document: Document) -> List[dict]:
         """Get hierarchical structure of headings in the document.
@@ -205,18 +599,18 @@ class PDFProcessor(BaseProcessor):
                         "title": node.title,
                         "level": node.level,
                         "depth": depth,
-                        "line_number": node.attributes.get("line_number"),
+                        "line_number": node.get_attribute("line_number"),
                         "has_children": bool(
                             [
                                 child
-                                for child in node.children
+                                for child in node.get_children()
                                 if child.type == "heading"
                             ]
                         ),
                     }
                 )
 
-            for child in node.children:
+            for child in node.get_children():
                 collect_headings(child, depth + 1 if node.type == "heading" else depth)
 
         if document.root:
@@ -0,0 +1,244 @@
+"""Single-pass line scanner that turns Markdown into a DocumentNode tree.
+
+Shared by the Markdown and PDF processors. Every line is looked at once, in
+order, by a small state machine that tracks fenced code blocks, so lines
+inside fences never become headings, list items or paragraphs. Besides ATX
+headings it recognizes setext headings (a text line underlined with ``===``
+or ``---``) and ordered (``1.``/``1)``) and unordered list items.
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from ..models import DocumentNode, FileSource
+
+_ATX_HEADING = re.compile(r"(#{1,6})\s+(.+)$")
+_FENCE_OPEN = re.compile(r" {0,3}(`{3,}|~{3,})(.*)$")
+_LIST_ITEM = re.compile(r"\s*(?:([-*+])|(\d+)[.)])\s+")
+_SETEXT_UNDERLINE = re.compile(r" {0,3}(=+|-+)[ \t]*$")
+
+# First characters that may start something other than a paragraph line
+_BLOCK_STARTS = frozenset("#`~-*+=0123456789 \t")
+
+
+def parse_markdown_tree(content: str) -> DocumentNode:
+    """Parse Markdown content into a DocumentNode tree.
+
+    Node ids are ``h{level}_{n}``, ``code_{n}``, ``list_{n}`` and ``p_{n}``
+    where ``n`` counts nodes in document order. Every node records the
+    0-based ``line_number`` it starts on. Node content is a span of
+    ``content`` (see ``DocumentNode.set_span``), so the text is not copied.
+
+    Args:
+        content: Markdown text
+
+    Returns:
+        Root node of type ``document`` with id ``root``
+    """
+
+    def lines() -> Iterator[Tuple[int, int, str]]:
+        position = 0
+        for line in content.split("\n"):
+            end = position + len(line)
+            yield position, end, line
+            position = end + 1
+
+    return _scan(lines(), content)
+
+
+def parse_markdown_file(
+    file_path: Path, encoding: str = "utf-8"
+) -> Tuple[DocumentNode, int]:
+    """Parse a Markdown file incrementally, one line at a time.
+
+    Builds the same tree as ``parse_markdown_tree`` without holding the
+    text: node spans are byte ranges of the file, read back through a
+    memory-mapped ``FileSource`` when ``content`` is accessed.
+
+    Args:
+        file_path: Path to the Markdown file
+        encoding: Text encoding of the file
+
+    Returns:
+        Tuple of (root node, number of bytes read)
+    """
+    size = [0]
+
+    def lines(file) -> Iterator[Tuple[int, int, str]]:
+        position = 0
+        for raw in file:
+            length = len(raw)
+            if raw.endswith(b"\n"):
+                raw = raw[:-1]
+            yield position, position + len(raw), raw.decode(encoding, "replace")
+            position += length
+        size[0] = position
+
+    with open(file_path, "rb") as file:
+        root = _scan(lines(file), FileSource(file_path, encoding))
+    return root, size[0]
+
+
+def _scan(lines: Iterable[Tuple[int, int, str]], source: Any) -> DocumentNode:
+    """Build the tree from (start offset, end offset, line) tuples.
+
+    Every node's content is set to the span of ``source`` it came from.
+    """
+    root = DocumentNode(type="document", id="root")
+
+    current_parents: List[DocumentNode] = [root]  # Stack of open sections
+    node_counter = 0
+
+    # Opening marker of the code block being read, if any
+    fence_marker = ""
+    fence_node = None
+
+    # Paragraph node created from the previous line, a setext candidate
+    last_paragraph = None
+    last_paragraph_line = ""
+    line_num = -1
+    end = 0
+
+    for start, end, line in lines:
+        line_num += 1
+        if fence_marker:
+            if _closes_fence(line, fence_marker):
+                _close_fence(fence_node, line_num, end)
+                fence_marker = ""
+                fence_node = None
+            continue
+
+        if not line or line[0] not in _BLOCK_STARTS:
+            # Fast path: plain text line or blank line
+            if line.strip():
+                last_paragraph = _leaf(
+                    "paragraph", f"p_{node_counter}", line_num, source, start, end
+                )
+                last_paragraph_line = line
+                current_parents[-1].add_child(last_paragraph)
+                node_counter += 1
+            else:
+                last_paragraph = None
+            continue
+
+        if line[0] == "#":
+            heading_match = _ATX_HEADING.match(line)
+            if heading_match:
+                level = len(heading_match.group(1))
+                heading_node = DocumentNode(
+                    type="heading",
+                    level=level,
+                    id=f"h{level}_{node_counter}",
+                    title=heading_match.group(2).strip(),
+                    attributes={"line_number": line_num, "raw_line": line},
+                )
+                heading_node.set_span(source, start, end)
+                _open_section(current_parents, heading_node)
+                node_counter += 1
+                last_paragraph = None
+                continue
+
+        if last_paragraph is not None and line[0] in "=- ":
+            underline_match = _SETEXT_UNDERLINE.match(line)
+            if underline_match:
+                # The previous text line is the heading's title
+                level = 1 if underline_match.group(1)[0] == "=" else 2
+                current_parents[-1].children.pop()
+                heading_node = DocumentNode(
+                    type="heading",
+                    level=level,
+                    id=f"h{level}_{last_paragraph.id[2:]}",
+                    title=last_paragraph_line.strip(),
+                    attributes={
+                        "line_number": last_paragraph.get_attribute("line_number"),
+                        "raw_line": last_paragraph_line,
+                    },
+                )
+                heading_node.set_span(source, last_paragraph.span[0], end)
+                _open_section(current_parents, heading_node)
+                last_paragraph = None
+                continue
+
+        if line[0] in "`~ ":
+            fence_match = _match_fence_open(line)
+            if fence_match:
+                fence_marker = fence_match.group(1)
+                fence_node = _leaf(
+                    "code_block", f"code_{node_counter}", line_num, source, start, end
+                )
+                fence_node.attributes["language"] = fence_match.group(2).strip()
+                current_parents[-1].add_child(fence_node)
+                node_counter += 1
+                last_paragraph = None
+                continue
+
+        list_match = _LIST_ITEM.match(line)
+        if list_match:
+            list_node = _leaf(
+                "list_item", f"list_{node_counter}", line_num, source, start, end
+            )
+            list_node.attributes["list_type"] = (
+                "unordered" if list_match.group(1) else "ordered"
+            )
+            list_node.attributes["indent"] = len(line) - len(line.lstrip())
+            current_parents[-1].add_child(list_node)
+            node_counter += 1
+            last_paragraph = None
+            continue
+
+        if line.strip():
+            last_paragraph = _leaf(
+                "paragraph", f"p_{node_counter}", line_num, source, start, end
+            )
+            last_paragraph_line = line
+            current_parents[-1].add_child(last_paragraph)
+            node_counter += 1
+        else:
+            last_paragraph = None
+
+    if fence_node is not None:
+        # Unclosed fences run to the end of the document
+        _close_fence(fence_node, line_num, end)
+
+    return root
+
+
+def _leaf(
+    node_type: str, node_id: str, line_num: int, source: Any, start: int, end: int
+) -> DocumentNode:
+    """Create a single-line node whose content is a span of the source."""
+    node = DocumentNode(
+        type=node_type, id=node_id, attributes={"line_number": line_num}
+    )
+    node.set_span(source, start, end)
+    return node
+
+
+def _match_fence_open(line: str) -> Optional["re.Match[str]"]:
+    """Match a line opening a code fence; group 1 is the marker, 2 the info."""
+    fence_match = _FENCE_OPEN.match(line)
+    if fence_match and fence_match.group(1)[0] == "`" and "`" in fence_match.group(2):
+        # Backtick fences cannot have backticks in their info string
+        return None
+    return fence_match
+
+
+def _closes_fence(line: str, marker: str) -> bool:
+    """Check whether a line closes the fence opened with ``marker``."""
+    stripped = line.strip()
+    return stripped.startswith(marker) and not stripped.strip(marker[0])
+
+
+def _close_fence(node: DocumentNode, line_num: int, end: int) -> None:
+    """Extend a fenced code block's span to its last line."""
+    node.attributes["end_line"] = line_num
+    node.set_span(node.source, node.span[0], end)
+
+
+def _open_section(current_parents: List[DocumentNode], heading: DocumentNode) -> None:
+    """Attach a heading under the nearest shallower heading and open it."""
+    while len(current_parents) > heading.level:
+        current_parents.pop()
+    current_parents[-1].add_child(heading)
+    current_parents.append(heading)
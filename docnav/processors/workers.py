@@ -0,0 +1,46 @@
+"""Process pool shared by parallel parsing and PDF conversion.
+
+Starting a spawned interpreter and importing the parsers costs far more than
+parsing a few hundred kilobytes, so worker processes are started once and
+reused by every load. One pool serves CommonMark partitions and PDF page
+shards alike, so the number of worker processes stays bounded however many
+documents load at the same time.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Get the shared worker process pool, creating it on first use.
+
+    The pool holds up to one process per CPU; processes are only started as
+    work is submitted.
+
+    Returns:
+        The shared ProcessPoolExecutor
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned workers avoid forking a process that may be running threads
+            _pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_process_pool() -> None:
+    """Stop the shared worker processes; the next use starts a new pool."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
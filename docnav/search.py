@@ -0,0 +1,659 @@
+"""Token-level inverted index over the nodes of a document.
+
+Node content is lowercased and split into word tokens. Each term maps to
+its postings: the (ordinal, position) pair of every occurrence, in preorder
+and then position order, kept flat in one ``array`` per term. Lookups read
+only the postings of the query terms, so their cost follows the number of
+occurrences rather than the size of the document.
+
+Queries are parsed by ``parse_query``: words must all occur in a node,
+``"quoted phrases"`` must occur as consecutive tokens (so they match across
+line breaks), and ``A NEAR/k B`` requires A and B within k words of each
+other. Phrases and NEAR are checked against the positions in the postings
+of the query terms only.
+
+Matches are ranked with BM25 from the index's term statistics, and only
+the best ``limit`` are selected, with a heap. ``CorpusIndex`` combines the
+indexes of several documents for ranked searches across all of them.
+"""
+
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from operator import neg
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+# Search modes accepted by Document.search and DocumentNavigator.search_document
+TOKEN_MODE = "token"
+SUBSTRING_MODE = "substring"
+SEARCH_MODES = (TOKEN_MODE, SUBSTRING_MODE)
+
+_TOKEN = re.compile(r"\w+")
+
+# Query syntax: "quoted phrases" (closing quote optional), NEAR/k, words
+_QUERY = re.compile(r'"([^"]*)"?|NEAR/(\d+)|[^\s"]+')
+
+_NO_POSTINGS = array("i")
+
+# BM25 term frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def bm25_idf(nodes: int, containing: int) -> float:
+    """Get the BM25 weight of a term found in ``containing`` of ``nodes``."""
+    return math.log(1 + (nodes - containing + 0.5) / (containing + 0.5))
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN.findall(text.lower())
+
+
+def make_snippet(content: str, terms: Iterable[str], width: int = 160) -> str:
+    """Cut the part of a node's content around its first query term.
+
+    Args:
+        content: Node content
+        terms: Lowercase query terms
+        width: Maximum snippet length, not counting ellipses
+
+    Returns:
+        Single-line snippet, with "..." where content was cut off
+    """
+    text = " ".join(content.split())
+    if len(text) <= width:
+        return text
+
+    lowered = text.lower()
+    terms = set(terms)
+    start = 0
+    for match in _TOKEN.finditer(lowered):
+        if match.group() in terms:
+            # Keep some text before the term for context
+            start = max(0, match.start() - width // 4)
+            break
+    start = min(start, len(text) - width)
+    snippet = text[start : start + width]
+    if start > 0:
+        snippet = "..." + snippet
+    if start + width < len(text):
+        snippet += "..."
+    return snippet
+
+
+class SearchQuery:
+    """Token search query parsed by ``parse_query``.
+
+    Attributes:
+        operands: Phrases that must all occur in a matching node, as tuples
+            of terms; plain words are one-term phrases
+        near: (left, right, distance) constraints between operand indexes,
+            requiring at most ``distance`` words between the two operands
+    """
+
+    def __init__(
+        self,
+        operands: List[Tuple[str, ...]],
+        near: Optional[List[Tuple[int, int, int]]] = None,
+    ) -> None:
+        """Create a query from operands and NEAR constraints."""
+        self.operands = operands
+        self.near = near or []
+
+    @property
+    def terms(self) -> List[str]:
+        """Distinct terms of all operands, in query order."""
+        return list(dict.fromkeys(term for phrase in self.operands for term in phrase))
+
+    @property
+    def is_plain(self) -> bool:
+        """Whether the query is only words, without phrases or NEAR."""
+        return not self.near and all(len(phrase) == 1 for phrase in self.operands)
+
+
+def parse_query(query: str) -> SearchQuery:
+    """Parse a token search query.
+
+    Unquoted text is split into words. ``"..."`` is a phrase and
+    ``A NEAR/k B`` links the operands on either side, each a word or a
+    phrase. A NEAR without an operand on both sides is read as words.
+
+    Args:
+        query: Search query string
+
+    Returns:
+        Parsed query; its ``terms`` are empty for queries without words
+    """
+    operands: List[Tuple[str, ...]] = []
+    near: List[Tuple[int, int, int]] = []
+    pending: Optional[int] = None
+    for match in _QUERY.finditer(query):
+        phrase, distance = match.group(1), match.group(2)
+        if distance is not None and operands and pending is None:
+            pending = int(distance)
+            continue
+        if phrase is not None:
+            terms = tokenize(phrase)
+            phrases = [tuple(terms)] if terms else []
+        else:
+            phrases = [(term,) for term in tokenize(match.group())]
+        for terms in phrases:
+            if pending is not None:
+                near.append((len(operands) - 1, len(operands), pending))
+                pending = None
+            operands.append(terms)
+    if pending is not None:
+        operands.extend([("near",), (str(pending),)])
+    return SearchQuery(operands, near)
+
+
+def _within(
+    starts: List[int], length: int, other: List[int], other_length: int, words: int
+) -> bool:
+    """Check whether two operands occur at most ``words`` words apart.
+
+    Args:
+        starts: Sorted start positions of the first operand
+        length: Terms in the first operand
+        other: Sorted start positions of the second operand
+        other_length: Terms in the second operand
+        words: Maximum number of words between the operands
+
+    Returns:
+        True if some non-overlapping pair of occurrences is close enough
+    """
+    for start in starts:
+        # Second operand after the first one
+        index = bisect_left(other, start + length)
+        if index < len(other) and other[index] <= start + length + words:
+            return True
+        # Second operand before the first one
+        index = bisect_right(other, start - other_length) - 1
+        if index >= 0 and other[index] >= start - other_length - words:
+            return True
+    return False
+
+
+def check_search_mode(mode: str) -> None:
+    """Raise ValueError for unknown search modes."""
+    if mode not in SEARCH_MODES:
+        raise ValueError(
+            f"Unsupported search mode: {mode} (expected one of {SEARCH_MODES})"
+        )
+
+
+class InvertedIndex:
+    """Inverted index from terms to the nodes and positions they occur at."""
+
+    def __init__(self) -> None:
+        """Create an empty index; use ``from_contents`` to build one."""
+        self.postings: Dict[str, array] = {}  # term -> ordinal, position pairs
+        self.lengths = array("i")  # tokens per node, by ordinal
+        self.total_length = 0  # tokens in all nodes
+        self._node_frequencies: Dict[str, int] = {}  # term -> nodes, on demand
+
+    @classmethod
+    def from_contents(cls, contents: Iterable[str]) -> "InvertedIndex":
+        """Index node contents given in ordinal order.
+
+        Args:
+            contents: Content of each node, the node at ordinal 0 first
+
+        Returns:
+            InvertedIndex over the contents
+        """
+        index = cls()
+        postings = index.postings
+        lengths = index.lengths
+        for ordinal, content in enumerate(contents):
+            if not content:
+                lengths.append(0)
+                continue
+            tokens = _TOKEN.findall(content.lower())
+            lengths.append(len(tokens))
+            for position, token in enumerate(tokens):
+                term = postings.get(token)
+                if term is None:
+                    term = postings[token] = array("i")
+                term.append(ordinal)
+                term.append(position)
+        index.total_length = sum(lengths)
+        return index
+
+    def __setstate__(self, state: dict) -> None:
+        """Restore pickled indexes, which do not keep computed frequencies."""
+        self.__dict__.update(state)
+        self._node_frequencies = {}
+
+    def __getstate__(self) -> dict:
+        """Pickle the postings and lengths without computed frequencies."""
+        state = self.__dict__.copy()
+        del state["_node_frequencies"]
+        return state
+
+    def __len__(self) -> int:
+        """Number of indexed nodes."""
+        return len(self.lengths)
+
+    def get_postings(self, term: str) -> array:
+        """Get the flat (ordinal, position) pairs of a term; do not modify."""
+        return self.postings.get(term, _NO_POSTINGS)
+
+    def ordinals(self, term: str) -> List[int]:
+        """Get the ordinals of the nodes containing a term, in preorder."""
+        return list(dict.fromkeys(self.get_postings(term)[::2]))
+
+    def term_counts(self, term: str) -> Counter:
+        """Count the occurrences of a term in each node, by ordinal."""
+        counts = Counter(self.get_postings(term)[::2])
+        self._node_frequencies[term] = len(counts)
+        return counts
+
+    def node_frequency(self, term: str) -> int:
+        """Get the number of nodes containing a term."""
+        frequency = self._node_frequencies.get(term)
+        if frequency is None:
+            frequency = len(self.term_counts(term))
+        return frequency
+
+    def match_counts(
+        self, terms: Iterable[str]
+    ) -> Tuple[List[int], Dict[str, Counter]]:
+        """Find the nodes containing every term, with per-node term counts.
+
+        Args:
+            terms: Lowercase query terms
+
+        Returns:
+            Tuple of (ordinals in preorder, ``term_counts`` of each term)
+        """
+        counts = {term: self.term_counts(term) for term in set(terms)}
+        if not counts:
+            return [], counts
+        rarest, *others = sorted(counts.values(), key=len)
+        if not others:
+            return list(rarest), counts
+        ordinals = [
+            ordinal
+            for ordinal in rarest
+            if all(ordinal in term_counts for term_counts in others)
+        ]
+        return ordinals, counts
+
+    def bm25_scores(
+        self,
+        counts: Dict[str, Counter],
+        ordinals: Sequence[int],
+        weights: Dict[str, float],
+        average_length: float,
+    ) -> List[float]:
+        """Score nodes with BM25.
+
+        Args:
+            counts: Per-node counts of each query term, from ``match_counts``
+            ordinals: Nodes to score
+            weights: IDF weight of each term
+            average_length: Average node length in tokens of the collection
+                the weights come from
+
+        Returns:
+            Score of each node in ``ordinals``, in the same order
+        """
+        lengths = self.lengths
+        saturation = BM25_K1 + 1
+        base = BM25_K1 * (1 - BM25_B)
+        scale = BM25_K1 * BM25_B / (average_length or 1)
+        norms = [base + scale * lengths[ordinal] for ordinal in ordinals]
+        scores = [0.0] * len(ordinals)
+        for term, term_counts in counts.items():
+            weight = weights[term] * saturation
+            frequencies = map(term_counts.__getitem__, ordinals)
+            scores = [
+                score + weight * frequency / (frequency + norm)
+                for score, frequency, norm in zip(scores, frequencies, norms)
+            ]
+        return scores
+
+    def query_counts(self, query: SearchQuery) -> Tuple[List[int], Dict[str, Counter]]:
+        """Find the nodes matching a query, with per-node term counts.
+
+        Args:
+            query: Parsed query
+
+        Returns:
+            Tuple of (ordinals in preorder, ``term_counts`` of each term)
+        """
+        if query.is_plain:
+            return self.match_counts(query.terms)
+        counts = {term: self.term_counts(term) for term in query.terms}
+        return self.match_query(query), counts
+
+    def rank(
+        self, query: SearchQuery, limit: int
+    ) -> Tuple[int, List[Tuple[float, int]]]:
+        """Find the nodes matching a query and keep the best ``limit``.
+
+        Nodes are scored with BM25 over this index's statistics and picked
+        with a heap, so only the selected hits are sorted. With NumPy
+        installed, counting, scoring and selection are vectorized.
+
+        Args:
+            query: Parsed query
+            limit: Maximum number of hits
+
+        Returns:
+            Tuple of (number of matching nodes, (score, ordinal) hits), best
+            first; ties keep preorder
+        """
+        if np is not None:
+            if query.is_plain:
+                return self._rank_numpy(set(query.terms), limit)
+            matches = np.array(self.match_query(query), dtype=np.int32)
+            return self._rank_numpy(set(query.terms), limit, matches)
+
+        ordinals, counts = self.query_counts(query)
+        if not ordinals or limit <= 0:
+            return len(ordinals), []
+
+        nodes = len(self.lengths)
+        weights = {term: bm25_idf(nodes, len(c)) for term, c in counts.items()}
+        scores = self.bm25_scores(counts, ordinals, weights, self.total_length / nodes)
+        best = heapq.nlargest(limit, zip(scores, map(neg, ordinals)))
+        return len(ordinals), [(score, -ordinal) for score, ordinal in best]
+
+    def _numpy_counts(self, term: str) -> Tuple[Any, Any]:
+        """Get the sorted ordinals containing a term and the term's counts."""
+        occurrences = np.frombuffer(self.get_postings(term), dtype=np.int32)[::2]
+        starts = np.flatnonzero(
+            np.concatenate(([True], occurrences[1:] != occurrences[:-1]))
+        )
+        counts = np.diff(np.append(starts, len(occurrences)))
+        return occurrences[starts], counts
+
+    def _rank_numpy(
+        self, terms: set, limit: int, matches: Any = None
+    ) -> Tuple[int, List[Tuple[float, int]]]:
+        """Vectorized ``rank``, giving the same hits in the same order.
+
+        ``matches`` holds the sorted ordinals of the matching nodes when
+        they are already known; otherwise the nodes containing every term
+        match.
+        """
+        if not terms or not all(term in self.postings for term in terms):
+            return 0, []
+        columns = sorted(
+            (self._numpy_counts(term) for term in terms), key=lambda c: len(c[0])
+        )
+        if matches is None:
+            ordinals = columns[0][0]
+            for containing, _ in columns[1:]:
+                ordinals = ordinals[np.isin(ordinals, containing, assume_unique=True)]
+        else:
+            ordinals = matches
+        total = len(ordinals)
+        if not total or limit <= 0:
+            return total, []
+
+        nodes = len(self.lengths)
+        lengths = np.frombuffer(self.lengths, dtype=np.int32)[ordinals]
+        norms = (
+            BM25_K1 * (1 - BM25_B)
+            + (BM25_K1 * BM25_B / (self.total_length / nodes)) * lengths
+        )
+        scores = np.zeros(total)
+        for containing, counts in columns:
+            weight = bm25_idf(nodes, len(containing)) * (BM25_K1 + 1)
+            frequencies = counts[np.searchsorted(containing, ordinals)]
+            scores += weight * frequencies / (frequencies + norms)
+
+        # Keep every node tied with the limit-th score, then stable-sort so
+        # ties stay in preorder
+        if total > limit:
+            kth = np.partition(scores, total - limit)[total - limit]
+            selected = np.flatnonzero(scores >= kth)
+        else:
+            selected = np.arange(total)
+        best = selected[np.argsort(-scores[selected], kind="stable")[:limit]]
+        return total, list(zip(scores[best].tolist(), ordinals[best].tolist()))
+
+    def positions(
+        self, term: str, within: Optional[Set[int]] = None
+    ) -> Dict[int, List[int]]:
+        """Get the positions of a term in each node containing it.
+
+        Args:
+            term: Lowercase term
+            within: Optional ordinals to restrict the lookup to
+
+        Returns:
+            Sorted positions by ordinal, in preorder
+        """
+        postings = self.get_postings(term)
+        positions: Dict[int, List[int]] = {}
+        ordinals = postings[::2]
+        if within is not None and len(within) * 16 < len(ordinals):
+            # Few candidates: binary search their runs instead of scanning
+            for ordinal in sorted(within):
+                start = bisect_left(ordinals, ordinal)
+                end = bisect_right(ordinals, ordinal, start)
+                if start < end:
+                    positions[ordinal] = postings[2 * start + 1 : 2 * end : 2].tolist()
+            return positions
+        for ordinal, position in zip(ordinals, postings[1::2]):
+            if within is not None and ordinal not in within:
+                continue
+            found = positions.get(ordinal)
+            if found is None:
+                positions[ordinal] = [position]
+            else:
+                found.append(position)
+        return positions
+
+    def phrase_positions(
+        self, phrase: Sequence[str], within: Optional[Set[int]] = None
+    ) -> Dict[int, List[int]]:
+        """Get the start positions of a phrase in each node containing it.
+
+        Args:
+            phrase: Lowercase terms that must occur consecutively
+            within: Optional ordinals to restrict the lookup to
+
+        Returns:
+            Sorted start positions by ordinal, in preorder
+        """
+        starts = self.positions(phrase[0], within)
+        for offset, term in enumerate(phrase[1:], 1):
+            if not starts:
+                break
+            following = self.positions(term, set(starts))
+            matched = {}
+            for ordinal, positions in starts.items():
+                found = following.get(ordinal)
+                if found is None:
+                    continue
+                found = set(found)
+                kept = [p for p in positions if p + offset in found]
+                if kept:
+                    matched[ordinal] = kept
+            starts = matched
+        return starts
+
+    def match_query(self, query: SearchQuery) -> List[int]:
+        """Get the ordinals of the nodes matching a query, in preorder.
+
+        Nodes must contain every term first, so phrase and NEAR checks only
+        read the positions of those candidates. With NumPy installed,
+        phrases outside NEAR are matched on whole posting arrays instead.
+        """
+        ordinals = self.match_all(query.terms)
+        if query.is_plain or not ordinals:
+            return ordinals
+        candidates = set(ordinals)
+
+        # Positions are needed for phrases and the operands of NEAR
+        linked = {index for left, right, _ in query.near for index in (left, right)}
+        starts: Dict[int, Dict[int, List[int]]] = {}
+        for index, phrase in enumerate(query.operands):
+            if len(phrase) == 1 and index not in linked:
+                continue
+            if np is not None and index not in linked:
+                candidates.intersection_update(self._phrase_ordinals_numpy(phrase))
+            else:
+                starts[index] = self.phrase_positions(phrase, candidates)
+                candidates.intersection_update(starts[index])
+            if not candidates:
+                return []
+
+        operands = query.operands
+        for left, right, words in query.near:
+            left_starts, right_starts = starts[left], starts[right]
+            candidates = {
+                ordinal
+                for ordinal in candidates
+                if _within(
+                    left_starts[ordinal],
+                    len(operands[left]),
+                    right_starts[ordinal],
+                    len(operands[right]),
+                    words,
+                )
+            }
+        return sorted(candidates)
+
+    def _phrase_ordinals_numpy(self, phrase: Sequence[str]) -> List[int]:
+        """Get the ordinals of the nodes containing a phrase, vectorized."""
+        starts = None
+        for offset, term in enumerate(phrase):
+            postings = np.frombuffer(self.get_postings(term), dtype=np.int32)
+            ordinals, positions = postings[::2], postings[1::2] - offset
+            if offset:
+                valid = positions >= 0
+                ordinals, positions = ordinals[valid], positions[valid]
+            # One int64 key per possible phrase start, sorted like the postings
+            keys = (ordinals.astype(np.int64) << 32) | positions
+            if starts is None:
+                starts = keys
+            else:
+                starts = starts[np.isin(starts, keys, assume_unique=True)]
+            if not len(starts):
+                return []
+        return np.unique(starts >> 32).tolist()
+
+    def match_all(self, terms: Iterable[str]) -> List[int]:
+        """Get the ordinals of the nodes containing every term, in preorder.
+
+        Terms are intersected from the rarest up, so the cost is bounded by
+        the postings of the query terms.
+        """
+        terms = set(terms)
+        if not terms:
+            return []
+        rarest = sorted(terms, key=lambda term: len(self.get_postings(term)))
+        matches = self.ordinals(rarest[0])
+        for term in rarest[1:]:
+            if not matches:
+                break
+            containing = set(self.ordinals(term))
+            matches = [ordinal for ordinal in matches if ordinal in containing]
+        return matches
+
+
+class CorpusIndex:
+    """Ranked token search over the inverted indexes of several documents.
+
+    Besides the per-document indexes it keeps, for every term, how often it
+    occurs in each document. Adding or removing a document only touches the
+    terms of that document, and a query only visits documents containing
+    every query term. Scores are BM25 over the statistics of the whole
+    corpus, so they compare across documents.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty corpus index."""
+        self.indexes: Dict[str, InvertedIndex] = {}  # doc_id -> index
+        self.terms: Dict[str, Dict[str, int]] = {}  # term -> doc_id -> count
+
+    def __len__(self) -> int:
+        """Number of indexed documents."""
+        return len(self.indexes)
+
+    def __contains__(self, doc_id: str) -> bool:
+        """Check whether a document is indexed."""
+        return doc_id in self.indexes
+
+    def add(self, doc_id: str, index: InvertedIndex) -> None:
+        """Add a document's index, replacing any index under the same id."""
+        self.remove(doc_id)
+        self.indexes[doc_id] = index
+        terms = self.terms
+        for term, postings in index.postings.items():
+            counts = terms.get(term)
+            if counts is None:
+                counts = terms[term] = {}
+            counts[doc_id] = len(postings) // 2
+
+    def remove(self, doc_id: str) -> bool:
+        """Remove a document's index; return False if it was not indexed."""
+        index = self.indexes.pop(doc_id, None)
+        if index is None:
+            return False
+        terms = self.terms
+        for term in index.postings:
+            counts = terms[term]
+            del counts[doc_id]
+            if not counts:
+                del terms[term]
+        return True
+
+    def search(self, query: SearchQuery, limit: int) -> List[Tuple[float, str, int]]:
+        """Find the best-scoring nodes matching a query.
+
+        Args:
+            query: Parsed query
+            limit: Maximum number of hits
+
+        Returns:
+            (score, doc_id, ordinal) tuples, best first; ties keep document
+            and preorder order
+        """
+        terms = query.terms
+        if not terms or limit <= 0:
+            return []
+        counts = [self.terms.get(term) for term in terms]
+        if not all(counts):
+            return []
+
+        indexes = self.indexes
+        nodes = sum(len(index) for index in indexes.values())
+        average_length = sum(index.total_length for index in indexes.values()) / nodes
+        weights = {
+            term: bm25_idf(
+                nodes, sum(indexes[doc_id].node_frequency(term) for doc_id in docs)
+            )
+            for term, docs in zip(terms, counts)
+        }
+        rarest = min(counts, key=len)
+
+        hits = []
+        for rank, doc_id in enumerate(indexes):
+            if doc_id not in rarest or not all(doc_id in docs for docs in counts):
+                continue
+            index = indexes[doc_id]
+            ordinals, term_counts = index.query_counts(query)
+            scores = index.bm25_scores(term_counts, ordinals, weights, average_length)
+            hits.extend(
+                (score, -rank, -ordinal, doc_id)
+                for score, ordinal in zip(scores, ordinals)
+            )
+
+        best = heapq.nlargest(limit, hits)
+        return [(score, doc_id, -ordinal) for score, _, ordinal, doc_id in best]
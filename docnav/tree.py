@@ -0,0 +1,630 @@
+"""Columnar, array-backed storage for document trees.
+
+A ``ColumnarTree`` keeps a parsed tree as parallel arrays indexed by the
+node's preorder ordinal instead of one ``DocumentNode`` object per node:
+type codes, levels, parent / first-child / next-sibling links, the ordinal
+after each node's subtree, line numbers, and start/end offsets of each
+node's content in one shared text buffer. When the nodes are spans of one
+source text, as the scanner produces, that text is the buffer and is not
+copied; otherwise the contents are concatenated. Titles are kept in a sparse
+dict, and attributes other than ``line_number`` as deduplicated dicts that
+nodes reference by index, since most nodes share a handful of attribute
+sets.
+
+Because ordinals are preorder, a node's subtree is the contiguous ordinal
+range ``[ordinal, subtree_end[ordinal])`` and its contents are one slice of
+the text buffer, so sections and searches are plain array and string scans.
+When NumPy is installed, type and level scans are vectorized and the arrays
+can be viewed as NumPy arrays without copying.
+
+The preorder columns (parents, subtree ends, depths and nearest heading
+ancestors) live in ``PreorderNumbering``, which ``PreorderIndex`` also
+builds over ``DocumentNode`` trees, so both representations answer subtree
+and ancestor queries with array lookups.
+"""
+
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_right
+from itertools import repeat
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+if TYPE_CHECKING:
+    from .models import DocumentNode
+
+# Ordinal used for missing links and values
+NONE = -1
+
+_NO_ATTRIBUTES: Dict[str, Any] = {}
+
+
+class PreorderNumbering(ABC):
+    """Preorder numbering of a tree, shared by both tree representations.
+
+    Nodes are numbered in preorder; a node's subtree is the ordinal range
+    ``[ordinal, subtree_ends[ordinal])``, so membership and ancestor checks
+    compare two numbers. Each node also records its depth and its nearest
+    heading ancestor, so sections and breadcrumbs follow heading links
+    instead of walking every parent.
+
+    Secondary indexes bucket the ordinals by node type and keep heading
+    counts per level and the headings in ``get_headings`` order, so type
+    queries and statistics cost time in proportion to their output.
+    """
+
+    def __init__(self) -> None:
+        """Create empty numbering columns."""
+        self.parents = array("i")  # parent ordinal, NONE for the root
+        self.subtree_ends = array("i")  # ordinal after the node's subtree
+        self.depths = array("i")  # number of ancestors
+        self.sections = array("i")  # nearest heading ancestor or NONE
+        self.type_ordinals: Dict[str, array] = {}  # type -> ordinals in preorder
+        self.heading_levels: Dict[int, int] = {}  # level (0 for none) -> count
+        self.sorted_headings = array("i")  # heading ordinals by (level, id)
+
+    def __len__(self) -> int:
+        """Number of nodes."""
+        return len(self.parents)
+
+    def _number(self, parent: int, parent_is_heading: bool) -> None:
+        """Number the next node in preorder under ``parent``."""
+        self.parents.append(parent)
+        if parent == NONE:
+            self.depths.append(0)
+            self.sections.append(NONE)
+        else:
+            self.depths.append(self.depths[parent] + 1)
+            self.sections.append(parent if parent_is_heading else self.sections[parent])
+
+    def _close(self) -> None:
+        """Compute subtree ends and heading indexes once nodes are numbered."""
+        # Subtree sizes accumulate from the last ordinal back to the root
+        sizes = array("i", [1]) * len(self.parents)
+        for ordinal in range(len(self.parents) - 1, 0, -1):
+            sizes[self.parents[ordinal]] += sizes[ordinal]
+        self.subtree_ends = array("i", (o + size for o, size in enumerate(sizes)))
+
+        keys = []
+        levels: Dict[int, int] = {}
+        for ordinal in self.type_ordinals.get("heading", ()):
+            node = self.node(ordinal)
+            level = node.level or 0
+            levels[level] = levels.get(level, 0) + 1
+            keys.append((level, node.id, ordinal))
+        keys.sort()
+        self.heading_levels = dict(sorted(levels.items()))
+        self.sorted_headings = array("i", (key[2] for key in keys))
+
+    @abstractmethod
+    def node(self, ordinal: int) -> Any:
+        """Get the node at ``ordinal``."""
+        pass
+
+    def ordinals_of_type(self, node_type: str) -> List[int]:
+        """Get the ordinals of all nodes of a type, in preorder."""
+        return list(self.type_ordinals.get(node_type, ()))
+
+    def count_of_type(self, node_type: str) -> int:
+        """Count the nodes of a type."""
+        return len(self.type_ordinals.get(node_type, ()))
+
+    def heading_ordinals(self, max_level: Optional[int] = None) -> List[int]:
+        """Get the ordinals of headings, optionally up to a maximum level."""
+        headings = self.type_ordinals.get("heading", ())
+        if max_level is None:
+            return list(headings)
+        return [o for o in headings if 0 < (self.node(o).level or 0) <= max_level]
+
+    def sorted_heading_ordinals(self, max_level: Optional[int] = None) -> List[int]:
+        """Get heading ordinals ordered by (level, id), up to a maximum level.
+
+        With ``max_level`` headings without a level are left out, as in
+        ``Document.get_headings``. Headings are sorted by level, so the
+        result is one slice of ``sorted_headings``.
+        """
+        if max_level is None:
+            return list(self.sorted_headings)
+        start = self.heading_levels.get(0, 0)
+        count = sum(
+            count
+            for level, count in self.heading_levels.items()
+            if 0 < level <= max_level
+        )
+        return list(self.sorted_headings[start : start + count])
+
+    def contains(self, ancestor: int, ordinal: int) -> bool:
+        """Check whether ``ordinal`` is ``ancestor`` or inside its subtree."""
+        return ancestor <= ordinal < self.subtree_ends[ancestor]
+
+    def ancestor_ordinals(self, ordinal: int) -> List[int]:
+        """Get the ordinals of a node's ancestors, from the root to its parent."""
+        ancestors = [NONE] * self.depths[ordinal]
+        parent = self.parents[ordinal]
+        for index in range(len(ancestors) - 1, -1, -1):
+            ancestors[index] = parent
+            parent = self.parents[parent]
+        return ancestors
+
+    def section_ordinals(self, ordinal: int) -> List[int]:
+        """Get the ordinals of a node's heading ancestors, outermost first."""
+        sections = []
+        section = self.sections[ordinal]
+        while section != NONE:
+            sections.append(section)
+            section = self.sections[section]
+        sections.reverse()
+        return sections
+
+
+class ColumnarNode:
+    """Read-only view of one node of a ``ColumnarTree``.
+
+    Has the attributes and navigation methods of ``DocumentNode``, so
+    outline, section, search and navigation code works on either.
+    """
+
+    __slots__ = ("tree", "ordinal")
+
+    def __init__(self, tree: "ColumnarTree", ordinal: int) -> None:
+        """Create a view of the node at ``ordinal``."""
+        self.tree = tree
+        self.ordinal = ordinal
+
+    @property
+    def type(self) -> str:
+        """Node type."""
+        return self.tree.type_names[self.tree.types[self.ordinal]]
+
+    @property
+    def level(self) -> Optional[int]:
+        """Heading level, None for other nodes."""
+        return self.tree.levels[self.ordinal] or None
+
+    @property
+    def id(self) -> str:
+        """Node id."""
+        return self.tree.ids[self.ordinal]
+
+    @property
+    def title(self) -> str:
+        """Display title for headings."""
+        return self.tree.titles.get(self.ordinal, "")
+
+    @property
+    def content(self) -> str:
+        """Text content, sliced from the shared buffer."""
+        return self.tree.content(self.ordinal)
+
+    @property
+    def attributes(self) -> Dict[str, Any]:
+        """Copy of the node's attributes."""
+        attributes = dict(self.tree.attribute_set(self.ordinal))
+        line_number = self.tree.line_numbers[self.ordinal]
+        if line_number != NONE:
+            attributes["line_number"] = line_number
+        return attributes
+
+    def get_attribute(self, key: str, default: Any = None) -> Any:
+        """Get an attribute without copying the attributes."""
+        if key == "line_number":
+            line_number = self.tree.line_numbers[self.ordinal]
+            if line_number != NONE:
+                return line_number
+        return self.tree.attribute_set(self.ordinal).get(key, default)
+
+    @property
+    def parent(self) -> Optional["ColumnarNode"]:
+        """Parent node, None for the root."""
+        parent = self.tree.parents[self.ordinal]
+        return None if parent == NONE else ColumnarNode(self.tree, parent)
+
+    @property
+    def children(self) -> List["ColumnarNode"]:
+        """Child nodes in document order."""
+        return [
+            ColumnarNode(self.tree, child)
+            for child in self.tree.child_ordinals(self.ordinal)
+        ]
+
+    def get_children(self) -> List["ColumnarNode"]:
+        """Child nodes in document order, like ``DocumentNode.get_children``."""
+        return self.children
+
+    def add_child(self, child: Any) -> None:
+        """Columnar trees are read-only."""
+        raise TypeError("Columnar document trees are read-only")
+
+    def get_ancestors(self) -> List["ColumnarNode"]:
+        """Get list of ancestor nodes from root to parent."""
+        return [
+            ColumnarNode(self.tree, ancestor)
+            for ancestor in self.tree.ancestor_ordinals(self.ordinal)
+        ]
+
+    def get_depth(self) -> int:
+        """Get the depth of this node in the tree."""
+        return self.tree.depths[self.ordinal]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ColumnarNode):
+            return NotImplemented
+        return self.tree is other.tree and self.ordinal == other.ordinal
+
+    def __hash__(self) -> int:
+        return hash((id(self.tree), self.ordinal))
+
+    def __repr__(self) -> str:
+        return (
+            f"ColumnarNode(type={self.type!r}, id={self.id!r}, ordinal={self.ordinal})"
+        )
+
+
+class ColumnarTree(PreorderNumbering):
+    """Document tree stored as parallel arrays indexed by preorder ordinal."""
+
+    def __init__(self) -> None:
+        """Create an empty tree; use ``from_node`` to build one."""
+        super().__init__()
+        self.type_names: List[str] = []  # type code -> type name
+        self.types = array("B")  # type code
+        self.levels = array("b")  # heading level, 0 for none
+        self.first_children = array("i")  # first child ordinal or NONE
+        self.next_siblings = array("i")  # next sibling ordinal or NONE
+        self.line_numbers = array("i")  # line number or NONE
+        self.starts = array("q")  # content start in text
+        self.ends = array("q")  # content end in text
+        self.text = ""  # contents of all nodes in preorder, or their source
+        self.ids: List[str] = []
+        self.titles: Dict[int, str] = {}  # ordinal -> title, headings only
+        self.attribute_ids = array("i")  # index into attribute_sets or NONE
+        self.attribute_sets: List[Dict[str, Any]] = []  # shared, read-only
+        self.positions: Dict[str, int] = {}  # id -> ordinal
+
+    @classmethod
+    def from_node(cls, root: "DocumentNode") -> "ColumnarTree":
+        """Build a columnar tree from a ``DocumentNode`` tree.
+
+        Args:
+            root: Root of the object tree
+
+        Returns:
+            ColumnarTree with the same nodes in preorder
+        """
+        tree = cls()
+        type_codes: Dict[str, int] = {}
+        last_children: Dict[int, int] = {}  # parent ordinal -> last child so far
+        attribute_ids: Dict[Tuple[Tuple[str, Any], ...], int] = {}
+        chunks: List[str] = []
+        offset = 0
+
+        # Nodes spanning one source text in order can index it directly
+        shared = _shared_text(root)
+
+        stack = [(root, NONE)]
+        while stack:
+            node, parent = stack.pop()
+            ordinal = len(tree.ids)
+
+            code = type_codes.get(node.type)
+            if code is None:
+                code = type_codes[node.type] = len(tree.type_names)
+                tree.type_names.append(node.type)
+            tree.types.append(code)
+            tree.levels.append(node.level or 0)
+            tree._number(
+                parent,
+                parent != NONE and tree.type_names[tree.types[parent]] == "heading",
+            )
+            tree.first_children.append(NONE)
+            tree.next_siblings.append(NONE)
+
+            # Preorder visits siblings in document order
+            if parent != NONE:
+                previous = last_children.get(parent)
+                if previous is None:
+                    tree.first_children[parent] = ordinal
+                else:
+                    tree.next_siblings[previous] = ordinal
+                last_children[parent] = ordinal
+
+            # Read without creating attribute dicts on the source nodes
+            attributes = dict(node._attribute_items())
+            line_number = attributes.pop("line_number", None)
+            tree.line_numbers.append(NONE if line_number is None else line_number)
+            tree.attribute_ids.append(tree._attribute_id(attributes, attribute_ids))
+            if node.title:
+                tree.titles[ordinal] = node.title
+
+            span = node.span if shared is not None else None
+            if span is not None:
+                tree.starts.append(span[0])
+                offset = span[1]
+            else:
+                tree.starts.append(offset)
+                if shared is None and node.content:
+                    chunks.append(node.content)
+                    offset += len(node.content)
+            tree.ends.append(offset)
+
+            tree.ids.append(node.id)
+            if node.id and node.id not in tree.positions:
+                tree.positions[node.id] = ordinal
+
+            stack.extend((child, ordinal) for child in reversed(node.get_children()))
+
+        tree._bucket_types()
+        tree._close()
+        tree.text = "".join(chunks) if shared is None else shared
+        return tree
+
+    def _attribute_id(
+        self,
+        attributes: Dict[str, Any],
+        known: Dict[Tuple[Tuple[str, Any], ...], int],
+    ) -> int:
+        """Get the index of an attribute set, adding it if new."""
+        if not attributes:
+            return NONE
+        key = tuple(attributes.items())
+        try:
+            index = known.get(key)
+        except TypeError:
+            # Unhashable values are stored without sharing
+            key = None
+            index = None
+        if index is None:
+            index = len(self.attribute_sets)
+            self.attribute_sets.append(attributes)
+            if key is not None:
+                known[key] = index
+        return index
+
+    def attribute_set(self, ordinal: int) -> Dict[str, Any]:
+        """Get a node's attributes other than line_number; do not modify."""
+        index = self.attribute_ids[ordinal]
+        return _NO_ATTRIBUTES if index == NONE else self.attribute_sets[index]
+
+    @property
+    def root(self) -> ColumnarNode:
+        """View of the root node."""
+        return ColumnarNode(self, 0)
+
+    def node(self, ordinal: int) -> ColumnarNode:
+        """Get a view of the node at ``ordinal``."""
+        return ColumnarNode(self, ordinal)
+
+    def get_node(self, node_id: str) -> Optional[ColumnarNode]:
+        """Get a view of a node by id."""
+        ordinal = self.positions.get(node_id)
+        return None if ordinal is None else ColumnarNode(self, ordinal)
+
+    def iter_nodes(self) -> Iterator[ColumnarNode]:
+        """Iterate over views of all nodes in preorder."""
+        for ordinal in range(len(self.ids)):
+            yield ColumnarNode(self, ordinal)
+
+    def content(self, ordinal: int) -> str:
+        """Get the content of the node at ``ordinal``."""
+        return self.text[self.starts[ordinal] : self.ends[ordinal]]
+
+    def child_ordinals(self, ordinal: int) -> List[int]:
+        """Get the ordinals of a node's children in document order."""
+        children = []
+        child = self.first_children[ordinal]
+        while child != NONE:
+            children.append(child)
+            child = self.next_siblings[child]
+        return children
+
+    def heading_ordinals(self, max_level: Optional[int] = None) -> List[int]:
+        """Get the ordinals of headings, optionally up to a maximum level."""
+        headings = self.type_ordinals.get("heading", array("i"))
+        if max_level is None:
+            return list(headings)
+        if np is not None and headings:
+            ordinals = np.frombuffer(headings, dtype=headings.typecode)
+            levels = self.as_numpy("levels")[ordinals]
+            return ordinals[(levels > 0) & (levels <= max_level)].tolist()
+        return [o for o in headings if 0 < self.levels[o] <= max_level]
+
+    def _bucket_types(self) -> None:
+        """Group ordinals by type code into ``type_ordinals``."""
+        if np is not None:
+            types = self.as_numpy("types")
+            for code, name in enumerate(self.type_names):
+                ordinals = np.flatnonzero(types == code).astype(np.int32)
+                self.type_ordinals[name] = array("i", ordinals.tobytes())
+            return
+        buckets = [array("i") for _ in self.type_names]
+        for ordinal, code in enumerate(self.types):
+            buckets[code].append(ordinal)
+        self.type_ordinals = dict(zip(self.type_names, buckets))
+
+    def heading_depth(self, ordinal: int) -> int:
+        """Count the headings among a node's ancestors."""
+        depth = 0
+        section = self.sections[ordinal]
+        while section != NONE:
+            depth += 1
+            section = self.sections[section]
+        return depth
+
+    def ordinal_of(self, node: Any) -> Optional[int]:
+        """Get the ordinal of a view of this tree, None for other nodes."""
+        if isinstance(node, ColumnarNode) and node.tree is self:
+            return node.ordinal
+        return None
+
+    def subtree_contents(self, ordinal: int) -> List[str]:
+        """Get the non-empty contents of a node and its descendants."""
+        contents = []
+        for current in range(ordinal, self.subtree_ends[ordinal]):
+            start, end = self.starts[current], self.ends[current]
+            if start != end:
+                contents.append(self.text[start:end])
+        return contents
+
+    def search(self, query: str) -> List[int]:
+        """Find nodes whose content contains ``query``, ignoring case.
+
+        Scans the shared text buffer once and maps each hit back to its node
+        by the content offsets.
+
+        Args:
+            query: Search query string
+
+        Returns:
+            Ordinals of matching nodes in preorder
+        """
+        query_lower = query.lower()
+        text_lower = self.text.lower()
+        if not query_lower or len(text_lower) != len(self.text):
+            # Lowercasing changed offsets; compare node by node instead
+            return [
+                o
+                for o in range(len(self.ids))
+                if query_lower in self.content(o).lower()
+            ]
+
+        matches = []
+        position = text_lower.find(query_lower)
+        while position != -1:
+            # Last node whose content starts at or before the hit
+            ordinal = bisect_right(self.starts, position) - 1
+            while ordinal > 0 and self.starts[ordinal] == self.ends[ordinal]:
+                ordinal -= 1
+            if position + len(query_lower) <= self.ends[ordinal]:
+                matches.append(ordinal)
+                position = text_lower.find(query_lower, self.ends[ordinal])
+            else:
+                # The hit spans two nodes' contents
+                position = text_lower.find(query_lower, position + 1)
+        return matches
+
+    def as_numpy(self, column: str) -> Any:
+        """View one of the array columns as a NumPy array without copying.
+
+        Args:
+            column: Name of an array attribute, such as "types" or "parents"
+
+        Returns:
+            NumPy array sharing memory with the column
+
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        if np is None:
+            raise ImportError("NumPy is required for array views")
+        values = getattr(self, column)
+        return np.frombuffer(values, dtype=values.typecode)
+
+
+class PreorderIndex(PreorderNumbering):
+    """Preorder numbering of a ``DocumentNode`` tree.
+
+    Building it sets each node's ``ordinal`` to its position in ``nodes``,
+    so a subtree is the slice ``nodes[ordinal:subtree_ends[ordinal]]``.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty index; use ``from_node`` to build one."""
+        super().__init__()
+        self.nodes: List["DocumentNode"] = []  # nodes in preorder
+
+    @classmethod
+    def from_node(cls, root: "DocumentNode") -> "PreorderIndex":
+        """Number a tree in one iterative preorder pass.
+
+        Args:
+            root: Root of the tree
+
+        Returns:
+            PreorderIndex over all nodes of the tree
+        """
+        index = cls()
+        nodes = index.nodes
+        parents, depths, sections = index.parents, index.depths, index.sections
+        type_ordinals = index.type_ordinals
+        # Siblings share their parent, depth and section, so those are
+        # pushed along with each node instead of looked up
+        stack = [(root, NONE, 0, NONE)]
+        while stack:
+            node, parent, depth, section = stack.pop()
+            ordinal = node.ordinal = len(nodes)
+            nodes.append(node)
+            parents.append(parent)
+            depths.append(depth)
+            sections.append(section)
+            bucket = type_ordinals.get(node.type)
+            if bucket is None:
+                bucket = type_ordinals[node.type] = array("i")
+            bucket.append(ordinal)
+            children = node.get_children()
+            if children:
+                if node.type == "heading":
+                    section = ordinal
+                stack.extend(
+                    zip(
+                        reversed(children),
+                        repeat(ordinal),
+                        repeat(depth + 1),
+                        repeat(section),
+                    )
+                )
+        index._close()
+        return index
+
+    def node(self, ordinal: int) -> "DocumentNode":
+        """Get the node at ``ordinal``."""
+        return self.nodes[ordinal]
+
+    def ordinal_of(self, node: Any) -> Optional[int]:
+        """Get the ordinal of a node of this tree, None for other nodes."""
+        ordinal = getattr(node, "ordinal", None)
+        if (
+            ordinal is not None
+            and ordinal < len(self.nodes)
+            and self.nodes[ordinal] is node
+        ):
+            return ordinal
+        return None
+
+    def subtree(self, ordinal: int) -> List["DocumentNode"]:
+        """Get a node and its descendants in preorder."""
+        return self.nodes[ordinal : self.subtree_ends[ordinal]]
+
+
+def _shared_text(root: "DocumentNode") -> Optional[str]:
+    """Get the text all content of a tree is a span of, if there is one.
+
+    Qualifies when every node with content spans the same string and the
+    spans do not overlap in preorder, so offsets into that string can be
+    used as they are instead of copying each node's content.
+    """
+    shared = None
+    end = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        span = node.span
+        if span is None:
+            if node.content:
+                return None
+        else:
+            source = node.source
+            if shared is None:
+                if not isinstance(source, str):
+                    return None
+                shared = source
+            elif source is not shared:
+                return None
+            if span[0] < end:
+                return None
+            end = span[1]
+        stack.extend(reversed(node.get_children()))
+    return shared
@@ -1,10 +1,16 @@
 """Main MCP server implementation for DocNav."""
 
+import os
 from pathlib import Path
+from typing import List, Optional
 
+import anyio
 from mcp.server.fastmcp import FastMCP
 
+from docnav.cache import DEFAULT_MAX_BYTES, DocumentCache
 from docnav.navigator import DocumentNavigator
+from docnav.processors import MarkdownProcessor, PDFProcessor, XMLProcessor
+from docnav.processors.engines import DEFAULT_ENGINE_THRESHOLD
 
 # Create an MCP server
 mcp = FastMCP(
@@ -17,16 +23,76 @@ mcp = FastMCP(
     ),
 )
 
+# Persistent parse cache, disable with DOCNAV_CACHE=0
+cache = None
+if os.environ.get("DOCNAV_CACHE", "1") != "0":
+    cache = DocumentCache(
+        max_bytes=int(os.environ.get("DOCNAV_CACHE_MAX_BYTES", str(DEFAULT_MAX_BYTES)))
+    )
+
+# Page shards converted in parallel for large PDFs; 1 (the default) converts
+# in-process, 0 means one per CPU
+pdf_workers = int(os.environ.get("DOCNAV_PDF_WORKERS", "1"))
+
+# Build only the outline of PDFs at load time, converting pages on demand
+pdf_lazy = os.environ.get("DOCNAV_PDF_LAZY", "0") == "1"
+pdf_outline_source = os.environ.get("DOCNAV_PDF_OUTLINE", "auto")
+
+# Markdown parse engine: auto (CommonMark below the threshold, the fast line
+# scanner above it), scanner or commonmark
+parse_engine = os.environ.get("DOCNAV_PARSE_ENGINE", "auto")
+parse_threshold = int(
+    os.environ.get("DOCNAV_PARSE_THRESHOLD", str(DEFAULT_ENGINE_THRESHOLD))
+)
+
+# Worker processes for CommonMark parses of large documents, 1 disables
+parse_workers = int(os.environ.get("DOCNAV_PARSE_WORKERS", "1"))
+# Markdown files at least this many bytes are streamed from disk (unset: never)
+stream_min_bytes = os.environ.get("DOCNAV_STREAM_MIN_BYTES")
+
+# Documents with at least this many nodes are kept in columnar storage
+columnar_min_nodes = os.environ.get("DOCNAV_COLUMNAR_MIN_NODES")
+
 # Initialize the document navigator
-navigator = DocumentNavigator()
+navigator = DocumentNavigator(
+    cache=cache,
+    load_workers=int(os.environ.get("DOCNAV_LOAD_WORKERS", "4")),
+    columnar_min_nodes=int(columnar_min_nodes) if columnar_min_nodes else None,
+    processors=[
+        MarkdownProcessor(
+            engine=parse_engine,
+            engine_threshold=parse_threshold,
+            parse_workers=parse_workers,
+            stream_min_bytes=int(stream_min_bytes) if stream_min_bytes else None,
+        ),
+        PDFProcessor(
+            workers=pdf_workers,
+            lazy=pdf_lazy,
+            outline_source=pdf_outline_source,
+            engine=parse_engine,
+            engine_threshold=parse_threshold,
+            parse_workers=parse_workers,
+        ),
+        XMLProcessor(),
+    ],
+)
+
+# Heavy work runs on bounded worker threads so the event loop keeps serving
+# other tool calls. Loads run on the navigator's load executor, sized by
+# DOCNAV_LOAD_WORKERS, which also runs background and batch loads; queries
+# have a limit of their own so a burst of big loads cannot starve reads and
+# searches on already-loaded documents.
+query_limiter = anyio.CapacityLimiter(int(os.environ.get("DOCNAV_QUERY_WORKERS", "8")))
 
 
 @mcp.tool()
-def load_document(file_path: str) -> str:
+async def load_document(file_path: str, engine: Optional[str] = None) -> str:
     """Load a document for navigation and analysis.
 
     Args:
         file_path: Path to the document file
+        engine: Optional markdown parse engine: 'scanner' (fast, for huge
+            files), 'commonmark' (full CommonMark) or 'auto' (by size)
 
     Returns:
         Success message with auto-generated document ID
@@ -36,8 +102,10 @@ def load_document(file_path: str) -> str:
         if not path.exists():
             return f"Error: File not found: {file_path}"
 
-        # Use the synchronous version to avoid event loop conflicts
-        doc_id, document = navigator.load_document_from_file_sync(path)
+        # Convert and parse on a worker thread to keep the event loop free
+        doc_id, document = await navigator.run_load(
+            navigator.load_document_from_file_sync, path, engine
+        )
 
         metadata = navigator.get_document_metadata(doc_id)
         return (
@@ -45,12 +113,142 @@ def load_document(file_path: str) -> str:
             f"File: {path.name}\n"
             f"Document ID: {doc_id}\n"
             f"Format: {metadata['format'] if metadata else 'unknown'}\n"
+            f"Cached: {metadata.get('cached', 'false') if metadata else 'false'}\n"
             f"Use get_outline('{doc_id}') to see document structure."
         )
     except Exception as e:
         return f"Error loading document: {str(e)}"
 
 
+@mcp.tool()
+async def load_documents(
+    file_paths: List[str], max_parallel: Optional[int] = None
+) -> str:
+    """Load several documents at once, converting them concurrently.
+
+    Args:
+        file_paths: Paths to the document files
+        max_parallel: Maximum concurrent loads, defaults to DOCNAV_LOAD_WORKERS
+
+    Returns:
+        Summary with document ID, timing or error for each file
+    """
+    paths = [Path(file_path).resolve() for file_path in file_paths]
+    results = await navigator.run_load(
+        navigator.load_documents_sync, paths, max_parallel
+    )
+
+    loaded = sum(1 for result in results if result.error is None)
+    output = f"Loaded {loaded}/{len(results)} documents:\n"
+    for result in results:
+        name = Path(result.file_path).name
+        if result.error:
+            output += f"- {name}: Error: {result.error}\n"
+        else:
+            cached = " (cached)" if result.cached else ""
+            output += (
+                f"- {name}: Document ID: {result.doc_id}, "
+                f"{result.seconds:.2f}s{cached}\n"
+            )
+    return output
+
+
+@mcp.tool()
+async def load_directory(path: str, glob: str = "**/*.md") -> str:
+    """Load all matching documents under a directory.
+
+    Tips: Call again on the same directory to pick up edits; only changed
+    files are reparsed and documents of deleted files are removed.
+
+    Args:
+        path: Directory to load
+        glob: Glob pattern relative to the directory, defaults to '**/*.md'
+
+    Returns:
+        Summary of added, updated, unchanged and removed files with their
+        document IDs
+    """
+    try:
+        directory = Path(path).resolve()
+        result = await navigator.run_load(
+            navigator.load_directory_sync, directory, glob
+        )
+    except Exception as e:
+        return f"Error loading directory: {str(e)}"
+
+    output = (
+        f"Directory: {result.directory} ({result.pattern})\n"
+        f"Added: {len(result.added)}, Updated: {len(result.updated)}, "
+        f"Unchanged: {len(result.unchanged)}, Removed: {len(result.removed)}, "
+        f"Errors: {len(result.errors)}\n"
+        f"Time: {result.seconds:.2f}s\n"
+    )
+    if result.doc_ids:
+        output += "Documents:\n"
+        for file_path, doc_id in result.doc_ids.items():
+            relative = os.path.relpath(file_path, result.directory)
+            output += f"- {relative}: {doc_id}\n"
+    for file_path, error in result.errors.items():
+        relative = os.path.relpath(file_path, result.directory)
+        output += f"- {relative}: Error: {error}\n"
+    return output
+
+
+@mcp.tool()
+def start_load(file_path: str) -> str:
+    """Start loading a document in the background.
+
+    Tips: Use this for large documents, then poll load_status until done.
+
+    Args:
+        file_path: Path to the document file
+
+    Returns:
+        Document ID the document will be available under
+    """
+    try:
+        path = Path(file_path).resolve()
+        if not path.exists():
+            return f"Error: File not found: {file_path}"
+
+        doc_id = navigator.start_load(path)
+        return (
+            f"Load started.\n"
+            f"File: {path.name}\n"
+            f"Document ID: {doc_id}\n"
+            f"Use load_status('{doc_id}') to follow progress."
+        )
+    except Exception as e:
+        return f"Error starting load: {str(e)}"
+
+
+@mcp.tool()
+def load_status(doc_id: str) -> str:
+    """Get the progress of a background document load.
+
+    Args:
+        doc_id: Document ID returned by start_load
+
+    Returns:
+        Current phase, page progress and elapsed time
+    """
+    job = navigator.get_load_job(doc_id)
+    if job is None:
+        return f"No background load found for '{doc_id}'"
+
+    status = f"Document: {doc_id}\n"
+    status += f"File: {Path(job.file_path).name}\n"
+    status += f"Phase: {job.phase}\n"
+    if job.pages_total is not None:
+        status += f"Pages: {job.pages_done}/{job.pages_total}\n"
+    status += f"Elapsed: {job.elapsed:.2f}s\n"
+    if job.error:
+        status += f"Error: {job.error}\n"
+    elif job.phase == "done":
+        status += f"Use get_outline('{doc_id}') to see document structure.\n"
+    return status
+
+
 @mcp.tool()
 def get_outline(doc_id: str, max_depth: int = 3) -> str:
     """Get document outline/table of contents.
@@ -68,32 +266,76 @@ def get_outline(doc_id: str, max_depth: int = 3) -> str:
 
 
 @mcp.tool()
-def read_section(doc_id: str, section_id: str) -> str:
+async def read_section(doc_id: str, section_id: str, join_nodes: bool = False) -> str:
     """Read content of a specific document section.
 
     Args:
         doc_id: Document identifier
         section_id: Section ID from outline (e.g., 'h1_0', 'h2_1')
+        join_nodes: Return the section's node contents joined by newlines
+            instead of the verbatim source text
 
     Returns:
         Section content with subsections
     """
 
-    return navigator.read_section(doc_id, section_id.strip("#"))
+    # Lazily loaded PDFs may convert pages here
+    return await anyio.to_thread.run_sync(
+        navigator.read_section,
+        doc_id,
+        section_id.strip("#"),
+        join_nodes,
+        limiter=query_limiter,
+    )
 
 
 @mcp.tool()
-def search_document(doc_id: str, query: str) -> str:
+async def search_document(
+    doc_id: str, query: str, mode: str = "token", limit: int = 5
+) -> str:
     """Search for specific content within a document.
 
     Args:
         doc_id: Document identifier
         query: Search term or phrase
+        mode: "token" (default) finds sections containing every word of the
+            query, most relevant first. Supports "exact phrases" and
+            A NEAR/k B (A and B at most k words apart). "substring" matches
+            the query text anywhere, including inside words, in document
+            order
+        limit: Maximum number of results to list
 
     Returns:
         Formatted search results with context
     """
-    return navigator.search_document(doc_id, query)
+    try:
+        return await anyio.to_thread.run_sync(
+            navigator.search_document,
+            doc_id,
+            query,
+            mode,
+            limit,
+            limiter=query_limiter,
+        )
+    except ValueError as e:
+        return f"Error: {e}"
+
+
+@mcp.tool()
+async def search_all(query: str, limit: int = 10) -> str:
+    """Search every loaded document at once and rank the matches.
+
+    Args:
+        query: Search words; a match contains all of them. Supports
+            "exact phrases" and A NEAR/k B
+        limit: Maximum number of results
+
+    Returns:
+        Ranked results with document id, section id and snippet
+    """
+    return await anyio.to_thread.run_sync(
+        navigator.search_all, query, limit, limiter=query_limiter
+    )
 
 
 @mcp.tool()
@@ -125,11 +367,8 @@ def list_documents() -> str:
     for doc in documents:
         document = navigator.get_document(doc["id"])
         headings_count = 0
-        if document and document.index:
-            headings = [
-                node for node in document.index.values() if node.type == "heading"
-            ]
-            headings_count = len(headings)
+        if document:
+            headings_count = document.count_nodes_by_type("heading")
 
         output += (
             f"- {doc['title']} (ID: {doc['id']})\n"
@@ -141,7 +380,7 @@ def list_documents() -> str:
 
 
 @mcp.tool()
-def get_document_stats(doc_id: str) -> str:
+async def get_document_stats(doc_id: str) -> str:
     """Get statistics about a loaded document.
 
     Args:
@@ -150,22 +389,32 @@ def get_document_stats(doc_id: str) -> str:
     Returns:
         Document statistics and structure info
     """
+    # Token counting encodes the whole document
+    return await anyio.to_thread.run_sync(
+        _document_stats, doc_id, limiter=query_limiter
+    )
+
+
+def _document_stats(doc_id: str) -> str:
+    """Build the statistics report for a document."""
     document = navigator.get_document(doc_id)
     if not document:
         return f"Document '{doc_id}' not found"
 
-    headings = []
-    paragraphs = []
-    if document.index:
-        headings = [node for node in document.index.values() if node.type == "heading"]
-        paragraphs = [
-            node for node in document.index.values() if node.type == "paragraph"
-        ]
-
     stats = f"Document: {doc_id}\n"
-    stats += f"Total nodes: {len(document.index) if document.index else 0}\n"
-    stats += f"Headings: {len(headings)}\n"
-    stats += f"Paragraphs: {len(paragraphs)}\n"
+    stats += f"Total nodes: {document.node_count}\n"
+    stats += f"Headings: {document.count_nodes_by_type('heading')}\n"
+    stats += f"Paragraphs: {document.count_nodes_by_type('paragraph')}\n"
+
+    parse_stats = document.metadata.get("parse_stats")
+    if parse_stats:
+        stats += (
+            f"Parser: {parse_stats.engine} "
+            f"({parse_stats.seconds * 1000:.1f} ms, {parse_stats.nodes} nodes"
+        )
+        if parse_stats.chunks > 1:
+            stats += f", {parse_stats.chunks} partitions"
+        stats += ")\n"
 
     # Token statistics
     token_stats = navigator.get_document_tokens(doc_id)
@@ -174,15 +423,12 @@ def get_document_stats(doc_id: str) -> str:
         # stats += f"Content tokens: {token_stats['content_tokens']}\n"
 
     # Heading level breakdown
-    level_counts = {}
-    for heading in headings:
-        level = heading.level or 0
-        level_counts[level] = level_counts.get(level, 0) + 1
+    level_counts = document.get_heading_level_counts()
 
     if level_counts:
         stats += "Heading levels:\n"
-        for level in sorted(level_counts.keys()):
-            stats += f"  H{level}: {level_counts[level]}\n"
+        for level, count in level_counts.items():
+            stats += f"  H{level}: {count}\n"
 
     return stats
 
@@ -204,6 +450,17 @@ def remove_document(doc_id: str) -> str:
         return f"Document '{doc_id}' not found or could not be removed"
 
 
+@mcp.tool()
+def clear_cache() -> str:
+    """Clear the persistent parse cache of previously loaded files.
+
+    Returns:
+        Number of removed cache entries
+    """
+    removed = navigator.clear_cache()
+    return f"Cache cleared: {removed} entries removed"
+
+
 # For direct execution
 if __name__ == "__main__":
     mcp.run()
@@ -0,0 +1,162 @@
+"""Tests for the persistent document parse cache."""
+
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from docnav.cache import DocumentCache, hash_file
+from docnav.models import Document, DocumentNode
+from docnav.navigator import DocumentNavigator
+
+
+def _make_document(text: str) -> Document:
+    document = Document(file_path=Path("doc.md"), title="doc", source_text=text)
+    document.root.add_child(
+        DocumentNode(type="heading", level=1, id="h1_0", title="Title")
+    )
+    document.rebuild_index()
+    return document
+
+
+class TestDocumentCache:
+    """Test cases for DocumentCache."""
+
+    def test_put_and_get_roundtrip(self, tmp_path):
+        """Test that a stored document is returned with its tree intact."""
+        cache = DocumentCache(tmp_path)
+        key = cache.make_key("abc", "MarkdownProcessor/1")
+        cache.put(key, _make_document("# Title"))
+
+        document = cache.get(key)
+        assert document is not None
+        assert document.source_text == "# Title"
+        assert document.get_node("h1_0").parent is document.root
+        assert cache.hits == 1
+
+    def test_miss_and_parser_in_key(self, tmp_path):
+        """Test that keys differ per parser and unknown keys miss."""
+        cache = DocumentCache(tmp_path)
+        key_v1 = cache.make_key("abc", "PDFProcessor/1")
+        key_v2 = cache.make_key("abc", "PDFProcessor/2")
+        assert key_v1 != key_v2
+
+        cache.put(key_v1, _make_document("text"))
+        assert cache.get(key_v2) is None
+        assert cache.misses == 1
+
+    def test_corrupt_entry_is_dropped(self, tmp_path):
+        """Test that unreadable entries are treated as misses and removed."""
+        cache = DocumentCache(tmp_path)
+        key = cache.make_key("abc", "MarkdownProcessor/1")
+        cache.put(key, _make_document("text"))
+        entry = next(tmp_path.glob("*.docnav"))
+        entry.write_bytes(b"not a pickle")
+
+        assert cache.get(key) is None
+        assert not entry.exists()
+
+    def test_size_bounded_eviction(self, tmp_path):
+        """Test that the oldest entries are evicted over the size limit."""
+        cache = DocumentCache(tmp_path)
+        first = cache.make_key("first", "p/1")
+        cache.put(first, _make_document("x" * 2000))
+        entry_size = cache.stats()["total_bytes"]
+
+        cache.max_bytes = entry_size + entry_size // 2
+        second = cache.make_key("second", "p/1")
+        cache.put(second, _make_document("y" * 2000))
+
+        assert cache.stats()["entries"] == 1
+        assert cache.get(first) is None
+        assert cache.get(second) is not None
+
+    def test_clear(self, tmp_path):
+        """Test clearing all entries."""
+        cache = DocumentCache(tmp_path)
+        cache.put(cache.make_key("a", "p/1"), _make_document("a"))
+        cache.put(cache.make_key("b", "p/1"), _make_document("b"))
+
+        assert cache.clear() == 2
+        assert cache.stats()["entries"] == 0
+
+    def test_hash_file(self, tmp_path):
+        """Test that file hashes follow content, not path."""
+        first = tmp_path / "a.md"
+        second = tmp_path / "b.md"
+        first.write_text("# Same")
+        second.write_text("# Same")
+        assert hash_file(first) == hash_file(second)
+
+
+class TestNavigatorCache:
+    """Test cases for navigator integration with the parse cache."""
+
+    def test_repeat_load_hits_cache(self, tmp_path):
+        """Test that loading unchanged content twice reuses the cached tree."""
+        cache = DocumentCache(tmp_path / "cache")
+        navigator = DocumentNavigator(cache=cache)
+        md_file = tmp_path / "doc.md"
+        md_file.write_text("# Title\n\n## Section\n\nBody text.\n")
+
+        first_id, first = navigator.load_document_from_file_sync(md_file)
+        second_id, second = navigator.load_document_from_file_sync(md_file)
+
+        assert first_id != second_id
+        assert navigator.get_document_metadata(first_id)["cached"] == "false"
+        assert navigator.get_document_metadata(second_id)["cached"] == "true"
+        assert second.get_outline() == first.get_outline()
+        assert cache.hits == 1
+
+    def test_changed_content_misses_cache(self, tmp_path):
+        """Test that edited files are reparsed."""
+        navigator = DocumentNavigator(cache=DocumentCache(tmp_path / "cache"))
+        md_file = tmp_path / "doc.md"
+        md_file.write_text("# Old\n")
+        navigator.load_document_from_file_sync(md_file)
+
+        md_file.write_text("# New\n")
+        doc_id, _ = navigator.load_document_from_file_sync(md_file)
+
+        assert navigator.get_document_metadata(doc_id)["cached"] == "false"
+        assert "New" in navigator.get_outline(doc_id)
+
+    def test_clear_cache(self, tmp_path):
+        """Test clearing the cache through the navigator."""
+        navigator = DocumentNavigator(cache=DocumentCache(tmp_path / "cache"))
+        md_file = tmp_path / "doc.md"
+        md_file.write_text("# Title\n")
+        navigator.load_document_from_file_sync(md_file)
+
+        assert navigator.clear_cache() == 1
+        assert DocumentNavigator().clear_cache() == 0
+
+    def test_streamed_hit_reads_its_own_file(self, tmp_path):
+        """Test that streamed documents from the cache read the loaded path."""
+        from docnav.processors import MarkdownProcessor
+
+        cache = DocumentCache(tmp_path / "cache")
+        first, second = tmp_path / "a.md", tmp_path / "b.md"
+        for md_file in (first, second):
+            md_file.write_text("# Title\n\nhello world\n")
+
+        def navigator():
+            return DocumentNavigator(
+                cache=cache, processors=[MarkdownProcessor(stream_min_bytes=0)]
+            )
+
+        navigator().load_document_from_file_sync(first)
+        other = navigator()
+        doc_id, document = other.load_document_from_file_sync(second)
+        assert other.get_document_metadata(doc_id)["cached"] == "true"
+
+        first.write_text("# Title\n\nzzzzz zzzzz\n")
+        assert "hello world" in other.search_document(doc_id, "hello")
+        assert "hello world" in other.read_section(doc_id, "root")
+        assert all(
+            node.source.path == second
+            for node in document.iter_nodes()
+            if node.source is not None
+        )
@@ -601,3 +601,1294 @@ class TestNavigatorIntegration:
         self.navigator.remove_document(doc_id1)
         assert len(self.navigator.loaded_documents) == 1
         assert doc_id2 in self.navigator.loaded_documents
+
+
+class TestLoadCoalescing:
+    """Tests for single-flight coalescing of concurrent file loads."""
+
+    def setup_method(self):
+        """Set up a navigator whose markdown processor is slow and counted."""
+        import threading
+        import time
+
+        from docnav.processors import MarkdownProcessor
+
+        self.navigator = DocumentNavigator()
+        self.calls = 0
+        self.started = threading.Event()
+        outer = self
+
+        class SlowMarkdownProcessor(MarkdownProcessor):
+            async def process(self, file_path):
+                outer.calls += 1
+                outer.started.set()
+                time.sleep(0.2)
+                return await super().process(file_path)
+
+        self.navigator.processors[0] = SlowMarkdownProcessor()
+
+    def test_concurrent_sync_loads_share_result(self, tmp_path):
+        """Test that concurrent sync loads of one file parse it once."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        md_file = tmp_path / "doc.md"
+        md_file.write_text("# Title\n\nBody.\n")
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(
+                pool.map(
+                    lambda _: self.navigator.load_document_from_file_sync(md_file),
+                    range(4),
+                )
+            )
+
+        assert self.calls == 1
+        assert len({doc_id for doc_id, _ in results}) == 1
+        assert all(document is results[0][1] for _, document in results)
+        assert len(self.navigator.loaded_documents) == 1
+        assert self.navigator._inflight_loads == {}
+
+    def test_sequential_loads_are_not_coalesced(self, tmp_path):
+        """Test that a finished load does not swallow later loads."""
+        md_file = tmp_path / "doc.md"
+        md_file.write_text("# Title\n")
+
+        first_id, _ = self.navigator.load_document_from_file_sync(md_file)
+        second_id, _ = self.navigator.load_document_from_file_sync(md_file)
+
+        assert first_id != second_id
+        assert self.calls == 2
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("anyio_backend", ["asyncio"])
+    async def test_async_waiter_joins_sync_load(self, tmp_path, anyio_backend):
+        """Test that an async load waits on an in-flight load from a thread."""
+        import threading
+
+        md_file = tmp_path / "doc.md"
+        md_file.write_text("# Title\n")
+        results = []
+
+        thread = threading.Thread(
+            target=lambda: results.append(
+                self.navigator.load_document_from_file_sync(md_file)
+            )
+        )
+        thread.start()
+        self.started.wait(timeout=5)
+        doc_id, _ = await self.navigator.load_document_from_file(md_file)
+        thread.join()
+
+        assert self.calls == 1
+        assert results[0][0] == doc_id
+
+    def test_failed_load_propagates_to_waiters(self, tmp_path):
+        """Test that errors reach every waiter and release the slot."""
+        md_file = tmp_path / "doc.md"
+        md_file.write_text("# Title\n")
+        flight, is_leader = self.navigator._join_inflight_load(str(md_file))
+        assert is_leader
+
+        waiter, waiter_is_leader = self.navigator._join_inflight_load(str(md_file))
+        assert waiter is flight
+        assert not waiter_is_leader
+
+        self.navigator._finish_inflight_load(
+            str(md_file), flight, error=ValueError("boom")
+        )
+        with pytest.raises(ValueError, match="boom"):
+            waiter.result()
+        assert self.navigator._inflight_loads == {}
+
+
+class TestLazyPDFNavigation:
+    """Tests for navigating lazily loaded PDFs."""
+
+    def test_read_and_search_lazy_pdf(self, tmp_path):
+        """Test that read_section and search convert pages on demand."""
+        import pymupdf
+
+        from docnav.processors import MarkdownProcessor, PDFProcessor
+
+        pdf = pymupdf.open()
+        for i in range(4):
+            page = pdf.new_page()
+            page.insert_text((72, 72), f"Chapter {i}", fontsize=20)
+            page.insert_text((72, 120), f"Body of chapter {i}.", fontsize=11)
+        pdf_file = tmp_path / "doc.pdf"
+        pdf.save(pdf_file)
+        pdf.close()
+
+        navigator = DocumentNavigator(
+            processors=[MarkdownProcessor(), PDFProcessor(lazy=True)]
+        )
+        doc_id, document = navigator.load_document_from_file_sync(pdf_file)
+        assert "Chapter 1" in navigator.get_outline(doc_id)
+        assert document.pages == {}
+
+        # Sections span to the page where the next one starts
+        section_id = document.get_headings()[0].id
+        assert "Body of chapter 0" in navigator.read_section(doc_id, section_id)
+        assert set(document.pages) == {0, 1}
+
+        results = navigator.search_document(doc_id, "chapter 3")
+        assert "Chapter 3" in results
+        assert set(document.pages) == {0, 1, 3}
+
+
+class TestBackgroundLoads:
+    """Tests for background load jobs and their progress."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.navigator = DocumentNavigator()
+
+    def _wait(self, doc_id):
+        import time
+
+        job = self.navigator.get_load_job(doc_id)
+        deadline = time.monotonic() + 30
+        while not job.finished and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return job
+
+    def test_start_load_completes(self, tmp_path):
+        """Test that a background load registers under the returned ID."""
+        md_file = tmp_path / "doc.md"
+        md_file.write_text("# Title\n\n## Section\n\nBody text.\n")
+
+        doc_id = self.navigator.start_load(md_file)
+        job = self._wait(doc_id)
+
+        assert job.phase == "done"
+        assert job.error is None
+        assert job.elapsed >= 0
+        assert "Section" in self.navigator.get_outline(doc_id)
+        assert self.navigator.get_document(doc_id).metadata["total_tokens:cl100k_base"]
+
+    def test_progress_phases(self, tmp_path):
+        """Test that the job walks through the load phases in order."""
+        from docnav.processors import MarkdownProcessor, PDFProcessor
+
+        phases = []
+
+        class RecordingPDFProcessor(PDFProcessor):
+            async def process(self, file_path, progress=None):
+                def record(phase, done, total):
+                    phases.append((phase, done, total))
+                    progress(phase, done, total)
+
+                return await super().process(file_path, progress=record)
+
+        pdf_file = tmp_path / "doc.pdf"
+        _make_pdf(pdf_file, 3)
+        self.navigator.processors = [MarkdownProcessor(), RecordingPDFProcessor()]
+
+        doc_id = self.navigator.start_load(pdf_file)
+        job = self._wait(doc_id)
+
+        assert job.phase == "done"
+        assert [phase for phase, _, _ in phases] == [
+            "convert",
+            "convert",
+            "parse",
+            "index",
+        ]
+        assert phases[-3][1:] == (3, 3)
+        assert (job.pages_done, job.pages_total) == (3, 3)
+
+    def test_failed_load_reports_error(self, tmp_path):
+        """Test that processing errors end the job in the error phase."""
+        from docnav.processors import MarkdownProcessor
+
+        class FailingProcessor(MarkdownProcessor):
+            async def process(self, file_path, progress=None):
+                raise ValueError("broken document")
+
+        md_file = tmp_path / "doc.md"
+        md_file.write_text("# Title\n")
+        self.navigator.processors = [FailingProcessor()]
+
+        doc_id = self.navigator.start_load(md_file)
+        job = self._wait(doc_id)
+
+        assert job.phase == "error"
+        assert "broken document" in job.error
+        assert self.navigator.get_document(doc_id) is None
+        assert self.navigator._inflight_loads == {}
+
+    @pytest.mark.anyio
+    @pytest.mark.parametrize("anyio_backend", ["asyncio"])
+    async def test_queries_answer_while_loads_wait(
+        self, tmp_path, monkeypatch, anyio_backend
+    ):
+        """Test that a load waiting on the load executor does not block queries."""
+        import threading
+
+        import anyio
+
+        import server
+
+        navigator = DocumentNavigator(load_workers=1)
+        monkeypatch.setattr(server, "navigator", navigator)
+        doc_id, _ = navigator.load_document_from_text_sync(
+            "# Title\n\nHello world.\n", "markdown"
+        )
+        md_file = tmp_path / "doc.md"
+        md_file.write_text("# Other\n")
+        loaded = []
+
+        async def load():
+            loaded.append(await server.load_document(str(md_file)))
+
+        release = threading.Event()
+        navigator._get_load_executor().submit(release.wait)  # Hold the only thread
+        try:
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(load)
+                await anyio.wait_all_tasks_blocked()
+                with anyio.fail_after(5):
+                    found = await server.search_document(doc_id, "hello")
+
+                assert "Found 1 results" in found
+                assert loaded == []
+                release.set()
+        finally:
+            release.set()
+
+        assert "Document loaded successfully" in loaded[0]
+
+    def test_directory_load_on_busy_executor(self, tmp_path):
+        """Test that fan-out from an executor thread finishes without free threads."""
+        for name in ("a", "b", "c"):
+            (tmp_path / f"{name}.md").write_text(f"# {name}\n")
+        navigator = DocumentNavigator(load_workers=1)
+
+        future = navigator._get_load_executor().submit(
+            navigator.load_directory_sync, tmp_path, "*.md", 4
+        )
+        result = future.result(timeout=30)
+
+        assert len(result.added) == 3
+        assert not result.errors
+
+    def test_unknown_job(self):
+        """Test looking up jobs that do not exist."""
+        assert self.navigator.get_load_job("invalid-id") is None
+        assert self.navigator.get_load_job(str(__import__("uuid").uuid4())) is None
+
+
+def _make_pdf(path, pages):
+    """Write a PDF with one titled page per chapter."""
+    import pymupdf
+
+    pdf = pymupdf.open()
+    for i in range(pages):
+        page = pdf.new_page()
+        page.insert_text((72, 72), f"Chapter {i}", fontsize=20)
+        page.insert_text((72, 120), f"Body of chapter {i}.", fontsize=11)
+    pdf.save(path)
+    pdf.close()
+
+
+class TestBatchLoading:
+    """Tests for loading several documents at once."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.navigator = DocumentNavigator()
+
+    def test_load_documents_sync(self, tmp_path):
+        """Test that a batch reports per-file ids and errors in input order."""
+        paths = []
+        for i in range(3):
+            md_file = tmp_path / f"doc{i}.md"
+            md_file.write_text(f"# Document {i}\n\nBody {i}.\n")
+            paths.append(md_file)
+        paths.insert(1, tmp_path / "missing.md")
+
+        results = self.navigator.load_documents_sync(paths, max_workers=2)
+
+        assert [result.file_path for result in results] == [str(p) for p in paths]
+        assert results[1].doc_id is None
+        assert "File not found" in results[1].error
+        loaded = [result for result in results if result.error is None]
+        assert len(loaded) == 3
+        assert all(result.seconds >= 0 for result in loaded)
+        assert "Document 2" in self.navigator.get_outline(results[3].doc_id)
+
+    def test_load_documents_runs_concurrently(self, tmp_path):
+        """Test that loads overlap up to the parallelism limit."""
+        import threading
+        import time
+
+        from docnav.processors import MarkdownProcessor
+
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        class SlowMarkdownProcessor(MarkdownProcessor):
+            async def process(self, file_path, progress=None):
+                with lock:
+                    active.append(file_path)
+                    peak.append(len(active))
+                time.sleep(0.1)
+                with lock:
+                    active.remove(file_path)
+                return await super().process(file_path)
+
+        self.navigator.processors[0] = SlowMarkdownProcessor()
+        paths = []
+        for i in range(4):
+            md_file = tmp_path / f"doc{i}.md"
+            md_file.write_text(f"# Document {i}\n")
+            paths.append(md_file)
+
+        self.navigator.load_documents_sync(paths, max_workers=2)
+
+        assert max(peak) == 2
+        assert self.navigator.load_documents_sync([]) == []
+
+
+class TestDirectoryLoading:
+    """Tests for incremental directory ingestion."""
+
+    def setup_method(self):
+        """Set up a navigator that counts processed files."""
+        from docnav.processors import MarkdownProcessor
+
+        self.navigator = DocumentNavigator()
+        self.processed = []
+        outer = self
+
+        class CountingMarkdownProcessor(MarkdownProcessor):
+            async def process(self, file_path, progress=None):
+                outer.processed.append(file_path.name)
+                return await super().process(file_path)
+
+        self.navigator.processors[0] = CountingMarkdownProcessor()
+
+    def _write_tree(self, root):
+        (root / "guide").mkdir()
+        (root / "a.md").write_text("# A\n")
+        (root / "b.md").write_text("# B\n")
+        (root / "guide" / "c.md").write_text("# C\n")
+        (root / "notes.txt").write_text("not markdown")
+
+    def test_initial_load(self, tmp_path):
+        """Test that all matching files are loaded with their ids."""
+        self._write_tree(tmp_path)
+
+        result = self.navigator.load_directory_sync(tmp_path)
+
+        assert len(result.added) == 3
+        assert sorted(self.processed) == ["a.md", "b.md", "c.md"]
+        assert set(result.doc_ids) == set(result.added)
+        c_path = str(tmp_path / "guide" / "c.md")
+        assert "C" in self.navigator.get_outline(result.doc_ids[c_path])
+
+    def test_reload_only_reparses_changes(self, tmp_path):
+        """Test that a second call reparses edits and drops deleted files."""
+        import os
+
+        self._write_tree(tmp_path)
+        first = self.navigator.load_directory_sync(tmp_path)
+        self.processed.clear()
+
+        a_path = tmp_path / "a.md"
+        a_path.write_text("# A edited\n")
+        b_path = tmp_path / "b.md"
+        os.utime(b_path, (0, 0))  # touched, content unchanged
+        (tmp_path / "guide" / "c.md").unlink()
+        (tmp_path / "d.md").write_text("# D\n")
+
+        second = self.navigator.load_directory_sync(tmp_path)
+
+        assert sorted(self.processed) == ["a.md", "d.md"]
+        assert second.updated == [str(a_path)]
+        assert second.added == [str(tmp_path / "d.md")]
+        assert second.unchanged == [str(b_path)]
+        assert second.removed == [str(tmp_path / "guide" / "c.md")]
+
+        # Updated files keep their id, deleted ones are unloaded
+        a_id = first.doc_ids[str(a_path)]
+        assert second.doc_ids[str(a_path)] == a_id
+        assert "A edited" in self.navigator.get_outline(a_id)
+        c_id = first.doc_ids[str(tmp_path / "guide" / "c.md")]
+        assert self.navigator.get_document(c_id) is None
+        assert len(self.navigator.loaded_documents) == 3
+
+    def test_removed_document_is_reloaded(self, tmp_path):
+        """Test that documents removed by hand are loaded again."""
+        (tmp_path / "a.md").write_text("# A\n")
+        first = self.navigator.load_directory_sync(tmp_path)
+        self.navigator.remove_document(first.doc_ids[first.added[0]])
+
+        second = self.navigator.load_directory_sync(tmp_path)
+
+        assert len(second.updated) == 1
+        assert len(self.navigator.loaded_documents) == 1
+
+    def test_file_deleted_during_scan(self, tmp_path, monkeypatch):
+        """Test that a file vanishing after the glob only fails that file."""
+        self._write_tree(tmp_path)
+        b_path = tmp_path / "b.md"
+        is_file = Path.is_file
+
+        def is_file_then_delete(path):
+            found = is_file(path)
+            if path == b_path:
+                path.unlink()
+            return found
+
+        monkeypatch.setattr(Path, "is_file", is_file_then_delete)
+        result = self.navigator.load_directory_sync(tmp_path)
+
+        assert list(result.errors) == [str(b_path)]
+        assert sorted(Path(path).name for path in result.added) == ["a.md", "c.md"]
+        assert len(self.navigator.loaded_documents) == 2
+
+    def test_glob_and_missing_directory(self, tmp_path):
+        """Test custom patterns and invalid directories."""
+        self._write_tree(tmp_path)
+
+        result = self.navigator.load_directory_sync(tmp_path, "*.txt")
+        assert [Path(path).name for path in result.added] == ["notes.txt"]
+
+        with pytest.raises(NotADirectoryError):
+            self.navigator.load_directory_sync(tmp_path / "missing")
+
+
+class TestInMemoryLoading:
+    """Tests for loads that must not round-trip through temporary files."""
+
+    @pytest.mark.anyio
+    async def test_text_load_writes_no_temp_file(self, monkeypatch):
+        """Test that loading text processes it in memory."""
+        import tempfile
+
+        def fail(*args, **kwargs):
+            raise AssertionError("temporary file should not be used")
+
+        monkeypatch.setattr(tempfile, "NamedTemporaryFile", fail)
+        navigator = DocumentNavigator()
+
+        doc_id, document = await navigator.load_document_from_text(
+            "# Title\n\n## Section\n", title="Notes"
+        )
+
+        assert document.title == "Notes"
+        assert "Section" in navigator.get_outline(doc_id)
+
+    @pytest.mark.anyio
+    async def test_pdf_fallback_writes_no_temp_file(self, tmp_path, monkeypatch):
+        """Test that the in-loop PDF path parses converted markdown in memory."""
+        import tempfile
+
+        def fail(*args, **kwargs):
+            raise AssertionError("temporary file should not be used")
+
+        pdf_file = tmp_path / "doc.pdf"
+        _make_pdf(pdf_file, 2)
+        monkeypatch.setattr(tempfile, "NamedTemporaryFile", fail)
+        navigator = DocumentNavigator()
+
+        # A running event loop routes the sync load through the fallback
+        doc_id, document = navigator.load_document_from_file_sync(pdf_file)
+
+        assert document.source_format == "pdf"
+        assert "Chapter 1" in document.source_text
+
+
+class TestParseEngineSelection:
+    """Tests for choosing parse engines through the navigator."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.navigator = DocumentNavigator()
+        self.content = "# Title\n\n```\n# not a heading\n```\n\n## Section\n\nBody.\n"
+
+    def test_text_and_file_loads_build_same_tree(self, tmp_path):
+        """Test that a document parses the same however it is loaded."""
+        md_file = tmp_path / "doc.md"
+        md_file.write_text(self.content)
+
+        _, from_text = self.navigator.load_document_from_text_sync(self.content)
+        _, from_file = self.navigator.load_document_from_file_sync(md_file)
+
+        assert from_text.get_outline() == from_file.get_outline()
+        assert sorted(from_text.index) == sorted(from_file.index)
+
+    def test_engine_per_load(self, tmp_path):
+        """Test overriding the engine for a single load."""
+        md_file = tmp_path / "doc.md"
+        md_file.write_text(self.content)
+
+        _, default = self.navigator.load_document_from_file_sync(md_file)
+        _, scanned = self.navigator.load_document_from_file_sync(
+            md_file, engine="scanner"
+        )
+        _, text = self.navigator.load_document_from_text_sync(
+            self.content, engine="scanner"
+        )
+
+        assert default.metadata["parse_stats"].engine == "commonmark"
+        assert scanned.metadata["parse_stats"].engine == "scanner"
+        assert text.metadata["parse_stats"].engine == "scanner"
+        assert [h.title for h in scanned.get_headings()] == ["Title", "Section"]
+
+    def test_streamed_file_load(self, tmp_path):
+        """Test that large files are streamed and still navigable."""
+        from docnav.processors import MarkdownProcessor
+
+        md_file = tmp_path / "doc.md"
+        md_file.write_text(self.content)
+        navigator = DocumentNavigator(
+            processors=[MarkdownProcessor(stream_min_bytes=0)]
+        )
+
+        doc_id, document = navigator.load_document_from_file_sync(md_file)
+
+        assert document.is_streamed
+        assert "Body." in navigator.read_section(doc_id, "root")
+        assert "Section" in navigator.search_document(doc_id, "body")
+        assert navigator.get_document_tokens(doc_id)["total_tokens"] > 0
+
+    def test_streamed_files_are_not_compacted(self, tmp_path):
+        """Test that streaming wins over columnar storage."""
+        from docnav.processors import MarkdownProcessor
+
+        md_file = tmp_path / "doc.md"
+        md_file.write_text(self.content)
+        navigator = DocumentNavigator(
+            processors=[MarkdownProcessor(stream_min_bytes=0)], columnar_min_nodes=0
+        )
+
+        doc_id, document = navigator.load_document_from_file_sync(md_file)
+
+        assert document.is_streamed and not document.is_columnar
+        assert "Body." in navigator.read_section(doc_id, "root")
+        assert "Section" in navigator.search_document(doc_id, "body")
+
+
+class TestXMLLoading:
+    """Tests for loading XML documents through the navigator."""
+
+    CONTENT = (
+        "<topic id='t1'><title>Install</title><body><p>Download it.</p></body>"
+        "<topic id='t2'><title>Configure</title><body><p>Edit it.</p></body>"
+        "</topic></topic>"
+    )
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.navigator = DocumentNavigator()
+
+    def test_xml_file_load_parses_xml(self, tmp_path):
+        """Test that XML files are parsed as XML, not as Markdown."""
+        xml_file = tmp_path / "guide.dita"
+        xml_file.write_text(f"<dita>{self.CONTENT}</dita>")
+
+        doc_id, document = self.navigator.load_document_from_file_sync(xml_file)
+
+        assert document.source_format == "xml"
+        assert "#t2 - Configure" in self.navigator.get_outline(doc_id)
+        assert "Edit it." in self.navigator.read_section(doc_id, "t1")
+        assert "Configure" in self.navigator.search_document(doc_id, "edit")
+        assert self.navigator.get_document_tokens(doc_id)["total_tokens"] > 0
+
+    def test_text_and_file_loads_build_same_tree(self, tmp_path):
+        """Test that XML text loads use the same processor as file loads."""
+        xml_file = tmp_path / "guide.xml"
+        xml_file.write_text(f"<dita>{self.CONTENT}</dita>")
+
+        _, from_text = self.navigator.load_document_from_text_sync(
+            f"<dita>{self.CONTENT}</dita>", format="xml"
+        )
+        _, from_file = self.navigator.load_document_from_file_sync(xml_file)
+
+        assert from_text.get_outline() == from_file.get_outline()
+        assert list(from_text.index) == list(from_file.index)
+
+    def test_server_navigator_parses_xml(self, tmp_path, monkeypatch):
+        """Test that the MCP server's processor list includes XML."""
+        import server
+
+        monkeypatch.setattr(server.navigator, "cache", None)
+        xml_file = tmp_path / "guide.xml"
+        xml_file.write_text(f"<dita>{self.CONTENT}</dita>")
+
+        doc_id, document = server.navigator.load_document_from_file_sync(xml_file)
+        try:
+            assert document.source_format == "xml"
+            assert "#t2 - Configure" in server.navigator.get_outline(doc_id)
+        finally:
+            server.navigator.remove_document(doc_id)
+
+
+class TestCompactDocumentNode:
+    """Tests for the slotted DocumentNode layout."""
+
+    def test_leaves_share_empty_children_and_skip_attributes(self):
+        """Test that leaves allocate neither a children list nor a dict."""
+        from docnav.models import DocumentNode
+
+        first = DocumentNode(type="paragraph", id="p_0", attributes={"line_number": 3})
+        second = DocumentNode(type="paragraph", id="p_1")
+
+        assert not hasattr(first, "__dict__")
+        assert first.get_children() is second.get_children()
+        assert first._children is None
+        assert first.get_attribute("line_number") == 3
+        assert first._attributes is None
+        assert second.get_attribute("missing", "default") == "default"
+
+    def test_attributes_stay_compatible(self):
+        """Test dict access, add_child and equality like the dataclass."""
+        from docnav.models import DocumentNode
+
+        parent = DocumentNode(type="heading", level=1, id="h1_0")
+        child = DocumentNode(type="paragraph", id="p_1", attributes={"line_number": 2})
+        parent.add_child(child)
+        child.attributes["span"] = (0, 4)
+
+        assert child.parent is parent
+        assert parent.children == [child]
+        assert child.attributes == {"line_number": 2, "span": (0, 4)}
+        assert child == DocumentNode(
+            type="paragraph", id="p_1", attributes={"line_number": 2, "span": (0, 4)}
+        )
+
+    def test_append_to_leaf_children(self):
+        """Test that a leaf's children list can be mutated in place."""
+        from docnav.models import DocumentNode
+
+        leaf = DocumentNode(type="list_item", id="list_0")
+        other = DocumentNode(type="list_item", id="list_1")
+        child = DocumentNode(type="paragraph", id="p_2")
+        leaf.children.append(child)
+
+        assert leaf.children == [child]
+        assert leaf.get_children() == [child]
+        assert other.get_children() == ()
+
+    def test_pickle_round_trip(self):
+        """Test that parsed trees survive the parse cache's pickling."""
+        import pickle
+
+        compass = DocumentCompass("# Title\n\nText.\n\n## Sub\n\n- item\n")
+        restored = pickle.loads(pickle.dumps(compass.root))
+
+        assert restored == compass.root
+        assert restored.children[0].children[0].parent is restored.children[0]
+
+
+class TestColumnarDocuments:
+    """Tests for documents stored in a columnar tree."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.test_md_file = Path(__file__).parent / "test_report_markdown.md"
+        self.objects = DocumentNavigator()
+        self.columnar = DocumentNavigator(columnar_min_nodes=0)
+
+    def _load_both(self):
+        object_id, object_doc = self.objects.load_document_from_file_sync(
+            self.test_md_file
+        )
+        columnar_id, columnar_doc = self.columnar.load_document_from_file_sync(
+            self.test_md_file
+        )
+        return object_id, object_doc, columnar_id, columnar_doc
+
+    def test_navigator_output_matches_object_tree(self):
+        """Test that outline, sections, search and navigation are unchanged."""
+        object_id, object_doc, columnar_id, columnar_doc = self._load_both()
+
+        assert columnar_doc.is_columnar and not columnar_doc.index
+        assert columnar_doc.node_count == object_doc.node_count
+        assert columnar_doc.get_outline(6) == object_doc.get_outline(6)
+        assert self.columnar.get_outline(columnar_id, 6) == self.objects.get_outline(
+            object_id, 6
+        )
+        for heading in object_doc.get_headings():
+            assert self.columnar.read_section(
+                columnar_id, heading.id
+            ) == self.objects.read_section(object_id, heading.id)
+            assert self.columnar.navigate(
+                columnar_id, heading.id
+            ) == self.objects.navigate(object_id, heading.id)
+        for query in ("the", "Section", "zzz-not-present"):
+            assert self.columnar.search_document(
+                columnar_id, query
+            ) == self.objects.search_document(object_id, query)
+
+    def test_scanner_spans_share_source_text(self):
+        """Test that a scanner tree indexes the source text without a copy."""
+        content = self.test_md_file.read_text(encoding="utf-8")
+        object_id, object_doc = self.objects.load_document_from_text_sync(
+            content, engine="scanner"
+        )
+        columnar_id, columnar_doc = self.columnar.load_document_from_text_sync(
+            content, engine="scanner"
+        )
+
+        assert columnar_doc.tree.text is columnar_doc.source_text
+        for heading in object_doc.get_headings():
+            assert self.columnar.read_section(
+                columnar_id, heading.id
+            ) == self.objects.read_section(object_id, heading.id)
+        for query in ("the", "Section", "zzz-not-present"):
+            assert self.columnar.search_document(
+                columnar_id, query
+            ) == self.objects.search_document(object_id, query)
+
+    def test_type_scans_and_views(self):
+        """Test type queries and node views against the object tree."""
+        _, object_doc, _, columnar_doc = self._load_both()
+
+        for node_type in ("heading", "paragraph", "list_item", "missing"):
+            assert [n.id for n in columnar_doc.get_nodes_by_type(node_type)] == [
+                n.id for n in object_doc.get_nodes_by_type(node_type)
+            ]
+        assert [h.id for h in columnar_doc.get_headings(2)] == [
+            h.id for h in object_doc.get_headings(2)
+        ]
+
+        node = columnar_doc.get_node(object_doc.get_headings()[-1].id)
+        original = object_doc.get_node(node.id)
+        assert (node.type, node.level, node.title, node.content) == (
+            original.type,
+            original.level,
+            original.title,
+            original.content,
+        )
+        assert node.attributes == original.attributes
+        assert node.parent.id == original.parent.id
+        assert [c.id for c in node.children] == [c.id for c in original.children]
+        with pytest.raises(TypeError):
+            node.add_child(node)
+
+    def test_scans_without_numpy(self, monkeypatch):
+        """Test that type and level scans fall back to plain loops."""
+        import docnav.tree
+
+        _, object_doc, _, columnar_doc = self._load_both()
+        monkeypatch.setattr(docnav.tree, "np", None)
+
+        assert [h.id for h in columnar_doc.get_headings(2)] == [
+            h.id for h in object_doc.get_headings(2)
+        ]
+        with pytest.raises(ImportError):
+            columnar_doc.tree.as_numpy("types")
+
+    def test_search_maps_hits_to_nodes(self):
+        """Test that buffer hits never match across node boundaries."""
+        from docnav.models import DocumentNode
+        from docnav.tree import ColumnarTree
+
+        root = DocumentNode(type="document", id="root")
+        for index, text in enumerate(["alpha be", "ta gamma", "", "Beta"]):
+            root.add_child(
+                DocumentNode(type="paragraph", id=f"p_{index}", content=text)
+            )
+        tree = ColumnarTree.from_node(root)
+
+        assert [tree.ids[o] for o in tree.search("beta")] == ["p_3"]
+        assert [tree.ids[o] for o in tree.search("A")] == ["p_0", "p_1", "p_3"]
+        assert tree.subtree_contents(0) == ["alpha be", "ta gamma", "Beta"]
+        assert list(tree.subtree_ends) == [5, 2, 3, 4, 5]
+
+    def test_numpy_views_and_pickle(self):
+        """Test zero-copy array views and cache round trips."""
+        import pickle
+
+        np = pytest.importorskip("numpy")
+        _, object_doc, _, columnar_doc = self._load_both()
+        tree = columnar_doc.tree
+
+        parents = tree.as_numpy("parents")
+        assert parents.dtype == np.int32
+        assert parents[0] == -1 and len(parents) == len(tree)
+
+        restored = pickle.loads(pickle.dumps(columnar_doc))
+        assert restored.get_outline(6) == object_doc.get_outline(6)
+
+
+class TestPreorderNumbering:
+    """Tests for the preorder numbering built by Document.rebuild_index."""
+
+    CONTENT = (
+        "# Guide\n\nIntro.\n\n## Setup\n\nInstall it.\n\n### Linux\n\nUse apt.\n\n"
+        "## Usage\n\nRun it.\n\n# Appendix\n\nNotes.\n"
+    )
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        from docnav.processors import MarkdownProcessor
+
+        self.document = MarkdownProcessor(engine="scanner").process_content(
+            self.CONTENT
+        )
+
+    def test_subtrees_and_ancestors_match_tree_walks(self):
+        """Test that numbering answers the same as walking the tree."""
+        document = self.document
+
+        for node in document.get_subtree(document.root):
+            expected = []
+            stack = [node]
+            while stack:
+                current = stack.pop()
+                expected.append(current)
+                stack.extend(reversed(current.children))
+            assert document.get_subtree(node) == expected
+            assert document.get_depth(node) == node.get_depth()
+            assert document.get_ancestors(node) == node.get_ancestors()
+            for other in expected:
+                assert document.is_ancestor(node, other)
+
+        linux = document.get_node("h3_4")
+        usage = document.get_node("h2_6")
+        assert not document.is_ancestor(usage, linux)
+        assert [h.title for h in document.get_heading_path(linux)] == [
+            "Guide",
+            "Setup",
+        ]
+        assert document.get_section_heading(document.get_node("p_5")) is linux
+        assert document.get_section_heading(document.root) is None
+
+    def test_deep_trees_do_not_recurse(self):
+        """Test indexing a tree deeper than the recursion limit."""
+        from docnav.models import Document, DocumentNode
+
+        root = DocumentNode(type="document", id="root")
+        node = root
+        for level in range(sys.getrecursionlimit() + 100):
+            child = DocumentNode(type="heading", level=1, id=f"h_{level}")
+            node.add_child(child)
+            node = child
+        document = Document(file_path=None, title="deep", source_text="", root=root)
+
+        assert document.get_depth(node) == sys.getrecursionlimit() + 100
+        assert len(document.get_heading_path(node)) == sys.getrecursionlimit() + 99
+        assert len(document.get_subtree(root)) == document.node_count
+
+    def test_unindexed_nodes_fall_back_to_walks(self):
+        """Test nodes added after indexing, and columnar parity."""
+        from docnav.models import DocumentNode
+
+        document = self.document
+        linux = document.get_node("h3_4")
+        late = DocumentNode(type="paragraph", id="late", content="Late.")
+        linux.add_child(late)
+
+        assert document.get_section_heading(late) is linux
+        assert document.get_depth(late) == 4
+        assert document.is_ancestor(document.root, late)
+
+        document.rebuild_index()
+        views = {
+            node.id: (
+                document.get_depth(node),
+                [h.id for h in document.get_heading_path(node)],
+            )
+            for node in document.get_subtree(document.root)
+        }
+        document.compact()
+        assert {
+            node.id: (
+                document.get_depth(node),
+                [h.id for h in document.get_heading_path(node)],
+            )
+            for node in document.get_subtree(document.root)
+        } == views
+
+
+class TestSectionSlices:
+    """Tests for sections read as slices of the source text."""
+
+    CONTENT = (
+        "# Guide\n\nSome **bold** text\nwrapped here.\n\n## Setup\n\n"
+        "- one\n- two\n\n```sh\nmake\n```\n\n# Appendix\n\nNotes.\n"
+    )
+    SETUP = "## Setup\n\n- one\n- two\n\n```sh\nmake\n```"
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.navigator = DocumentNavigator()
+
+    @pytest.mark.parametrize("engine", ["scanner", "commonmark"])
+    def test_sections_are_verbatim_source(self, engine):
+        """Test that sections keep markup and blank lines for both engines."""
+        doc_id, document = self.navigator.load_document_from_text_sync(
+            self.CONTENT, engine=engine
+        )
+        setup = next(h for h in document.get_headings() if h.title == "Setup")
+        guide = next(h for h in document.get_headings() if h.title == "Guide")
+
+        assert self.navigator.read_section(doc_id, setup.id) == self.SETUP
+        assert (
+            self.navigator.read_section(doc_id, guide.id)
+            == (self.CONTENT[: self.CONTENT.index("\n\n# Appendix")])
+        )
+        assert self.navigator.read_section(doc_id, "root") == self.CONTENT
+
+        joined = self.navigator.read_section(doc_id, setup.id, join_nodes=True)
+        assert joined == "\n".join(
+            node.content for node in document.get_subtree(setup) if node.content
+        )
+
+    def test_columnar_and_unmapped_trees(self):
+        """Test columnar slices and the node-joined fallback for XML."""
+        navigator = DocumentNavigator(columnar_min_nodes=0)
+        doc_id, document = navigator.load_document_from_text_sync(
+            self.CONTENT, engine="commonmark"
+        )
+        setup = next(h for h in document.get_headings() if h.title == "Setup")
+        assert document.is_columnar
+        assert navigator.read_section(doc_id, setup.id) == self.SETUP
+
+        doc_id, document = self.navigator.load_document_from_text_sync(
+            "<doc><section id='s'><title>T</title><p>Body</p></section></doc>",
+            format="xml",
+        )
+        assert document.get_section_span(document.get_node("s")) is None
+        assert self.navigator.read_section(doc_id, "s") == "T\nBody"
+
+
+class TestTypeIndexes:
+    """Tests for the per-type and per-level indexes built while indexing."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.test_md_file = Path(__file__).parent / "test_report_markdown.md"
+
+    @pytest.mark.parametrize("columnar_min_nodes", [None, 0])
+    def test_indexes_match_scans(self, columnar_min_nodes):
+        """Test buckets, level counts and heading order against full scans."""
+        navigator = DocumentNavigator(columnar_min_nodes=columnar_min_nodes)
+        _, document = navigator.load_document_from_file_sync(self.test_md_file)
+        nodes = document.get_subtree(document.root)
+
+        for node_type in ("heading", "paragraph", "list_item", "missing"):
+            expected = [n.id for n in nodes if n.type == node_type]
+            assert [n.id for n in document.get_nodes_by_type(node_type)] == expected
+            assert document.count_nodes_by_type(node_type) == len(expected)
+
+        headings = [n for n in nodes if n.type == "heading"]
+        counts = {}
+        for heading in headings:
+            counts[heading.level] = counts.get(heading.level, 0) + 1
+        assert document.get_heading_level_counts() == dict(sorted(counts.items()))
+        for max_level in (None, 1, 2, 6):
+            expected = sorted(
+                (h for h in headings if max_level is None or h.level <= max_level),
+                key=lambda h: (h.level, h.id),
+            )
+            assert [h.id for h in document.get_headings(max_level)] == [
+                h.id for h in expected
+            ]
+
+    def test_headings_without_level(self):
+        """Test that unleveled headings sort first and drop out with a limit."""
+        from docnav.models import Document, DocumentNode
+
+        root = DocumentNode(type="document", id="root")
+        for node_id, level in (("b", 2), ("a", None), ("c", 1)):
+            root.add_child(DocumentNode(type="heading", level=level, id=node_id))
+        document = Document(file_path=None, title="t", source_text="", root=root)
+
+        assert document.get_heading_level_counts() == {0: 1, 1: 1, 2: 1}
+        assert [h.id for h in document.get_headings()] == ["a", "c", "b"]
+        assert [h.id for h in document.get_headings(1)] == ["c"]
+
+
+class TestInvertedIndex:
+    """Tests for token search through the per-document inverted index."""
+
+    TEXT = (
+        "# Testing\n\nRun the test suite before a release.\n\n"
+        "## Notes\n\nTesting takes time.\n\nA test, then a release!\n"
+    )
+
+    @pytest.mark.parametrize("columnar_min_nodes", [None, 0])
+    def test_token_and_substring_modes(self, columnar_min_nodes):
+        """Test that token mode matches whole words and requires every term."""
+        navigator = DocumentNavigator(columnar_min_nodes=columnar_min_nodes)
+        _, document = navigator.load_document_from_text_sync(self.TEXT, "markdown")
+        assert document.is_columnar == (columnar_min_nodes == 0)
+
+        # The index is built by the first token search, not by the load
+        assert document.search_index is None
+        tokens = [r.content for r in document.search("TEST")]
+        assert tokens == [
+            "Run the test suite before a release.",
+            "A test, then a release!",
+        ]
+        assert [r.section for r in document.search("release test")] == [
+            "Testing",
+            "Notes",
+        ]
+        assert document.search("test missing") == []
+
+        substrings = [r.content for r in document.search("test", "substring")]
+        assert substrings == [
+            "# Testing",
+            "Run the test suite before a release.",
+            "Testing takes time.",
+            "A test, then a release!",
+        ]
+        # Queries without words fall back to substring matching
+        assert [r.content for r in document.search("!")] == substrings[-1:]
+
+    def test_search_document_modes(self):
+        """Test the mode argument of search_document and the compass."""
+        from docnav.navigator import DocumentCompass
+
+        navigator = DocumentNavigator()
+        doc_id, _ = navigator.load_document_from_text_sync(self.TEXT, "markdown")
+
+        assert "Found 2 results" in navigator.search_document(doc_id, "test")
+        assert "Found 4 results" in navigator.search_document(
+            doc_id, "test", "substring"
+        )
+        with pytest.raises(ValueError):
+            navigator.search_document(doc_id, "test", "regex")
+
+        compass = DocumentCompass(self.TEXT, "markdown")
+        assert compass.search_index is None
+        assert len(compass.search("test")) == 2
+        assert len(compass.search("test", mode="substring")) == 4
+        assert compass.search_index is not None
+
+
+class TestCorpusSearch:
+    """Tests for ranked search across all loaded documents."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.navigator = DocumentNavigator()
+        self.install_id, _ = self.navigator.load_document_from_text_sync(
+            "# Install\n\nInstall the cache server.\n\n"
+            "## Cache\n\nThe cache keeps cache entries in cache files.\n",
+            "markdown",
+            "install",
+        )
+        self.usage_id, _ = self.navigator.load_document_from_text_sync(
+            "# Usage\n\nStart the server and query the cache.\n",
+            "markdown",
+            "usage",
+        )
+
+    def test_ranked_hits_across_documents(self):
+        """Test that hits need every term and rank by frequency and rarity."""
+        results = self.navigator.search_corpus("cache")
+        # BM25 favours short nodes and saturates repeated terms
+        assert [(r.doc_id, r.snippet) for r in results] == [
+            (self.install_id, "## Cache"),
+            (self.install_id, "The cache keeps cache entries in cache files."),
+            (self.install_id, "Install the cache server."),
+            (self.usage_id, "Start the server and query the cache."),
+        ]
+        assert results == sorted(results, key=lambda r: -r.score)
+        assert len(self.navigator.search_corpus("cache", limit=2)) == 2
+
+        results = self.navigator.search_corpus("SERVER query")
+        assert [(r.doc_id, r.section_id, r.snippet) for r in results] == [
+            (self.usage_id, "h1_0", "Start the server and query the cache.")
+        ]
+        assert self.navigator.search_corpus("server missing") == []
+        assert self.navigator.search_corpus("") == []
+
+        output = self.navigator.search_all("query")
+        assert "1. usage" in output and f"[{self.usage_id}]" in output
+        assert "(#h1_0)" in output
+
+    def test_index_follows_loads_and_removals(self, tmp_path):
+        """Test that the corpus index is updated without rebuilding it."""
+        from docnav.processors import MarkdownProcessor
+
+        index = self.navigator.corpus_index
+        self.navigator.search_corpus("cache")
+        assert self.navigator.remove_document(self.install_id)
+        assert self.install_id not in index
+        assert "install" not in index.terms
+        assert set(index.terms["cache"]) == {self.usage_id}
+
+        # Re-registered documents replace their entry
+        (tmp_path / "a.md").write_text("# A\n\nalpha\n")
+        result = self.navigator.load_directory_sync(tmp_path)
+        doc_id = result.doc_ids[str((tmp_path / "a.md").resolve())]
+        assert self.navigator.search_corpus("alpha")[0].doc_id == doc_id
+        (tmp_path / "a.md").write_text("# A\n\nbeta\n")
+        self.navigator.load_directory_sync(tmp_path)
+        assert self.navigator.search_corpus("alpha") == []
+        assert self.navigator.search_corpus("beta")[0].doc_id == doc_id
+        (tmp_path / "a.md").unlink()
+        self.navigator.load_directory_sync(tmp_path)
+        assert len(index) == 1 and "beta" not in index.terms
+
+        # Streamed files keep no text and are listed as not indexed
+        self.navigator.processors.insert(0, MarkdownProcessor(stream_min_bytes=0))
+        (tmp_path / "big.md").write_text("# Big\n\nalpha\n")
+        big_id, _ = self.navigator.load_document_from_file_sync(tmp_path / "big.md")
+        assert big_id not in index
+        output = self.navigator.search_all("alpha")
+        assert output.startswith("No results found for 'alpha'")
+        assert f"Not indexed (use search_document): {big_id}" in output
+
+    def test_loads_defer_indexing_to_corpus_searches(self, tmp_path):
+        """Test that loads, cache hits included, do not build search indexes."""
+        from docnav.cache import DocumentCache
+
+        navigator = DocumentNavigator(cache=DocumentCache(tmp_path / "cache"))
+        md_file = tmp_path / "doc.md"
+        md_file.write_text("# Doc\n\nalpha beta\n")
+        navigator.load_document_from_file_sync(md_file)
+        doc_id, document = navigator.load_document_from_file_sync(md_file)
+
+        assert navigator.get_document_metadata(doc_id)["cached"] == "true"
+        assert document.search_index is None
+        assert len(navigator.corpus_index) == 0
+
+        assert doc_id in {r.doc_id for r in navigator.search_corpus("beta")}
+        assert document.search_index is not None
+        assert doc_id in navigator.corpus_index
+
+    def test_snippets_center_on_first_term(self):
+        """Test that long contents are cut around the first query term."""
+        from docnav.search import make_snippet
+
+        content = "word " * 100 + "needle " + "word " * 100
+        snippet = make_snippet(content, ["needle"], width=40)
+        assert snippet.startswith("...") and snippet.endswith("...")
+        assert "needle" in snippet and len(snippet) == 46
+        assert make_snippet("short\ntext", ["text"]) == "short text"
+
+
+class TestRankedSearch:
+    """Tests for BM25 ranking and top-k selection of token searches."""
+
+    TEXT = (
+        "# Guide\n\nThe cache.\n\nA long paragraph that mentions the cache once "
+        "among many other words.\n\nCache misses fill the cache from disk.\n\n"
+        "## Cache\n\nUnrelated text.\n\nThe cache.\n"
+    )
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.navigator = DocumentNavigator()
+        self.doc_id, self.document = self.navigator.load_document_from_text_sync(
+            self.TEXT, "markdown"
+        )
+
+    def test_best_matches_first(self):
+        """Test that results are ordered by BM25 score and limited."""
+        total, results = self.document.search_ranked("cache", limit=3)
+        assert total == 5
+        # Short nodes beat long ones; equal scores keep document order
+        assert [r.content for r in results] == ["## Cache", "The cache.", "The cache."]
+        assert results[0].score > results[1].score == results[2].score
+        assert results[1].node_id != results[2].node_id
+
+        total, results = self.document.search_ranked("cache disk")
+        assert (total, [r.content for r in results]) == (
+            1,
+            ["Cache misses fill the cache from disk."],
+        )
+        assert self.document.search_ranked("cache missing") == (0, [])
+        assert self.document.search_ranked("cache", limit=0) == (5, [])
+
+        output = self.navigator.search_document(self.doc_id, "cache", limit=2)
+        assert output.startswith("Found 5 results for 'cache'")
+        assert "1. In section 'Guide' (#h1_0), score" in output
+        assert "   ## Cache..." in output and "3." not in output
+        output = self.navigator.search_document(self.doc_id, "cache", "substring")
+        assert "score" not in output and "5." in output
+
+    def test_numpy_and_python_rankings_agree(self, monkeypatch):
+        """Test that the vectorized and pure Python paths give the same hits."""
+        import docnav.search
+        from docnav.search import parse_query
+
+        index = self.document.get_search_index()
+        queries = [
+            parse_query(q)
+            for q in (
+                "cache",
+                "the cache",
+                "cache x",
+                '"the cache"',
+                "fill NEAR/2 disk",
+            )
+        ]
+        expected = [index.rank(query, 3) for query in queries]
+        matches = [index.match_query(query) for query in queries]
+
+        monkeypatch.setattr(docnav.search, "np", None)
+        for query, (total, hits) in zip(queries, expected):
+            python_total, python_hits = index.rank(query, 3)
+            assert python_total == total
+            assert [o for _, o in python_hits] == [o for _, o in hits]
+            assert [s for s, _ in python_hits] == pytest.approx([s for s, _ in hits])
+        assert [index.match_query(query) for query in queries] == matches
+
+
+class TestPhraseSearch:
+    """Tests for phrase and NEAR/k queries over positional postings."""
+
+    TEXT = (
+        "# Notes\n\nThe quick brown\nfox jumps over the lazy dog.\n\n"
+        "A fox, then a quick note.\n"
+    )
+    PARAGRAPH = "The quick brown\nfox jumps over the lazy dog."
+
+    def test_parse_query(self):
+        """Test phrases, NEAR operands and malformed operators."""
+        from docnav.search import parse_query
+
+        query = parse_query('Quick "brown  FOX" NEAR/2 dog')
+        assert query.operands == [("quick",), ("brown", "fox"), ("dog",)]
+        assert query.near == [(1, 2, 2)]
+        assert query.terms == ["quick", "brown", "fox", "dog"]
+        assert not query.is_plain
+
+        assert parse_query("brown fox").is_plain
+        assert parse_query('"fox"').is_plain
+        # NEAR without an operand on both sides is read as words
+        assert parse_query("NEAR/3 fox").operands == [("near",), ("3",), ("fox",)]
+        assert parse_query("fox NEAR/3").operands == [("fox",), ("near",), ("3",)]
+        assert parse_query('"lazy dog').operands == [("lazy", "dog")]
+
+    @pytest.mark.parametrize("columnar_min_nodes", [None, 0])
+    def test_phrases_and_proximity(self, columnar_min_nodes):
+        """Test that phrases span line breaks and NEAR bounds the gap."""
+        navigator = DocumentNavigator(columnar_min_nodes=columnar_min_nodes)
+        doc_id, document = navigator.load_document_from_text_sync(self.TEXT, "markdown")
+
+        def contents(query):
+            return [r.content for r in document.search(query)]
+
+        assert contents('"brown fox"') == [self.PARAGRAPH]
+        assert document.search("brown fox", "substring") == []
+        assert contents('"fox brown"') == []
+        assert contents('"quick fox"') == []
+
+        # One word between quick and fox in the paragraph, two in the note
+        assert contents("quick NEAR/1 fox") == [self.PARAGRAPH]
+        assert contents("fox NEAR/1 quick") == [self.PARAGRAPH]
+        assert contents("quick NEAR/0 fox") == []
+        assert len(contents("fox NEAR/2 quick")) == 2
+        assert contents('"quick brown" NEAR/0 fox') == [self.PARAGRAPH]
+        assert contents('dog NEAR/3 "quick brown"') == []
+        assert contents('dog NEAR/4 "quick brown" note') == []
+
+        total, results = document.search_ranked('"lazy dog" NEAR/5 fox')
+        assert total == 1 and results[0].score > 0
+        assert "Found 1 results" in navigator.search_document(doc_id, '"brown fox"')
+        hits = navigator.search_corpus('"brown fox"')
+        assert [(h.doc_id, h.snippet) for h in hits] == [
+            (doc_id, "The quick brown fox jumps over the lazy dog.")
+        ]
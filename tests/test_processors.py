@@ -354,3 +354,684 @@ class TestProcessorComparison:
         # Both should have supported extensions
         assert len(md_info["supported_extensions"]) > 0
         assert len(pdf_info["supported_extensions"]) > 0
+
+
+def _make_pdf(path: Path, pages: int) -> Path:
+    """Write a PDF with one large-font chapter heading per page."""
+    import pymupdf
+
+    pdf = pymupdf.open()
+    for i in range(pages):
+        page = pdf.new_page()
+        page.insert_text((72, 72), f"Chapter {i}", fontsize=20)
+        page.insert_text((72, 120), f"Body text on page {i}.", fontsize=11)
+        page.insert_text((72, 140), f"More body about topic{i}.", fontsize=11)
+    pdf.save(path)
+    pdf.close()
+    return path
+
+
+class TestPDFShardedConversion:
+    """Test cases for page-sharded parallel PDF conversion."""
+
+    def test_page_shards_cover_all_pages_in_order(self):
+        """Test that shards are contiguous and cover every page once."""
+        processor = PDFProcessor(workers=3)
+        shards = processor._page_shards(10)
+
+        assert [page for shard in shards for page in shard] == list(range(10))
+        assert len(shards) == 3
+
+        processor = PDFProcessor(workers=4, shard_pages=4)
+        assert [len(shard) for shard in processor._page_shards(10)] == [4, 4, 2]
+
+    def test_sharded_conversion_matches_serial(self, tmp_path):
+        """Test that stitched shards equal a single-process conversion."""
+        pdf_file = _make_pdf(tmp_path / "doc.pdf", 4)
+
+        serial = PDFProcessor().convert_to_markdown(pdf_file)
+        sharded = PDFProcessor(
+            workers=2, shard_pages=1, parallel_min_pages=1
+        ).convert_to_markdown(pdf_file)
+
+        assert sharded == serial
+        assert sharded.index("Chapter 0") < sharded.index("Chapter 3")
+
+    def test_sharded_report_is_byte_identical_to_serial(self):
+        """Test that sharding a real report changes no byte of the markdown."""
+        pdf_file = Path(__file__).parent / "test_report_pdf_origin.pdf"
+
+        serial = PDFProcessor().convert_to_markdown(pdf_file)
+        sharded = PDFProcessor(
+            workers=2, shard_pages=7, parallel_min_pages=1
+        ).convert_to_markdown(pdf_file)
+
+        assert sharded.encode() == serial.encode()
+        assert "\n\n\n" not in serial
+
+    def test_small_pdf_is_not_sharded(self, tmp_path, monkeypatch):
+        """Test that PDFs below the page threshold skip the process pool."""
+        import docnav.processors.pdf as pdf_module
+
+        pdf_file = _make_pdf(tmp_path / "doc.pdf", 2)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("process pool should not be used")
+
+        monkeypatch.setattr(pdf_module, "get_process_pool", fail)
+        markdown = PDFProcessor(workers=4).convert_to_markdown(pdf_file)
+        assert "Chapter 1" in markdown
+
+
+class TestPDFLazyLoading:
+    """Test cases for lazy, on-demand PDF page conversion."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.processor = PDFProcessor(lazy=True)
+
+    @pytest.mark.anyio
+    async def test_lazy_process_builds_outline_only(self, tmp_path):
+        """Test that a lazy load detects headings without converting pages."""
+        pdf_file = _make_pdf(tmp_path / "doc.pdf", 3)
+        document = await self.processor.process(pdf_file)
+
+        headings = document.get_headings()
+        assert [h.title for h in headings] == ["Chapter 0", "Chapter 1", "Chapter 2"]
+        assert [h.attributes["page_start"] for h in headings] == [0, 1, 2]
+        assert [h.attributes["page_end"] for h in headings] == [1, 2, 2]
+        assert document.is_lazy
+        assert document.pages == {}
+
+    @pytest.mark.anyio
+    async def test_read_lazy_section_converts_span_only(self, tmp_path):
+        """Test that reading a section converts and memoizes its pages."""
+        pdf_file = _make_pdf(tmp_path / "doc.pdf", 4)
+        document = await self.processor.process(pdf_file)
+        node = document.get_headings()[3]
+
+        text = self.processor.read_lazy_section(document, node)
+        assert "Body text on page 3" in text
+        assert set(document.pages) == {3}
+
+        # Memoized pages are reused
+        document.pages[3] = "memoized"
+        assert self.processor.read_lazy_section(document, node) == "memoized"
+
+    @pytest.mark.anyio
+    async def test_lazy_search_converts_matching_pages(self, tmp_path):
+        """Test that search converts only pages containing the query."""
+        pdf_file = _make_pdf(tmp_path / "doc.pdf", 4)
+        document = await self.processor.process(pdf_file)
+
+        results = await self.processor.search(document, "topic2")
+        assert len(results) == 1
+        assert results[0].section == "Chapter 2"
+        assert "topic2" in results[0].content
+        assert set(document.pages) == {2}
+
+    @pytest.mark.anyio
+    async def test_outline_from_native_bookmarks(self, tmp_path):
+        """Test that bookmarks become nested headings with page spans."""
+        import pymupdf
+
+        pdf_file = _make_pdf(tmp_path / "doc.pdf", 5)
+        with pymupdf.open(pdf_file) as pdf:
+            pdf.set_toc(
+                [
+                    [1, "Part One", 1],
+                    [2, "Setup", 2],
+                    [2, "Usage", 3],
+                    [1, "Part Two", 5],
+                ]
+            )
+            pdf.saveIncr()
+
+        document = await self.processor.process(pdf_file)
+        assert document.metadata["outline_source"] == "toc"
+
+        part_one, part_two = document.root.children
+        assert part_one.title == "Part One"
+        assert part_one.attributes == {"page_start": 0, "page_end": 4}
+        assert [c.title for c in part_one.children] == ["Setup", "Usage"]
+        assert part_one.children[1].attributes == {"page_start": 2, "page_end": 4}
+        assert part_two.attributes == {"page_start": 4, "page_end": 4}
+        assert document.pages == {}
+
+        text = self.processor.read_lazy_section(document, part_two)
+        assert "Body text on page 4" in text
+
+    @pytest.mark.anyio
+    async def test_outline_source_scan_ignores_bookmarks(self, tmp_path):
+        """Test forcing the font-size scan even when bookmarks exist."""
+        import pymupdf
+
+        pdf_file = _make_pdf(tmp_path / "doc.pdf", 2)
+        with pymupdf.open(pdf_file) as pdf:
+            pdf.set_toc([[1, "Only Bookmark", 1]])
+            pdf.saveIncr()
+
+        processor = PDFProcessor(lazy=True, outline_source="scan")
+        document = await processor.process(pdf_file)
+        assert document.metadata["outline_source"] == "scan"
+        assert [h.title for h in document.get_headings()] == ["Chapter 0", "Chapter 1"]
+
+    def test_invalid_outline_source(self):
+        """Test that unknown outline sources are rejected."""
+        with pytest.raises(ValueError, match="Unsupported outline source"):
+            PDFProcessor(lazy=True, outline_source="magic")
+
+    def test_lazy_mode_has_separate_cache_id(self):
+        """Test that lazy and eager parse results are cached separately."""
+        assert PDFProcessor(lazy=True).get_cache_id() != PDFProcessor().get_cache_id()
+
+    def test_outline_tree_page_spans(self):
+        """Test that sections end where the next same-or-higher heading starts."""
+        root = self.processor._build_outline_tree(
+            [(1, "A", 0), (2, "A.1", 1), (2, "A.2", 3), (1, "B", 5)], 8
+        )
+        first, second = root.children
+        assert first.attributes == {"page_start": 0, "page_end": 5}
+        assert [c.attributes["page_end"] for c in first.children] == [3, 5]
+        assert second.attributes == {"page_start": 5, "page_end": 7}
+
+
+class TestInMemoryProcessing:
+    """Test cases for processing content without files."""
+
+    def test_markdown_text_and_bytes(self):
+        """Test that text and UTF-8 bytes parse to the same tree."""
+        processor = MarkdownProcessor()
+        content = "# Title\n\n## Größe\n\n- item\n"
+
+        from_text = processor.process_content(content)
+        from_bytes = processor.process_content(content.encode("utf-8"))
+
+        assert from_text.title == "Untitled Document"
+        assert from_text.file_path is None
+        assert from_text.get_outline() == from_bytes.get_outline()
+        assert [h.title for h in from_text.get_headings()] == ["Title", "Größe"]
+
+    @pytest.mark.anyio
+    async def test_markdown_matches_file_processing(self, tmp_path):
+        """Test that in-memory processing matches processing the file."""
+        md_file = tmp_path / "doc.md"
+        md_file.write_text("# Title\n\nBody.\n")
+        processor = MarkdownProcessor()
+
+        from_file = await processor.process(md_file)
+        from_memory = processor.process_content(md_file.read_text(), md_file)
+
+        assert from_memory.title == "doc"
+        assert from_memory.get_outline() == from_file.get_outline()
+        assert from_memory.source_text == from_file.source_text
+
+    def test_pdf_bytes(self, tmp_path):
+        """Test converting PDF data held in memory."""
+        pdf_file = _make_pdf(tmp_path / "doc.pdf", 2)
+        processor = PDFProcessor()
+        progress = []
+
+        document = processor.process_content(
+            pdf_file.read_bytes(), progress=lambda *update: progress.append(update)
+        )
+
+        assert document.source_format == "pdf"
+        assert document.source_text == processor.convert_to_markdown(pdf_file)
+        assert progress[:2] == [("convert", 0, 2), ("convert", 2, 2)]
+        with pytest.raises(TypeError):
+            processor.process_content("not pdf bytes")
+
+
+class TestMarkdownScanner:
+    """Test cases for the shared single-pass Markdown scanner."""
+
+    def _types(self, root):
+        return [(child.type, child.id) for child in root.children]
+
+    def test_fenced_code_is_one_node(self):
+        """Test that lines inside fences never become headings or items."""
+        from docnav.processors.scanner import parse_markdown_tree
+
+        content = "# Title\n\n```python\n# not a heading\n- not an item\n```\nAfter.\n"
+        root = parse_markdown_tree(content)
+        title = root.children[0]
+
+        assert len(root.children) == 1
+        assert [child.type for child in title.children] == ["code_block", "paragraph"]
+        code = title.children[0]
+        assert code.content == "```python\n# not a heading\n- not an item\n```"
+        assert code.attributes["language"] == "python"
+        assert (code.attributes["line_number"], code.attributes["end_line"]) == (2, 5)
+
+    def test_fence_close_rules(self):
+        """Test that fences close only on a matching, long enough marker."""
+        from docnav.processors.scanner import parse_markdown_tree
+
+        root = parse_markdown_tree("~~~~\n```\n~~~\n~~~~~\n# Heading\n")
+        assert [child.type for child in root.children] == ["code_block", "heading"]
+        assert root.children[0].attributes["end_line"] == 3
+
+        # Unclosed fences run to the end of the document
+        root = parse_markdown_tree("```\n# inside\n")
+        assert [child.type for child in root.children] == ["code_block"]
+
+    def test_setext_headings(self):
+        """Test underlined headings and thematic breaks."""
+        from docnav.processors.scanner import parse_markdown_tree
+
+        content = "Main\n====\n\nSub\n---\n\ntext\n\n---\n"
+        root = parse_markdown_tree(content)
+        main = root.children[0]
+
+        assert (main.type, main.level, main.title, main.id) == (
+            "heading",
+            1,
+            "Main",
+            "h1_0",
+        )
+        sub = main.children[0]
+        assert (sub.level, sub.title, sub.attributes["line_number"]) == (2, "Sub", 3)
+        # A dash line after a blank line stays a paragraph
+        assert [child.content for child in sub.children] == ["text", "---"]
+
+    def test_lists(self):
+        """Test ordered and unordered items with their indentation."""
+        from docnav.processors.scanner import parse_markdown_tree
+
+        root = parse_markdown_tree("- a\n  * b\n1. c\n2) d\n*emphasis*\n")
+        items = [
+            (child.attributes.get("list_type"), child.attributes.get("indent"))
+            for child in root.children
+        ]
+
+        assert items == [
+            ("unordered", 0),
+            ("unordered", 2),
+            ("ordered", 0),
+            ("ordered", 0),
+            (None, None),
+        ]
+        assert root.children[-1].type == "paragraph"
+
+    def test_content_is_span_of_source(self):
+        """Test that nodes slice the parsed text instead of copying it."""
+        import pickle
+
+        from docnav.processors.scanner import parse_markdown_tree
+
+        content = "Main\n====\n\n```\ncode\n```\n\n- item\n"
+        root = parse_markdown_tree(content)
+        main = root.children[0]
+        code, item = main.children
+
+        assert main.span == (0, 9)
+        assert main.content == "Main\n===="
+        assert content[slice(*code.span)] == code.content == "```\ncode\n```"
+        assert item.source is content
+        # Pickling stores the shared text once
+        copy = pickle.loads(pickle.dumps(root))
+        assert copy.children[0].children[1].source is copy.children[0].source
+        assert copy == root
+
+    def test_processors_share_scanner(self):
+        """Test that both processors produce the same tree."""
+        content = "# A\n\n```\n# b\n```\n\nC\n-\n"
+        md_root = MarkdownProcessor()._parse_markdown_to_tree(content)
+        pdf_root = PDFProcessor()._parse_markdown_to_tree(content)
+
+        assert self._types(md_root) == self._types(pdf_root)
+        assert self._types(md_root.children[0]) == [
+            ("code_block", "code_1"),
+            ("heading", "h2_2"),
+        ]
+
+
+class TestParseEngines:
+    """Test cases for the pluggable Markdown parse engines."""
+
+    CONTENT = "# Title\n\nIntro\ncontinued.\n\n- a\n- b\n\n## Section\n\nBody.\n"
+
+    def test_select_engine_by_size(self):
+        """Test that auto picks CommonMark below the threshold."""
+        from docnav.processors import get_engine, select_engine
+
+        assert select_engine("auto", 10, threshold=100).name == "commonmark"
+        assert select_engine("auto", 100, threshold=100).name == "scanner"
+        assert select_engine("auto", 10**9, threshold=None).name == "commonmark"
+        assert select_engine("scanner", 10, threshold=100).name == "scanner"
+        with pytest.raises(ValueError, match="Unsupported parse engine"):
+            get_engine("regex")
+        with pytest.raises(ValueError, match="Unsupported parse engine"):
+            MarkdownProcessor(engine="regex")
+
+    def test_engines_report_stats(self):
+        """Test that each engine records its name, timing and node count."""
+        processor = MarkdownProcessor()
+
+        scanned = processor.process_content(self.CONTENT, engine="scanner")
+        parsed = processor.process_content(self.CONTENT, engine="commonmark")
+
+        scanner_stats = scanned.metadata["parse_stats"]
+        commonmark_stats = parsed.metadata["parse_stats"]
+        assert scanner_stats.engine == "scanner"
+        assert commonmark_stats.engine == "commonmark"
+        assert scanner_stats.nodes == len(scanned.index)
+        assert commonmark_stats.nodes == len(parsed.index)
+        assert scanner_stats.chars == len(self.CONTENT)
+        assert scanner_stats.seconds >= 0
+
+        # Both engines agree on the section structure
+        assert [h.title for h in scanned.get_headings()] == ["Title", "Section"]
+        assert [h.title for h in parsed.get_headings()] == ["Title", "Section"]
+
+        # CommonMark nodes are spans of the source lines, like the scanner's
+        heading = parsed.get_headings()[0]
+        assert heading.source is parsed.source_text
+        assert heading.content == scanned.get_headings()[0].content
+
+    def test_auto_threshold_and_cache_id(self):
+        """Test that the configured threshold drives auto mode and cache ids."""
+        processor = MarkdownProcessor(engine_threshold=len(self.CONTENT))
+        document = processor.process_content(self.CONTENT)
+
+        assert document.metadata["parse_stats"].engine == "scanner"
+        assert processor.get_cache_id() != processor.get_cache_id("commonmark")
+        assert processor.get_cache_id() != MarkdownProcessor().get_cache_id()
+        assert PDFProcessor(engine="scanner").get_cache_id().endswith("/scanner")
+
+
+class TestParallelCommonMark:
+    """Test cases for partitioned parallel CommonMark parsing."""
+
+    CONTENT = (
+        "Preamble paragraph.\n\n"
+        "# One\n\nText\n\n- a\n- b\n\n```\n# not a split point\n```\n\n"
+        "<!--\n# inside a comment\n-->\n\n"
+        "# Two\n\n## Two.A\n\n> quote\n\n"
+        "# Three\n\n1. x\n2. y\n"
+    )
+
+    def _flatten(self, root):
+        nodes = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            nodes.append(
+                (
+                    node.id,
+                    node.type,
+                    node.title,
+                    node.content,
+                    node.attributes.get("line_number"),
+                    node.parent.id if node.parent else None,
+                )
+            )
+            stack.extend(reversed(node.children))
+        return nodes
+
+    def test_partitions_split_only_at_top_level_headings(self):
+        """Test that fences and HTML blocks are never split."""
+        from docnav.processors.engines import partition_markdown
+
+        partitions = partition_markdown(self.CONTENT, 1)
+
+        assert [text.split("\n", 1)[0] for _, text in partitions] == [
+            "Preamble paragraph.",
+            "# One",
+            "# Two",
+            "# Three",
+        ]
+        lines = self.CONTENT.split("\n")
+        for start, text in partitions:
+            assert lines[start] == text.split("\n", 1)[0]
+
+        # Parts are merged up to the target size
+        assert len(partition_markdown(self.CONTENT, len(self.CONTENT))) == 1
+
+    def test_parallel_tree_matches_serial(self):
+        """Test that grafted partitions have globally consistent ids and lines."""
+        from docnav.processors.engines import (
+            ParallelCommonMarkEngine,
+            parse_commonmark_tree,
+        )
+
+        engine = ParallelCommonMarkEngine(2, min_chars=0, partition_min_chars=1)
+        root, stats = engine.run(self.CONTENT)
+
+        assert stats.chunks > 1
+        assert stats.engine == "commonmark"
+        assert self._flatten(root) == self._flatten(parse_commonmark_tree(self.CONTENT))
+        # Spans point into the whole text, not into each worker's part
+        assert root.children[1].source is self.CONTENT
+
+    def test_html_blocks_end_at_blank_lines(self):
+        """Test that headings inside <div>-style HTML blocks are not split points."""
+        from docnav.processors.engines import (
+            ParallelCommonMarkEngine,
+            parse_commonmark_tree,
+            partition_markdown,
+        )
+
+        content = (
+            "# One\n\nText\n\n<div>\n# Not a heading inside html\n</div>\n\n"
+            "# Two\n\n  <details>\n# also html\n\n# Three\n\nEnd\n"
+        )
+
+        partitions = partition_markdown(content, 1)
+        assert [text.split("\n", 1)[0] for _, text in partitions] == [
+            "# One",
+            "# Two",
+            "# Three",
+        ]
+
+        engine = ParallelCommonMarkEngine(2, min_chars=0, partition_min_chars=1)
+        root, _ = engine.run(content)
+        assert self._flatten(root) == self._flatten(parse_commonmark_tree(content))
+
+    def test_parses_reuse_the_shared_pool(self):
+        """Test that parallel parses run on one pool instead of spawning their own."""
+        from docnav.processors import workers
+        from docnav.processors.engines import ParallelCommonMarkEngine
+
+        engine = ParallelCommonMarkEngine(2, min_chars=0, partition_min_chars=1)
+        engine.run(self.CONTENT)
+        pool = workers.get_process_pool()
+        engine.run(self.CONTENT)
+
+        assert workers.get_process_pool() is pool
+
+    def test_small_input_is_parsed_in_process(self, monkeypatch):
+        """Test that inputs below the size limit skip the process pool."""
+        import docnav.processors.engines as engines
+
+        def fail(*args, **kwargs):
+            raise AssertionError("process pool should not be used")
+
+        monkeypatch.setattr(engines, "get_process_pool", fail)
+        processor = MarkdownProcessor(engine="commonmark", parse_workers=4)
+        document = processor.process_content(self.CONTENT)
+
+        assert document.metadata["parse_stats"].chunks == 1
+        assert [child.title for child in document.root.children[1:]] == [
+            "One",
+            "Two",
+            "Three",
+        ]
+
+
+class TestStreamingIngestion:
+    """Test cases for streamed Markdown documents."""
+
+    CONTENT = (
+        "# Guide\n\nIntro text.\n\n```python\n# not a heading\nx = 1\n```\n\n"
+        "Setext\n------\n\n- item one\n- item two\n\n# Appendix\n\nLast needle.\n"
+    )
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.processor = MarkdownProcessor(stream_min_bytes=0)
+
+    def _write(self, tmp_path):
+        md_file = tmp_path / "doc.md"
+        md_file.write_bytes(self.CONTENT.encode("utf-8"))
+        return md_file
+
+    @pytest.mark.anyio
+    async def test_streamed_tree_matches_scanner(self, tmp_path):
+        """Test that streaming builds the scanner's tree without the text."""
+        document = await self.processor.process(self._write(tmp_path))
+        expected = MarkdownProcessor(engine="scanner").process_content(self.CONTENT)
+
+        assert document.is_streamed
+        assert document.source_text == ""
+        assert document.metadata["parse_stats"].engine == "stream"
+        assert list(document.index) == list(expected.index)
+        assert [(h.id, h.title) for h in document.get_headings()] == [
+            (h.id, h.title) for h in expected.get_headings()
+        ]
+
+    @pytest.mark.anyio
+    async def test_spans_slice_source(self, tmp_path):
+        """Test that node spans point at their source bytes."""
+        document = await self.processor.process(self._write(tmp_path))
+        data = self.CONTENT.encode("utf-8")
+        expected = MarkdownProcessor(engine="scanner").process_content(self.CONTENT)
+
+        for node_id, node in document.index.items():
+            if node.type == "document":
+                continue
+            start, end = node.span
+            assert data[start:end].decode("utf-8") == expected.index[node_id].content
+            assert node.content == expected.index[node_id].content
+
+    @pytest.mark.anyio
+    async def test_spans_use_byte_offsets(self, tmp_path):
+        """Test that streamed spans stay aligned after multi-byte text."""
+        md_file = tmp_path / "doc.md"
+        md_file.write_bytes("# Café\n\nnaïve text\n\n# Fin\n".encode("utf-8"))
+        document = await self.processor.process(md_file)
+        fin = document.root.children[1]
+
+        assert fin.span == (22, 27)
+        assert fin.content == "# Fin"
+        assert document.get_node("p_1").content == "naïve text"
+
+    @pytest.mark.anyio
+    async def test_read_and_search_streamed(self, tmp_path):
+        """Test reading sections and searching from disk."""
+        document = await self.processor.process(self._write(tmp_path))
+        guide = document.root.children[0]
+
+        section = self.processor.read_streamed_section(document, guide)
+        assert section.startswith("# Guide\n\nIntro text.")
+        assert section.endswith("- item two")
+        assert "# Appendix" not in section
+        assert (
+            self.processor.read_streamed_section(document, document.root)
+            == self.CONTENT
+        )
+
+        results = self.processor.search_streamed(document, "NEEDLE")
+        assert [(r.section, r.content) for r in results] == [
+            ("Appendix", "Last needle.")
+        ]
+        code_hits = self.processor.search_streamed(document, "x = 1")
+        assert [r.type for r in code_hits] == ["code_block"]
+
+    def test_small_files_are_not_streamed(self, tmp_path):
+        """Test the size limit and the CommonMark opt-out."""
+        md_file = self._write(tmp_path)
+
+        assert not MarkdownProcessor().should_stream(md_file)
+        assert not MarkdownProcessor(stream_min_bytes=1 << 20).should_stream(md_file)
+        assert not self.processor.should_stream(md_file, engine="commonmark")
+        assert self.processor.should_stream(md_file)
+
+
+class TestXMLProcessor:
+    """Test cases for XMLProcessor."""
+
+    CONTENT = (
+        '<?xml version="1.0"?>\n'
+        '<book xmlns="http://docbook.org/ns/docbook">'
+        "<chapter xml:id='intro'><title>Intro</title>"
+        "<para>Hello <emphasis>bold</emphasis> world</para>"
+        "<section><title>Details</title><para>Deep needle</para></section>"
+        "</chapter>"
+        "<chapter><title>Usage</title><para>Run it</para></chapter>"
+        "</book>"
+    )
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        from docnav.processors import XMLProcessor
+
+        self.processor = XMLProcessor()
+
+    def test_can_process_xml_files(self):
+        """Test that processor can identify XML files."""
+        assert self.processor.can_process(Path("book.xml"))
+        assert self.processor.can_process(Path("topic.dita"))
+        assert not self.processor.can_process(Path("doc.md"))
+
+    def test_sections_become_headings(self):
+        """Test that DocBook sections are titled, leveled headings."""
+        document = self.processor.process_content(self.CONTENT)
+        intro = document.get_node("intro")
+
+        assert document.source_format == "xml"
+        assert document.metadata["parse_stats"].engine == "iterparse"
+        assert (intro.type, intro.level, intro.title) == ("heading", 1, "Intro")
+        assert [(h.title, h.level) for h in document.get_headings()] == [
+            ("Intro", 1),
+            ("Usage", 1),
+            ("Details", 2),
+        ]
+        assert intro.attributes["tag"] == "{http://docbook.org/ns/docbook}chapter"
+
+    def test_mixed_content_and_unique_ids(self):
+        """Test that text after child elements is kept and ids are unique."""
+        from docnav.processors.xml import parse_xml_tree
+
+        root = parse_xml_tree(self.CONTENT)
+        nodes = []
+        stack = list(root.children)
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(node.children)
+
+        contents = [n.content for n in nodes if n.type.endswith("para")]
+        assert "Hello  world" in contents
+        assert len({n.id for n in nodes}) == len(nodes)
+        # Without section tags elements keep their tag as type
+        assert not [n for n in nodes if n.type == "heading"]
+
+    @pytest.mark.anyio
+    async def test_process_file_and_search(self, tmp_path):
+        """Test processing an XML file and searching it."""
+        xml_file = tmp_path / "book.xml"
+        xml_file.write_text(self.CONTENT)
+
+        document = await self.processor.process(xml_file)
+        results = await self.processor.search(document, "NEEDLE")
+
+        assert document.title == "book"
+        assert [(r.section, r.content) for r in results] == [("Details", "Deep needle")]
+
+    @pytest.mark.anyio
+    async def test_process_file_honours_declared_encoding(self, tmp_path):
+        """Test that files are parsed in the encoding their declaration names."""
+        xml_file = tmp_path / "book.xml"
+        xml_file.write_bytes(
+            self.CONTENT.replace('version="1.0"', 'version="1.0" encoding="latin-1"')
+            .replace("Usage", "Café")
+            .encode("latin-1")
+        )
+
+        document = await self.processor.process(xml_file)
+
+        assert [h.title for h in document.get_headings()][1] == "Café"
+        assert document.source_text == ""
+        assert document.metadata["parse_stats"].chars == xml_file.stat().st_size